@@ -20,11 +20,11 @@ from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
 try:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
 except ImportError:
     # Fallback if run directly from root without modules package context
     try:
-        from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+        from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
     except ImportError:
         # Define fallback if module is missing
         class Colors:
@@ -40,27 +40,38 @@ except ImportError:
         
         def print_colored(text, color=Colors.WHITE): print(f"{color}{text}{Colors.END}")
         def print_header(text): print(f"\n=== {text} ===")
-        def print_success(text): print(f"OK: {text}")
-        def print_error(text): print(f"ERROR: {text}")
-        def print_warning(text): print(f"WARNING: {text}")
-        def print_info(text): print(f"INFO: {text}")
+        def print_success(text, **fields): print(f"OK: {text}")
+        def print_error(text, **fields): print(f"ERROR: {text}")
+        def print_warning(text, **fields): print(f"WARNING: {text}")
+        def print_info(text, **fields): print(f"INFO: {text}")
+        def elapsed_ms(start): return (time.perf_counter() - start) * 1000
         symbols = type('obj', (object,), {'CROSS': 'x', 'CHECK': 'v', 'WARNING': '!', 'INFO': 'i', 'BLOCK': '#', 'RECYCLE': '@', 'GEAR': '*', 'TOOLS': 'T', 'GLOBE': 'G', 'WAVE': '~', 'SHIELD': 'S', 'TRASH': 'D'})
 
+try:
+    from modules.query_cache import invalidate as invalidate_query_cache
+    from modules.system_queries import read_registry_value
+    from modules.performance_manager import restore_network_settings
+except ImportError:
+    from query_cache import invalidate as invalidate_query_cache
+    from system_queries import read_registry_value
+    from performance_manager import restore_network_settings
+
 def run_command(command, description, check_output=False, ignore_errors=False):
     """Run a command and handle errors with optional output check."""
+    start = time.perf_counter()
     try:
         result = subprocess.run(command, shell=True, capture_output=True, text=True)
         if result.returncode == 0:
-            print_success(f"{description}")
+            print_success(f"{description}", target=command, duration_ms=elapsed_ms(start))
             if check_output:
                 return result.stdout.strip()
         else:
             if not ignore_errors:
-                print_error(f"{description} - {result.stderr.strip()}")
+                print_error(f"{description} - {result.stderr.strip()}", target=command, duration_ms=elapsed_ms(start))
             return None
     except Exception as e:
         if not ignore_errors:
-            print_error(f"{description} - {str(e)}")
+            print_error(f"{description} - {str(e)}", target=command, duration_ms=elapsed_ms(start))
         return None
 
 def check_admin():
@@ -99,9 +110,10 @@ def restore_registry_value(root_key, subkey, value_name, default_value, value_ty
     try:
         create_backup_registry_key(root_key, subkey)
         key = winreg.CreateKey(root_key, subkey)
+        before = read_registry_value(key, value_name)
         winreg.SetValueEx(key, value_name, 0, value_type, default_value)
         winreg.CloseKey(key)
-        print_success(f"Restored {value_name} in {subkey}")
+        print_success(f"Restored {value_name} in {subkey}", target=f"{subkey}\\{value_name}", before=before, after=default_value)
     except Exception as e:
         print_error(f"Failed to restore {value_name} in {subkey}: {str(e)}")
 
@@ -345,6 +357,9 @@ def restore_performance():
     
     # Restore memory management defaults
     restore_registry_value(winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\CurrentControlSet\Control\Session Manager\Memory Management", "LargeSystemCache", 0)
+
+    # Network stack tuning (values saved before it was applied)
+    restore_network_settings()
     
     print_success("Performance settings restored to defaults.")
 
@@ -498,6 +513,7 @@ def main():
                 print_error("Invalid choice! Please enter a number between 1-8.")
             
             if choice in ['1', '2', '3', '4', '5', '6', '7']:
+                invalidate_query_cache()
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
         except KeyboardInterrupt:
@@ -10,20 +10,20 @@ Year: 2025
 """
 
 import subprocess
+import time
 import sys
 import os
 import winreg
-from pathlib import Path
 
 # Ensure we can import modules
 sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
 try:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
 except ImportError:
     # Fallback if run directly from root without modules package context
     try:
-        from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+        from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
     except ImportError:
         # Define fallback if module is missing
         class Colors:
@@ -39,12 +39,40 @@ except ImportError:
         
         def print_colored(text, color=Colors.WHITE): print(f"{color}{text}{Colors.END}")
         def print_header(text): print(f"\n=== {text} ===")
-        def print_success(text): print(f"OK: {text}")
-        def print_error(text): print(f"ERROR: {text}")
-        def print_warning(text): print(f"WARNING: {text}")
-        def print_info(text): print(f"INFO: {text}")
+        def print_success(text, **fields): print(f"OK: {text}")
+        def print_error(text, **fields): print(f"ERROR: {text}")
+        def print_warning(text, **fields): print(f"WARNING: {text}")
+        def print_info(text, **fields): print(f"INFO: {text}")
+        def elapsed_ms(start): return (time.perf_counter() - start) * 1000
         symbols = type('obj', (object,), {'CROSS': 'x', 'CHECK': 'v', 'WARNING': '!', 'INFO': 'i', 'BLOCK': '#'})
 
+try:
+    from modules.system_queries import get_service_state, get_update_policy, read_registry_value
+    from modules.query_cache import invalidate as invalidate_query_cache
+except ImportError:
+    from system_queries import get_service_state, get_update_policy, read_registry_value
+    from query_cache import invalidate as invalidate_query_cache
+
+try:
+    from modules import hosts_file, blocklist, firewall_blocker, dns_cache
+except ImportError:
+    import hosts_file
+    import blocklist
+    import firewall_blocker
+    import dns_cache
+
+UPDATE_HOSTS_SECTION = "windows-update"
+UPDATE_URLS = [
+    "windowsupdate.microsoft.com",
+    "update.microsoft.com",
+    "windowsupdate.com",
+    "download.windowsupdate.com",
+    "wustat.windows.com",
+    "ntservicepack.microsoft.com",
+    "stats.microsoft.com",
+    "download.microsoft.com",
+]
+
 def is_admin():
     """Check if the script is running with administrator privileges."""
     try:
@@ -58,9 +86,10 @@ def is_admin():
 
 def run_command(command, description, ignore_errors=False):
     """Run a command and handle errors."""
+    start = time.perf_counter()
     try:
         result = subprocess.run(command, shell=True, capture_output=True, text=True, check=True)
-        print_success(f"{description}")
+        print_success(f"{description}", target=command, duration_ms=elapsed_ms(start))
         return True
     except subprocess.CalledProcessError as e:
         err_msg = e.stderr.strip() if e.stderr else str(e)
@@ -68,11 +97,11 @@ def run_command(command, description, ignore_errors=False):
              err_msg += f" {e.stdout.strip()}"
              
         if "does not exist" in err_msg:
-             print_info(f"{description} - Task/Service not found (already removed?)")
+             print_info(f"{description} - Task/Service not found (already removed?)", target=command, duration_ms=elapsed_ms(start))
              return True
         
         if not ignore_errors:
-            print_error(f"{description}")
+            print_error(f"{description}", target=command, duration_ms=elapsed_ms(start))
             print_colored(f"  - Error: {err_msg}", Colors.RED)
         return False
 
@@ -129,8 +158,9 @@ def modify_registry():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
 
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Set registry value: {reg_change['subkey']}\\{value_name}")
+                print_success(f"Set registry value: {reg_change['subkey']}\\{value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
 
             winreg.CloseKey(key)
         except Exception as e:
@@ -157,43 +187,34 @@ def block_update_urls():
     """Add Windows Update URLs to hosts file to block them."""
     print_colored(f"\n{symbols.BLOCK} Blocking Update URLs in Hosts File", Colors.BOLD + Colors.CYAN)
 
-    hosts_file = Path(r"C:\Windows\System32\drivers\etc\hosts")
-    update_urls = [
-        "windowsupdate.microsoft.com",
-        "update.microsoft.com",
-        "windowsupdate.com",
-        "download.windowsupdate.com",
-        "wustat.windows.com",
-        "ntservicepack.microsoft.com",
-        "stats.microsoft.com",
-        "download.microsoft.com",
-    ]
-
     try:
-        # Read existing hosts file
-        with open(hosts_file, 'r') as f:
-            content = f.read()
-
-        # Add blocking entries if they don't exist
-        modified = False
-        for url in update_urls:
-            block_entry = f"127.0.0.1 {url}"
-            if block_entry not in content:
-                content += f"\n{block_entry}"
-                modified = True
-                print_success(f"Blocked: {url}")
-
-        # Write back to hosts file if modified
-        if modified:
-            with open(hosts_file, 'w') as f:
-                f.write(content)
+        hosts = hosts_file.HostsFile()
+        # Entries written by older versions move into our managed block
+        hosts.drop_unmanaged(UPDATE_URLS)
+        added, _ = hosts.update_section(UPDATE_HOSTS_SECTION, add=UPDATE_URLS)
+        for url in added:
+            print_success(f"Blocked: {url}")
+
+        if hosts.save():
             print_success("Hosts file updated successfully")
+            dns_cache.request_flush("update URLs blocked", blocked=UPDATE_URLS[:1])
         else:
             print_success("All URLs already blocked in hosts file")
 
     except Exception as e:
         print_error(f"Failed to modify hosts file: {str(e)}")
 
+def block_update_firewall():
+    """Block the addresses behind the update URLs with Windows Firewall rules."""
+    print_colored(f"\n{symbols.SHIELD} Blocking Update Endpoints in the Firewall", Colors.BOLD + Colors.CYAN)
+    print_warning("Update servers share CDN addresses with other sites; other downloads may be affected.")
+    # Also cover names added to the managed hosts block by hand
+    domains = UPDATE_URLS + hosts_file.HostsFile().section(UPDATE_HOSTS_SECTION)
+    try:
+        firewall_blocker.block_endpoints(domains)
+    except Exception as e:
+        print_error(f"Failed to add firewall rules: {str(e)}")
+
 def show_menu():
     """Display the main menu."""
     clear_screen()
@@ -206,7 +227,10 @@ def show_menu():
     print_colored(f"5. {symbols.GLOBE} Block Update URLs Only", Colors.YELLOW)
     print_colored(f"6. {symbols.INFO} Check Current Update Status", Colors.BLUE)
     print_colored(f"7. {symbols.RECYCLE} Create Restore Script", Colors.GREEN)
-    print_colored(f"8. {symbols.WAVE} Exit", Colors.RED)
+    print_colored(f"8. {symbols.SHIELD} Apply Telemetry/Ad Domain Blocklists (files or URLs)", Colors.YELLOW)
+    print_colored(f"9. {symbols.RECYCLE} Remove Domain Blocklists", Colors.GREEN)
+    print_colored(f"10. {symbols.LOCK} Block Update Endpoints in the Firewall", Colors.YELLOW)
+    print_colored(f"11. {symbols.WAVE} Exit", Colors.RED)
 
 def check_update_status():
     """Check the current status of Windows Update components."""
@@ -217,10 +241,10 @@ def check_update_status():
     print_colored(f"\n{symbols.GEAR} Service Status:", Colors.BOLD + Colors.CYAN)
     for service in services:
         try:
-            result = subprocess.run(f'sc query "{service}"', shell=True, capture_output=True, text=True)
-            if "RUNNING" in result.stdout:
+            state = get_service_state(service)
+            if state == "RUNNING":
                 print_colored(f"  {service}: RUNNING", Colors.GREEN)
-            elif "STOPPED" in result.stdout:
+            elif state == "STOPPED":
                 print_colored(f"  {service}: STOPPED", Colors.RED)
             else:
                 print_colored(f"  {service}: UNKNOWN", Colors.YELLOW)
@@ -229,14 +253,13 @@ def check_update_status():
 
     # Check registry
     print_colored(f"\n{symbols.TOOLS} Registry Status:", Colors.BOLD + Colors.CYAN)
-    try:
-        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Policies\Microsoft\Windows\WindowsUpdate\AU")
+    policy = get_update_policy()
+    if policy["policy"] == "DISABLED":
         print_colored(f"  {symbols.CHECK} Update policies: DISABLED", Colors.RED)
-        winreg.CloseKey(key)
-    except FileNotFoundError:
+    elif policy["policy"] == "ENABLED":
         print_colored(f"  {symbols.INFO} Update policies: ENABLED", Colors.GREEN)
-    except Exception as e:
-        print_colored(f"  {symbols.WARNING} Update policies: ERROR - {str(e)}", Colors.YELLOW)
+    else:
+        print_colored(f"  {symbols.WARNING} Update policies: ERROR - {policy.get('error')}", Colors.YELLOW)
 
 def create_restore_script():
     """Create a script to restore Windows Updates if needed."""
@@ -263,12 +286,13 @@ def disable_all_updates():
 
     print_info("Starting comprehensive Windows Update disabling process...")
 
-    # Execute all disabling methods
-    stop_update_services()
-    modify_registry()
-    disable_update_tasks()
-    block_update_urls()
-    create_restore_script()
+    # Execute all disabling methods (one DNS cache flush for all of them)
+    with dns_cache.batch():
+        stop_update_services()
+        modify_registry()
+        disable_update_tasks()
+        block_update_urls()
+        create_restore_script()
 
     print_colored("\n" + "=" * 60, Colors.GREEN)
     print_success("Windows Update disabling process completed!")
@@ -287,7 +311,7 @@ def main():
         show_menu()
 
         try:
-            choice = input(f"\n{Colors.BOLD}Enter your choice (1-8): {Colors.END}").strip()
+            choice = input(f"\n{Colors.BOLD}Enter your choice (1-11): {Colors.END}").strip()
 
             if choice == '1':
                 disable_all_updates()
@@ -304,12 +328,24 @@ def main():
             elif choice == '7':
                 create_restore_script()
             elif choice == '8':
+                blocklist.blocklist_menu()
+            elif choice == '9':
+                blocklist.remove_blocklists()
+            elif choice == '10':
+                block_update_firewall()
+            elif choice == '11':
                 print_colored(f"\n{symbols.WAVE} Goodbye! Stay safe!", Colors.BOLD + Colors.CYAN)
                 break
             else:
-                print_error("Invalid choice! Please enter a number between 1-8.")
+                print_error("Invalid choice! Please enter a number between 1-11.")
+
+            # Apply any DNS cache flush the step requested before pausing
+            dns_cache.flush_pending()
+
+            if choice in ['1', '2', '3', '4', '5']:
+                invalidate_query_cache()
 
-            if choice in ['1', '2', '3', '4', '5', '7']:
+            if choice in ['1', '2', '3', '4', '5', '7', '8', '9', '10']:
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
 
         except KeyboardInterrupt:
@@ -16,11 +16,27 @@ import platform
 
 # Import new shared console utilities
 try:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, child_stdout
 except ImportError:
     # Handle case where modules dir is not in path (if run directly from desktop root)
     sys.path.append(os.path.abspath("modules"))
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, child_stdout
+
+# Opt-in: warm the status caches in the background while the main menu is shown
+PREFETCH_ENABLED = "--prefetch" in sys.argv or bool(os.environ.get("WIN11_PREFETCH"))
+
+def start_status_prefetch(only_if_invalidated=False):
+    """Start the background status prefetcher if it was enabled.
+
+    At startup it always runs; back at the menu only after a module invalidated the cache.
+    """
+    if not PREFETCH_ENABLED:
+        return
+    try:
+        from modules.system_queries import start_background_prefetch
+        start_background_prefetch(only_if_invalidated)
+    except Exception:
+        pass  # Prefetching is only an optimization
 
 def print_launcher_header():
     """Print the main header."""
@@ -63,6 +79,7 @@ def show_main_menu():
 
     print_colored(f"\n{symbols.BOOK} HELP & INFO:", Colors.BOLD + Colors.MAGENTA)
     print_colored(f"15. {symbols.INFO}  INFORMATION", Colors.BLUE)
+    print_colored(f"16. {symbols.TARGET} System Status Dashboard", Colors.BLUE)
 
     if not check_admin():
         print_colored(f"\n99. {symbols.KEY} RESTART AS ADMINISTRATOR", Colors.BOLD + Colors.GREEN)
@@ -86,6 +103,7 @@ def show_information():
     print_colored(f"{symbols.BULLET} God Mode: Enable the hidden Master Control Panel", Colors.WHITE)
     print_colored(f"{symbols.BULLET} Gaming Mode: Optimize power plan and services for gaming", Colors.WHITE)
     print_colored(f"{symbols.BULLET} Software Installer: Bulk install apps using Winget", Colors.WHITE)
+    print_colored(f"{symbols.BULLET} Status Dashboard: All status checks at once, with optional JSON export", Colors.WHITE)
 
     print_colored(f"\n{symbols.GEAR} UPDATE MANAGEMENT:", Colors.BOLD + Colors.CYAN)
     print_colored(f"{symbols.BULLET} Stops Windows Update services (wuauserv, bits, dosvc, UsoSvc)", Colors.WHITE)
@@ -121,7 +139,7 @@ def run_script(script_name):
     """Run a Python script."""
     try:
         print_colored(f"\n{symbols.ROCKET} Launching {script_name}...", Colors.CYAN)
-        subprocess.run([sys.executable, script_name], check=True)
+        subprocess.run([sys.executable, script_name], check=True, stdout=child_stdout())
     except subprocess.CalledProcessError as e:
         print_colored(f"\n{symbols.CROSS} Error running {script_name}: {e}", Colors.RED)
     except FileNotFoundError:
@@ -139,7 +157,7 @@ def run_module(module_path):
             return
 
         print_colored(f"\n{symbols.ROCKET} Launching {module_path}...", Colors.CYAN)
-        subprocess.run([sys.executable, module_path], check=True)
+        subprocess.run([sys.executable, module_path], check=True, stdout=child_stdout())
     except subprocess.CalledProcessError as e:
         print_colored(f"\n{symbols.CROSS} Error running {module_path}: {e}", Colors.RED)
     except FileNotFoundError:
@@ -150,10 +168,15 @@ def run_module(module_path):
 
 def check_admin():
     """Check if running as administrator."""
+    try:
+        # In-process token check; avoids spawning "net session" on every start
+        return bool(ctypes.windll.shell32.IsUserAnAdmin())
+    except AttributeError:
+        pass
     try:
         subprocess.run(['net', 'session'], check=True, capture_output=True)
         return True
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
 def request_admin():
@@ -165,7 +188,7 @@ def request_admin():
                 None,
                 "runas",
                 sys.executable,
-                f'"{os.path.abspath(__file__)}"',
+                " ".join([f'"{os.path.abspath(__file__)}"'] + [f'"{arg}"' for arg in sys.argv[1:]]),
                 None,
                 1
             )
@@ -179,6 +202,9 @@ def request_admin():
 
 def main():
     """Main launcher function."""
+    # Modules are launched by relative path; elevated starts may begin in System32
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
     # Check admin status
     is_admin = check_admin()
 
@@ -210,7 +236,9 @@ def main():
             print_colored(f"\n\n{symbols.WAVE} Goodbye! Thanks for using Windows 11 Update Manager!", Colors.BOLD + Colors.CYAN)
             return
 
+    start_status_prefetch()
     while True:
+        start_status_prefetch(only_if_invalidated=True)
         show_main_menu()
 
         if not is_admin:
@@ -220,7 +248,7 @@ def main():
             print_colored(f"\n{symbols.CHECK} RUNNING AS ADMINISTRATOR", Colors.BOLD + Colors.GREEN)
         
         try:
-            choice = input(f"\n{Colors.BOLD}Enter your choice (1-15, 0 to exit): {Colors.END}").strip()
+            choice = input(f"\n{Colors.BOLD}Enter your choice (1-16, 0 to exit): {Colors.END}").strip()
 
             if choice == '1':
                 run_script("disable_windows_updates.py")
@@ -253,6 +281,8 @@ def main():
             elif choice == '15':
                 show_information()
                 input(f"\n{Colors.CYAN}Press Enter to return to main menu...{Colors.END}")
+            elif choice == '16':
+                run_module("modules/status_dashboard.py")
             elif choice == '99' and not is_admin:
                 print_colored(f"\n{symbols.RECYCLE} Requesting administrator privileges...", Colors.CYAN)
                 print_colored("Please click 'Yes' in the UAC dialog that appears.", Colors.YELLOW)
@@ -266,7 +296,7 @@ def main():
                 print_colored(f"Stay safe and keep your system optimized! {symbols.SHIELD}", Colors.GREEN)
                 break
             else:
-                print_colored(f"\n{symbols.CROSS} Invalid choice! Please enter 1-15 or 0.", Colors.RED)
+                print_colored(f"\n{symbols.CROSS} Invalid choice! Please enter 1-16 or 0.", Colors.RED)
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
         except KeyboardInterrupt:
@@ -13,14 +13,15 @@ import sys
 import os
 import platform
 import ctypes
-import tempfile
 import time
 import winreg
 
 try:
     from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from stream_parse import CommandStream, ansi_encoding, parse_key_value
 except ImportError:
     from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.stream_parse import CommandStream, ansi_encoding, parse_key_value
 
 def check_admin():
     """Check if running as administrator."""
@@ -67,28 +68,22 @@ def run_mas_online_aio():
 def get_activation_status():
     """Get the current Windows activation status (legacy method)."""
     try:
-        with tempfile.NamedTemporaryFile(mode='w+b', delete=False) as tf:
-            tf_path = tf.name
-        
-        try:
-            subprocess.run(['cscript', '//Nologo', 'C:\\Windows\\System32\\slmgr.vbs', '/dli'], 
-                         stdout=open(tf_path, 'wb'), stderr=subprocess.DEVNULL, check=True)
-            with open(tf_path, 'rb') as f:
-                output = f.read().decode('cp1252', errors='replace')
-        finally:
-            if os.path.exists(tf_path): os.unlink(tf_path)
-
         status = {'licensed': False, 'license_status': 'Unknown', 'product_key': None, 'description': None}
-        
-        for line in output.split('\n'):
-            if 'License Status' in line:
-                status['license_status'] = line.split(':')[1].strip() if ':' in line else 'Unknown'
-                if 'Licensed' in status['license_status']:
-                    status['licensed'] = True
-            elif 'Product Key' in line:
-                status['product_key'] = line.split(':')[1].strip() if ':' in line else 'Not available'
-            elif 'Description' in line:
-                status['description'] = line.split(':')[1].strip() if ':' in line else 'Not available'
+        # slmgr.vbs writes "Name: value" lines in the ANSI code page
+        with CommandStream(['cscript', '//Nologo', 'C:\\Windows\\System32\\slmgr.vbs', '/dli'],
+                           encoding=ansi_encoding()) as output:
+            for record in parse_key_value(output, separator=':'):
+                for key, value in record.items():
+                    if 'License Status' in key:
+                        status['license_status'] = value or 'Unknown'
+                        if 'Licensed' in status['license_status']:
+                            status['licensed'] = True
+                    elif 'Product Key' in key:
+                        status['product_key'] = value or 'Not available'
+                    elif 'Description' in key:
+                        status['description'] = value or 'Not available'
+        if output.returncode != 0:
+            raise subprocess.CalledProcessError(output.returncode, 'slmgr.vbs /dli')
 
         return status
     except Exception as e:
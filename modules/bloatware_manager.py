@@ -9,6 +9,7 @@ Year: 2025
 """
 
 import subprocess
+import time
 import winreg
 import os
 import sys
@@ -16,12 +17,22 @@ from pathlib import Path
 import ctypes
 
 try:
-    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
 except ImportError:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
+
+try:
+    from system_queries import iter_appx_inventory, read_registry_value
+    from query_cache import invalidate as invalidate_query_cache
+except ImportError:
+    from modules.system_queries import iter_appx_inventory, read_registry_value
+    from modules.query_cache import invalidate as invalidate_query_cache
+
+APP_NAME_WIDTH = 56
 
 def run_powershell_command(command, description):
     """Run a PowerShell command and handle errors."""
+    start = time.perf_counter()
     try:
         result = subprocess.run(
             ["powershell", "-Command", command], 
@@ -30,11 +41,11 @@ def run_powershell_command(command, description):
             text=True
         )
         if result.returncode == 0:
-            print_success(f"{description}")
+            print_success(f"{description}", target=command, duration_ms=elapsed_ms(start))
         else:
-            print_error(f"{description} - {result.stderr.strip()}")
+            print_error(f"{description} - {result.stderr.strip()}", target=command, duration_ms=elapsed_ms(start))
     except Exception as e:
-        print_error(f"{description} - {str(e)}")
+        print_error(f"{description} - {str(e)}", target=command, duration_ms=elapsed_ms(start))
 
 def remove_windows_apps():
     """Remove Windows 11 bloatware apps."""
@@ -135,8 +146,9 @@ def disable_cortana():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled Cortana: {value_name}")
+                print_success(f"Disabled Cortana: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -168,8 +180,9 @@ def disable_windows_widgets():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled widgets: {value_name}")
+                print_success(f"Disabled widgets: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -203,8 +216,9 @@ def disable_edge_integration():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled Edge integration: {value_name}")
+                print_success(f"Disabled Edge integration: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -241,8 +255,9 @@ def remove_start_menu_suggestions():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled Start Menu suggestion: {value_name}")
+                print_success(f"Disabled Start Menu suggestion: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -297,19 +312,19 @@ def check_installed_apps():
     print_colored(f"\n{symbols.INFO} Checking Installed Windows Apps", Colors.BOLD + Colors.CYAN)
     
     try:
-        command = "Get-AppxPackage | Select-Object Name, Version | Sort-Object Name"
-        result = subprocess.run(
-            ["powershell", "-Command", command], 
-            shell=True, 
-            capture_output=True, 
-            text=True
-        )
-        
-        if result.returncode == 0:
-            print_info("Currently installed Windows apps:")
-            print_colored(result.stdout, Colors.WHITE)
-        else:
-            print_error("Failed to retrieve installed apps")
+        # Rows are printed as PowerShell reports them, so the width can't be measured first
+        width = APP_NAME_WIDTH
+        found = 0
+        for name, version in iter_appx_inventory():
+            if found == 0:
+                print_info("Currently installed Windows apps:")
+                print_colored(f"{'Name'.ljust(width)} Version", Colors.WHITE)
+                print_colored(f"{'----'.ljust(width)} -------", Colors.WHITE)
+            found += 1
+            print_colored(f"{(name or '').ljust(width)} {version or ''}", Colors.WHITE)
+        print_info(f"{found} apps installed")
+    except subprocess.CalledProcessError:
+        print_error("Failed to retrieve installed apps")
     except Exception as e:
         print_error(f"Error checking installed apps: {str(e)}")
 
@@ -340,6 +355,9 @@ def main():
             else:
                 print_error("Invalid choice! Please enter a number between 1-8.")
             
+            if choice in ['1', '2', '3', '4', '5', '6']:
+                invalidate_query_cache()
+
             if choice in ['1', '2', '3', '4', '5', '6', '7']:
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
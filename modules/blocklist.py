@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Domain Blocklists for Windows 11 Update Manager
+Streams hosts-format, plain domain-list and AdBlock-style blocklists (local files or
+http(s) mirrors) line by line, normalises and deduplicates the domains, and writes
+them into a managed block of the hosts file.
+
+Domains are kept as one sorted bytes blob plus an offset array instead of millions of
+Python strings: lines are collected in bounded chunks that are sorted and spilled to
+temporary files, then combined with a k-way merge.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import heapq
+import itertools
+import os
+import re
+import sys
+import tempfile
+import time
+import urllib.request
+from array import array
+
+try:
+    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
+    import dns_cache
+    import hosts_file
+except ImportError:
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
+    from modules import dns_cache, hosts_file
+
+BLOCKLIST_SECTION = "blocklist"
+BLOCKLIST_ADDRESS = "0.0.0.0"  # Fails immediately instead of trying a local connection
+CHUNK_DOMAINS = 250000
+SOURCES_FILE = os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "Win11Manager", "blocklist_sources.txt")
+
+DOMAIN_RE = re.compile(r"^(?=.{1,253}$)(?:[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?\.)+[a-z][a-z0-9-]{0,61}[a-z0-9]$")
+IGNORED_DOMAINS = {"localhost.localdomain", "local", "localhost", "broadcasthost"}
+ADBLOCK_END = re.compile(r"[\^$/|]")
+
+
+def normalize_domain(text):
+    """Return the domain as lower-case ASCII bytes, or None if it is not a blockable name."""
+    domain = text.strip().lower().rstrip(".")
+    if domain.startswith("*."):
+        domain = domain[2:]
+    if not domain.isascii():
+        try:
+            domain = domain.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    if domain in IGNORED_DOMAINS or not DOMAIN_RE.match(domain):
+        return None
+    return domain.encode("ascii")
+
+
+def parse_line(line):
+    """Yield the domains on one blocklist line, whatever the format.
+
+    hosts:    0.0.0.0 ads.example.com tracker.example.com
+    domains:  ads.example.com
+    AdBlock:  ||ads.example.com^   (exceptions, cosmetic and path rules are skipped)
+    """
+    line = line.strip()
+    if not line or line[0] in "#![":
+        return
+    if line.startswith("||"):
+        body = ADBLOCK_END.split(line[2:], 1)[0]
+        rest = line[2 + len(body):]
+        # Only whole-domain rules: "||domain^" optionally followed by options
+        if "*" not in body and (not rest or rest[0] in "^$"):
+            domain = normalize_domain(body)
+            if domain:
+                yield domain
+        return
+    if line.startswith("@@") or "##" in line or "#@#" in line:
+        return
+
+    tokens = line.split("#", 1)[0].split()
+    if len(tokens) == 1:
+        names = tokens
+    elif len(tokens) > 1 and (tokens[0][0].isdigit() or ":" in tokens[0]):
+        names = tokens[1:]  # hosts format: address followed by names
+    else:
+        return
+    for name in names:
+        domain = normalize_domain(name)
+        if domain:
+            yield domain
+
+
+class DomainSet:
+    """Sorted, deduplicated domains in one bytes blob with an offset array.
+
+    About 4 bytes of overhead per domain, instead of a Python object each.
+    """
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets = array("I", [0])
+
+    @classmethod
+    def from_sorted(cls, domains):
+        """Build from sorted bytes, dropping adjacent duplicates."""
+        result = cls()
+        previous = None
+        for domain in domains:
+            if domain != previous:
+                result.blob += domain
+                result.offsets.append(len(result.blob))
+                previous = domain
+        return result
+
+    @classmethod
+    def from_unsorted(cls, domains, chunk_size=CHUNK_DOMAINS):
+        """Build from bytes in any order.
+
+        A sorted run at the start (all of it for a block this tool wrote) is taken as
+        is; the rest is sorted in bounded chunks spilled to disk and merged with it.
+        """
+        result = cls()
+        domains = iter(domains)
+        previous = b""
+        for domain in domains:
+            if domain < previous:
+                return cls._merge(result, itertools.chain([domain], domains), chunk_size)
+            if domain != previous:
+                result.blob += domain
+                result.offsets.append(len(result.blob))
+                previous = domain
+        return result
+
+    @classmethod
+    def _merge(cls, prefix, domains, chunk_size):
+        chunk = []
+        spill_files = []
+        try:
+            for domain in domains:
+                chunk.append(domain)
+                if len(chunk) >= chunk_size:
+                    _spill(chunk, spill_files)
+                    chunk = []
+            chunk = sorted(set(chunk))
+            runs = [(prefix._get(i) for i in range(len(prefix))), chunk] + [_read_spill(spill) for spill in spill_files]
+            return cls.from_sorted(heapq.merge(*runs))
+        finally:
+            for spill in spill_files:
+                spill.close()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _get(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get(i).decode("ascii")
+
+    def __contains__(self, domain):
+        key = domain.lower().encode("ascii", "ignore") if isinstance(domain, str) else domain
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._get(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low < len(self) and self._get(low) == key
+
+    @property
+    def nbytes(self):
+        return len(self.blob) + self.offsets.itemsize * len(self.offsets)
+
+
+def _open_source(source):
+    """Return a binary line iterator for a file path or an http(s) URL."""
+    if source.lower().startswith(("http://", "https://")):
+        return urllib.request.urlopen(source, timeout=60)
+    return open(source, "rb")
+
+
+def _spill(chunk, spill_files):
+    """Sort and deduplicate a chunk and write it to a temporary file."""
+    spill = tempfile.TemporaryFile()
+    spill.writelines(domain + b"\n" for domain in sorted(set(chunk)))
+    spill.seek(0)
+    spill_files.append(spill)
+
+
+def _read_spill(spill):
+    for line in spill:
+        yield line[:-1]
+
+
+def ingest(sources, chunk_size=CHUNK_DOMAINS):
+    """Read every source and return (DomainSet, stats).
+
+    stats holds the lines read, the domains accepted per source and any source errors.
+    Memory is bounded by chunk_size plus the final compact set.
+    """
+    stats = {"lines": 0, "sources": {}, "errors": {}}
+
+    def read_sources():
+        for source in sources:
+            accepted = 0
+            try:
+                with _open_source(source) as stream:
+                    for raw in stream:
+                        stats["lines"] += 1
+                        for domain in parse_line(raw.decode("utf-8", "ignore")):
+                            accepted += 1
+                            yield domain
+            except (OSError, ValueError) as e:
+                stats["errors"][source] = str(e)
+            stats["sources"][source] = accepted
+
+    domains = DomainSet.from_unsorted(read_sources(), chunk_size)
+    stats["domains"] = len(domains)
+    return domains, stats
+
+
+def load_sources():
+    """Return the blocklist sources saved by the last apply."""
+    try:
+        with open(SOURCES_FILE, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def save_sources(sources):
+    try:
+        os.makedirs(os.path.dirname(SOURCES_FILE), exist_ok=True)
+        with open(SOURCES_FILE, "w", encoding="utf-8") as f:
+            f.write("\n".join(sources) + "\n")
+    except OSError:
+        pass
+
+
+def apply_blocklists(sources, hosts_path=hosts_file.HOSTS_PATH):
+    """Ingest the sources and write them into the managed blocklist block of the hosts file.
+
+    Names the user maps in their own hosts entries are left alone. Returns the ingest stats.
+    """
+    print_info(f"Reading {len(sources)} blocklist sources...")
+    start = time.perf_counter()
+    domains, stats = ingest(sources)
+    for source, count in stats["sources"].items():
+        if source in stats["errors"]:
+            print_error(f"{source}: {stats['errors'][source]}")
+        else:
+            print_success(f"{source}: {count} domains", target=source, after=count)
+    print_info(f"{stats['domains']} unique domains from {stats['lines']} lines in "
+               f"{time.perf_counter() - start:.1f}s ({domains.nbytes / (1024 * 1024):.1f} MB in memory)")
+
+    hosts = hosts_file.HostsFile(hosts_path)
+    user_entries = hosts.index
+    hosts.set_section(BLOCKLIST_SECTION, (d for d in domains if d not in user_entries), BLOCKLIST_ADDRESS)
+    if hosts.save():
+        print_success("Hosts file updated with the blocklists", after=stats["domains"],
+                      duration_ms=(time.perf_counter() - start) * 1000)
+        sample = next((d for d in domains if d not in user_entries), None)
+        dns_cache.request_flush("blocklists applied", blocked=[sample] if sample else ())
+    else:
+        print_success("Hosts file already up to date")
+    save_sources(sources)
+    return stats
+
+
+def remove_blocklists(hosts_path=hosts_file.HOSTS_PATH):
+    """Remove the managed blocklist block. Returns how many domains it held."""
+    hosts = hosts_file.HostsFile(hosts_path)
+    removed = sum(1 for _ in hosts.iter_section(BLOCKLIST_SECTION))
+    hosts.discard_section(BLOCKLIST_SECTION)
+    if hosts.save():
+        print_success(f"Removed {removed} blocklist entries from the hosts file")
+        dns_cache.request_flush("blocklists removed")
+    else:
+        print_info("No blocklist entries found in the hosts file")
+    return removed
+
+
+def blocklist_menu():
+    """Ask for blocklist sources and apply them."""
+    print_header("Apply Domain Blocklists")
+    saved = load_sources()
+    if saved:
+        print_info("Saved sources:")
+        for source in saved:
+            print_colored(f"  {symbols.BULLET} {source}", Colors.WHITE)
+    answer = input(f"\n{Colors.BOLD}Files or URLs separated by spaces (Enter to use the saved sources): {Colors.END}").strip()
+    sources = answer.split() if answer else saved
+    if not sources:
+        print_warning("No blocklist sources given.")
+        return
+    apply_blocklists(sources)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--remove":
+        remove_blocklists()
+    elif len(sys.argv) > 1:
+        apply_blocklists([arg for arg in sys.argv[1:] if not arg.startswith("--")])
+    else:
+        blocklist_menu()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cleanup Targets for Windows 11 Update Manager
+Registry of application caches the System Cleaner can empty (browser caches, crash
+dumps, Delivery Optimization, thumbnail caches). Each target knows how to find its
+folders for every user profile and which programs must be closed first.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import csv
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+TARGETS = []
+
+CHROMIUM_CACHE_DIRS = [os.path.join("Cache", "Cache_Data"), "Code Cache", "GPUCache"]
+
+
+def register_target(name, discover, scope="user", processes=(), services=(), retention=None, description=""):
+    """Add a cleanup target.
+
+    discover(profile_dir) returns a list of (label, path) for one user profile
+    (scope="user"), or is called once with None for machine-wide targets
+    (scope="system"). Folders are only cleaned while none of processes (image names)
+    is running; targets that list services must wait for those services to stop.
+    retention is an optional System Cleaner retention rule.
+    """
+    TARGETS.append({
+        'name': name,
+        'discover': discover,
+        'scope': scope,
+        'processes': [p.lower() for p in processes],
+        'services': list(services),
+        'retention': retention,
+        'description': description,
+    })
+
+
+def get_user_profiles():
+    """Return the profile folders under C:\\Users that have an AppData folder."""
+    profile = os.environ.get('USERPROFILE')
+    users_dir = os.path.dirname(profile) if profile else os.path.join(os.environ.get('SystemDrive', 'C:') + os.sep, 'Users')
+    profiles = []
+    try:
+        with os.scandir(users_dir) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False) and os.path.isdir(os.path.join(entry.path, 'AppData')):
+                    profiles.append(entry.path)
+    except OSError:
+        if profile:
+            profiles.append(profile)
+    return profiles
+
+
+def _local_appdata(profile):
+    return os.path.join(profile, 'AppData', 'Local')
+
+
+def _existing(candidates):
+    return [(label, path) for label, path in candidates if os.path.isdir(path)]
+
+
+def _chromium_profiles(user_data):
+    """Browser profile folders (Default, Profile 1, ...) inside a Chromium User Data folder."""
+    try:
+        with os.scandir(user_data) as it:
+            return [entry for entry in it
+                    if entry.is_dir(follow_symlinks=False) and os.path.isfile(os.path.join(entry.path, 'Preferences'))]
+    except OSError:
+        return []
+
+
+def _chromium_discoverer(*vendor_path):
+    def discover(profile):
+        user_data = os.path.join(_local_appdata(profile), *vendor_path, 'User Data')
+        user = os.path.basename(profile)
+        return _existing((f"{user}/{browser_profile.name}/{cache_dir}", os.path.join(browser_profile.path, cache_dir))
+                         for browser_profile in _chromium_profiles(user_data)
+                         for cache_dir in CHROMIUM_CACHE_DIRS)
+    return discover
+
+
+def _discover_firefox(profile):
+    profiles_dir = os.path.join(_local_appdata(profile), 'Mozilla', 'Firefox', 'Profiles')
+    try:
+        with os.scandir(profiles_dir) as it:
+            browser_profiles = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
+    user = os.path.basename(profile)
+    return _existing((f"{user}/{p.name}", os.path.join(p.path, 'cache2')) for p in browser_profiles)
+
+
+def _discover_crash_dumps(profile):
+    if profile is None:
+        system_root = os.environ.get('SystemRoot', 'C:\\Windows')
+        program_data = os.environ.get('ProgramData', 'C:\\ProgramData')
+        return _existing([
+            ("Minidump", os.path.join(system_root, 'Minidump')),
+            ("WER ReportArchive", os.path.join(program_data, 'Microsoft', 'Windows', 'WER', 'ReportArchive')),
+            ("WER ReportQueue", os.path.join(program_data, 'Microsoft', 'Windows', 'WER', 'ReportQueue')),
+        ])
+    return _existing([(os.path.basename(profile), os.path.join(_local_appdata(profile), 'CrashDumps'))])
+
+
+def _discover_delivery_optimization(profile):
+    system_root = os.environ.get('SystemRoot', 'C:\\Windows')
+    return _existing([("Cache", os.path.join(system_root, 'ServiceProfiles', 'NetworkService', 'AppData', 'Local',
+                                             'Microsoft', 'Windows', 'DeliveryOptimization', 'Cache'))])
+
+
+def _discover_thumbnails(profile):
+    return _existing([(os.path.basename(profile),
+                       os.path.join(_local_appdata(profile), 'Microsoft', 'Windows', 'Explorer'))])
+
+
+register_target("Chrome Cache", _chromium_discoverer('Google', 'Chrome'), processes=["chrome.exe"],
+                description="Google Chrome disk, code and GPU caches")
+register_target("Edge Cache", _chromium_discoverer('Microsoft', 'Edge'), processes=["msedge.exe"],
+                description="Microsoft Edge disk, code and GPU caches")
+register_target("Firefox Cache", _discover_firefox, processes=["firefox.exe"],
+                description="Mozilla Firefox disk cache")
+register_target("Crash Dumps", _discover_crash_dumps, description="Application crash dumps (per user)")
+register_target("System Crash Dumps", _discover_crash_dumps, scope="system",
+                description="Kernel minidumps and Windows Error Reporting archives")
+register_target("Delivery Optimization", _discover_delivery_optimization, scope="system", services=["dosvc"],
+                description="Peer-to-peer update download cache")
+register_target("Thumbnail Cache", _discover_thumbnails, retention={"include": ["thumbcache_*.db"]},
+                description="Explorer thumbnail databases (rebuilt on demand)")
+
+
+def get_running_processes():
+    """Return the lower-case image names of all running processes (one tasklist call)."""
+    try:
+        result = subprocess.run('tasklist /fo csv /nh', shell=True, capture_output=True, text=True)
+    except OSError:
+        return set()
+    return {row[0].lower() for row in csv.reader(result.stdout.splitlines()) if row}
+
+
+def discover_targets(names=None, workers=8):
+    """Find the folders of every target (or only the named ones) concurrently.
+
+    Returns a list of {'target', 'root', 'path'} where root is a unique display name,
+    e.g. "Chrome Cache (alice/Default/Code Cache)". Targets are returned in registry
+    order.
+    """
+    targets = [t for t in TARGETS if names is None or t['name'] in names]
+    profiles = get_user_profiles()
+    jobs = [(target, profile) for target in targets
+            for profile in (profiles if target['scope'] == "user" else [None])]
+
+    def run(job):
+        target, profile = job
+        try:
+            return target, target['discover'](profile)
+        except OSError:
+            return target, []
+
+    found = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for target, paths in pool.map(run, jobs):
+            for label, path in paths:
+                found.append({'target': target, 'root': f"{target['name']} ({label})", 'path': path})
+    return found
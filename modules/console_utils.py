@@ -11,6 +11,9 @@ Year: 2025
 import sys
 import os
 import codecs
+import json
+import threading
+import time
 
 # 1. COLORAMA & ENCODING SETUP
 OUTPUT_ENCODING = "utf-8"
@@ -18,8 +21,11 @@ OUTPUT_ENCODING = "utf-8"
 if sys.platform == "win32":
     # Encourage UTF-8 everywhere
     os.environ["PYTHONIOENCODING"] = OUTPUT_ENCODING
+    # Switch the console to UTF-8 in-process (spawning "chcp" cost a shell start on every import)
     try:
-        os.system("chcp 65001 >nul 2>&1")
+        import ctypes
+        ctypes.windll.kernel32.SetConsoleOutputCP(65001)
+        ctypes.windll.kernel32.SetConsoleCP(65001)
     except Exception:
         pass
 
@@ -139,6 +145,8 @@ class Symbols:
     @property
     def DOWNLOAD(self): return self._pick("📦", "[PKG]")
     @property
+    def SEARCH(self): return self._pick("🔍", "[?]")
+    @property
     def BULLET(self): return self._pick("•", "-")
     @property
     def PROMPT(self): return self._pick("👉", ">")
@@ -148,39 +156,141 @@ class Symbols:
 matches = Symbols()
 
 
-# 4. PRINT HELPERS
+# 4. STRUCTURED OUTPUT (JSON LINES)
+# "--jsonl [file]" or WIN11_JSONL=<file|-> streams one JSON object per step.
+# The variable is inherited by module processes started from the launcher.
+if "--jsonl" in sys.argv:
+    _index = sys.argv.index("--jsonl")
+    _target = sys.argv[_index + 1] if _index + 1 < len(sys.argv) and not sys.argv[_index + 1].startswith("-") else "-"
+    os.environ["WIN11_JSONL"] = os.path.abspath(_target) if _target != "-" else "-"
+
+
+def _reserve_stdout():
+    """Keep the real stdout for events only and point everything else at stderr.
+
+    Prompts, prints and the output of child processes (os.system, subprocess) then
+    go to stderr and can't corrupt the JSON Lines stream. Returns the event file.
+    """
+    sys.stdout.flush()
+    events_fd = os.dup(1)
+    os.dup2(2, 1)
+    if sys.platform == "win32":
+        # Child processes inherit the standard handle, not the CRT descriptor
+        try:
+            import ctypes
+            import msvcrt
+            ctypes.windll.kernel32.SetStdHandle(-11, msvcrt.get_osfhandle(1))  # STD_OUTPUT_HANDLE
+        except Exception:
+            pass
+    sys.stdout = sys.stderr
+    return os.fdopen(events_fd, "w", encoding="utf-8", buffering=1)
+
+
+class EventStream:
+    """Writes step events as JSON Lines, one flushed line per event (nothing is buffered)."""
+
+    def __init__(self, target):
+        self.target = target
+        self.operation = os.path.splitext(os.path.basename(sys.argv[0] or "interactive"))[0]
+        self._lock = threading.Lock()
+        if target == "-":
+            self._file = _reserve_stdout()
+        else:
+            self._file = open(target, "a", encoding="utf-8", buffering=1)
+
+    @property
+    def to_stdout(self):
+        return self.target == "-"
+
+    def emit(self, status, action, target=None, before=None, after=None, duration_ms=None, operation=None):
+        event = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "operation": operation or self.operation,
+            "target": target,
+            "action": action,
+            "before": before,
+            "after": after,
+            "status": status,
+            "duration_ms": round(duration_ms, 1) if duration_ms is not None else None,
+        }
+        line = json.dumps(event, default=str, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+events = EventStream(os.environ["WIN11_JSONL"]) if os.environ.get("WIN11_JSONL") else None
+
+
+def child_stdout():
+    """stdout for a child module process: the event stream when events go to stdout, else inherited."""
+    return events._file if events and events.to_stdout else None
+
+
+def set_operation(name):
+    """Set the operation name attached to the following events."""
+    if events:
+        events.operation = name
+
+
+# 5. PRINT HELPERS
 def print_colored(text, color=Colors.WHITE):
     """Print text with color."""
+    # Keep stdout pure JSON Lines when events are streamed there
+    stream = sys.stderr if events and events.to_stdout else sys.stdout
     try:
-        print(f"{color}{text}", flush=True)
+        print(f"{color}{text}", file=stream, flush=True)
     except Exception:
         try:
-            print(text.encode("ascii", "replace").decode("ascii"))
+            print(text.encode("ascii", "replace").decode("ascii"), file=stream)
         except Exception:
             pass
 
 
 def print_header(title):
+    set_operation(title)
     print_colored(f"\n{'=' * 60}", Colors.CYAN)
     print_colored(f"{matches.GEAR}  {title}", Colors.BOLD + Colors.CYAN)
     print_colored(f"{'=' * 60}", Colors.CYAN)
 
 
-def print_success(message):
-    print_colored(f"{matches.CHECK} {message}", Colors.GREEN)
+_RENDERERS = {
+    "success": lambda message: print_colored(f"{matches.CHECK} {message}", Colors.GREEN),
+    "error": lambda message: print_colored(f"{matches.CROSS} {message}", Colors.RED),
+    "warning": lambda message: print_colored(f"{matches.WARNING}  {message}", Colors.YELLOW),
+    "info": lambda message: print_colored(f"{matches.INFO}  {message}", Colors.BLUE),
+}
+
+
+def report(status, message, **fields):
+    """Record one step: emit it as an event (when enabled) and render it on the console."""
+    if events:
+        events.emit(status, message, **fields)
+    _RENDERERS.get(status, _RENDERERS["info"])(message)
+
+
+def print_success(message, **fields):
+    report("success", message, **fields)
+
+
+def print_error(message, **fields):
+    report("error", message, **fields)
 
 
-def print_error(message):
-    print_colored(f"{matches.CROSS} {message}", Colors.RED)
+def print_warning(message, **fields):
+    report("warning", message, **fields)
 
 
-def print_warning(message):
-    print_colored(f"{matches.WARNING}  {message}", Colors.YELLOW)
+def print_info(message, **fields):
+    report("info", message, **fields)
 
 
-def print_info(message):
-    print_colored(f"{matches.INFO}  {message}", Colors.BLUE)
+def elapsed_ms(start):
+    """Milliseconds since a time.perf_counter() start value."""
+    return (time.perf_counter() - start) * 1000
 
 
 def clear_screen():
+    if events and events.to_stdout:
+        return
     os.system("cls" if os.name == "nt" else "clear")
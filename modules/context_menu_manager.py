@@ -76,21 +76,29 @@ def enable_modern_context_menu():
     except Exception as e:
         print_error(f"Failed to restore Modern Context Menu: {e}")
 
-def check_status():
-    """Check which menu is currently active."""
-    print_header("Checking Context Menu Status")
+def get_context_menu_style():
+    """Return "Classic", "Modern" or "Unknown" without printing anything."""
     key_path = r"Software\Classes\CLSID\{86ca1aa0-34aa-4e8b-a509-50c905bae2a2}\InprocServer32"
     try:
         key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path)
         winreg.CloseKey(key)
-        print_colored("Current Status: CLASSIC (Windows 10 Style)", Colors.GREEN)
         return "Classic"
     except FileNotFoundError:
-        print_colored("Current Status: MODERN (Windows 11 Style)", Colors.BLUE)
         return "Modern"
+
+def check_status():
+    """Check which menu is currently active."""
+    print_header("Checking Context Menu Status")
+    try:
+        style = get_context_menu_style()
     except Exception as e:
         print_error(f"Error checking status: {e}")
         return "Unknown"
+    if style == "Classic":
+        print_colored("Current Status: CLASSIC (Windows 10 Style)", Colors.GREEN)
+    else:
+        print_colored("Current Status: MODERN (Windows 11 Style)", Colors.BLUE)
+    return style
 
 def show_menu():
     """Display the menu."""
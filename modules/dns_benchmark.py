@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+DNS Resolver Benchmark for Windows 11 Update Manager
+Sends the same set of queries to every candidate resolver at once (asyncio UDP) and
+compares median and tail latency, timeouts, and cached against uncached lookups.
+
+Cached lookups repeat popular names the resolver has just been asked for; uncached
+lookups use random subdomains of the same sites, so the resolver has to ask the
+authoritative servers.
+
+Usage:
+    python dns_benchmark.py --stub [--rounds 5] [--timeout 2]
+    (python dns_manager.py --benchmark [--apply] tests the real providers)
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import asyncio
+import random
+import string
+import sys
+import time
+
+try:
+    from console_utils import Colors, print_colored, print_header, print_success, print_error, print_info
+    import dns_wire
+    from dns_forwarder import UpstreamClient, parse_endpoint, percentile, start_stub
+except ImportError:
+    from modules.console_utils import Colors, print_colored, print_header, print_success, print_error, print_info
+    from modules import dns_wire
+    from modules.dns_forwarder import UpstreamClient, parse_endpoint, percentile, start_stub
+
+DEFAULT_NAMES = [
+    "www.google.com", "www.microsoft.com", "www.cloudflare.com", "www.wikipedia.org", "www.amazon.com",
+    "www.github.com", "www.youtube.com", "www.bing.com", "www.office.com", "www.apple.com",
+]
+DEFAULT_ROUNDS = 5
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_CONCURRENCY = 16
+# Resolvers that lose more queries than this are never recommended
+MAX_TIMEOUT_RATE = 0.1
+
+
+def _random_label(length=10):
+    return "".join(random.choices(string.ascii_lowercase + string.digits, k=length))
+
+
+def _summary(latencies):
+    return {
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'samples': len(latencies),
+    }
+
+
+async def _measure(resolver, names, rounds, timeout, concurrency):
+    """Benchmark one resolver. Returns its result dict."""
+    host, port = parse_endpoint(resolver['address'])
+    samples = {'cached': [], 'uncached': []}
+    counts = {'sent': 0, 'timeouts': 0, 'errors': 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(client, name, kind):
+        async with semaphore:
+            counts['sent'] += 1
+            start = time.perf_counter()
+            try:
+                await client.query(dns_wire.build_query(name), timeout)
+            except asyncio.TimeoutError:
+                counts['timeouts'] += 1
+                return
+            except OSError:
+                counts['errors'] += 1
+                return
+            samples[kind].append((time.perf_counter() - start) * 1000)
+
+    try:
+        client = await UpstreamClient(host, port).connect()
+    except OSError:
+        counts['errors'] = counts['sent'] = 1
+    else:
+        try:
+            # Make sure the popular names are in the resolver's cache (not measured)
+            await asyncio.gather(*(client.query(dns_wire.build_query(name), timeout) for name in names),
+                                 return_exceptions=True)
+            for _ in range(rounds):
+                jobs = [one(client, name, 'cached') for name in names]
+                jobs += [one(client, f"{_random_label()}.{name.split('.', 1)[-1]}", 'uncached') for name in names]
+                random.shuffle(jobs)
+                await asyncio.gather(*jobs)
+        finally:
+            client.close()
+
+    cached = _summary(samples['cached'])
+    uncached = _summary(samples['uncached'])
+    failed = counts['timeouts'] + counts['errors']
+    timeout_rate = failed / counts['sent'] if counts['sent'] else 1.0
+    if cached['p50'] is None or uncached['p50'] is None:
+        score = float('inf')
+    else:
+        # Typical browsing mixes both; every lost query costs a full timeout
+        score = (cached['p50'] + uncached['p50']) / 2 + timeout_rate * timeout * 1000
+    return dict(resolver, cached=cached, uncached=uncached, timeout_rate=timeout_rate, score=score, **counts)
+
+
+async def benchmark_async(resolvers, names=None, rounds=DEFAULT_ROUNDS, timeout=DEFAULT_TIMEOUT,
+                          concurrency=DEFAULT_CONCURRENCY):
+    """Benchmark all resolvers concurrently. Returns their results, fastest first.
+
+    resolvers is a list of {'name', 'address'} dicts; address may include a port.
+    """
+    names = names or DEFAULT_NAMES
+    results = await asyncio.gather(*(_measure(r, names, rounds, timeout, concurrency) for r in resolvers))
+    return sorted(results, key=lambda r: r['score'])
+
+
+def run_benchmark(resolvers, names=None, rounds=DEFAULT_ROUNDS, timeout=DEFAULT_TIMEOUT,
+                  concurrency=DEFAULT_CONCURRENCY):
+    return asyncio.run(benchmark_async(resolvers, names, rounds, timeout, concurrency))
+
+
+def pick_pair(results):
+    """Return (primary, secondary) results, preferring a secondary from another provider.
+
+    Either may be None when too few resolvers answered reliably.
+    """
+    usable = [r for r in results if r['score'] != float('inf') and r['timeout_rate'] <= MAX_TIMEOUT_RATE]
+    if not usable:
+        return None, None
+    primary = usable[0]
+    others = usable[1:]
+    secondary = next((r for r in others if r['name'] != primary['name']), others[0] if others else None)
+    return primary, secondary
+
+
+def _ms(value):
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def print_results(results):
+    """Print the results table, fastest first."""
+    print_colored(f"\n  {'Resolver':<28} {'Cached p50/p95/p99 ms':>24} {'Uncached p50/p95/p99 ms':>26} {'Lost':>6}",
+                  Colors.BOLD)
+    for r in results:
+        label = f"{r['name']} ({r['address']})"
+        cached = "/".join(_ms(r['cached'][k]) for k in ('p50', 'p95', 'p99'))
+        uncached = "/".join(_ms(r['uncached'][k]) for k in ('p50', 'p95', 'p99'))
+        color = Colors.RED if r['timeout_rate'] > MAX_TIMEOUT_RATE else Colors.WHITE
+        print_colored(f"  {label:<28} {cached:>24} {uncached:>26} {r['timeout_rate']:>6.0%}", color)
+
+
+def report_recommendation(results):
+    """Print the recommended pair. Returns (primary, secondary) results."""
+    primary, secondary = pick_pair(results)
+    if primary is None:
+        print_error("No resolver answered reliably.")
+        return None, None
+    text = f"{primary['name']} ({primary['address']})"
+    if secondary:
+        text += f" + {secondary['name']} ({secondary['address']})"
+    print_success(f"Fastest pair: {text}", target="dns", after=[primary['address']] + ([secondary['address']] if secondary else []))
+    return primary, secondary
+
+
+async def _stub_demo(rounds, timeout):
+    """Benchmark local stub resolvers with injected delays and loss."""
+    stubs = [("Fast stub", 0.002, 0.0), ("Medium stub", 0.015, 0.0), ("Slow stub", 0.060, 0.0),
+             ("Lossy stub", 0.005, 0.3)]
+    resolvers = []
+    transports = []
+    for name, delay, loss in stubs:
+        transport, _, port = await start_stub(delay, loss=loss)
+        transports.append(transport)
+        resolvers.append({'name': name, 'address': f"127.0.0.1:{port}"})
+    try:
+        return await benchmark_async(resolvers, rounds=rounds, timeout=timeout)
+    finally:
+        for transport in transports:
+            transport.close()
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(flag, default):
+        return type(default)(args[args.index(flag) + 1]) if flag in args[:-1] else default
+
+    rounds = option("--rounds", DEFAULT_ROUNDS)
+    timeout = option("--timeout", 0.5 if "--stub" in args else DEFAULT_TIMEOUT)
+    if "--stub" not in args:
+        print_info("Use 'python dns_manager.py --benchmark' to test the real DNS providers.")
+        return
+    print_header("DNS Benchmark (local stub resolvers)")
+    results = asyncio.run(_stub_demo(rounds, timeout))
+    print_results(results)
+    report_recommendation(results)
+
+
+if __name__ == "__main__":
+    main()
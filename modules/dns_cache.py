@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+DNS Cache Flushing for Windows 11 Update Manager
+Modules ask for a resolver cache flush whenever they change DNS servers or the hosts
+file; the requests are coalesced so the cache is flushed once per batch:
+
+    with dns_cache.batch():
+        set_dns(...)                          # request_flush() inside
+        hosts.save(); request_flush(...)
+    # flushed once here, then verified
+
+Outside a batch a request is debounced (DEBOUNCE_SECONDS after the last request) and
+any request still pending when the process exits is flushed by an atexit hook. The
+flush calls DnsFlushResolverCache directly and only spawns "ipconfig /flushdns" if
+that API is unavailable.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import atexit
+import ctypes
+import socket
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from console_utils import print_success, print_error, print_warning
+except ImportError:
+    from modules.console_utils import print_success, print_error, print_warning
+
+DEBOUNCE_SECONDS = 1.0
+MAX_VERIFY_NAMES = 3
+SINKHOLE_ADDRESSES = {"127.0.0.1", "0.0.0.0", "::1", "::"}
+
+_lock = threading.RLock()
+_pending = False
+_reasons = []
+_checks = {}       # name -> True if it should now be blocked, False if it should resolve normally
+_batch_depth = 0
+_timer = None
+
+
+def flush_now():
+    """Flush the resolver cache immediately. Returns (ok, method)."""
+    try:
+        if ctypes.windll.dnsapi.DnsFlushResolverCache():
+            return True, "DnsFlushResolverCache"
+    except (AttributeError, OSError):
+        pass  # Not on Windows, or dnsapi unavailable
+    try:
+        result = subprocess.run('ipconfig /flushdns', shell=True, capture_output=True, text=True)
+        return result.returncode == 0, "ipconfig /flushdns"
+    except OSError:
+        return False, "ipconfig /flushdns"
+
+
+def request_flush(reason=None, blocked=(), unblocked=()):
+    """Ask for a flush. Cheap to call any number of times.
+
+    blocked/unblocked name domains whose resolution is checked after the flush: blocked
+    names should resolve to a sinkhole address, unblocked ones to something else.
+    """
+    global _pending, _timer
+    with _lock:
+        _pending = True
+        if reason and reason not in _reasons:
+            _reasons.append(reason)
+        for name in blocked:
+            _checks[name.lower()] = True
+        for name in unblocked:
+            _checks[name.lower()] = False
+        if _timer:
+            _timer.cancel()
+            _timer = None
+        if _batch_depth:
+            return  # The batch flushes when it ends
+        _timer = threading.Timer(DEBOUNCE_SECONDS, flush_pending)
+        _timer.daemon = True
+        _timer.start()
+
+
+def flush_pending():
+    """Run the pending flush (if any) now, then verify it. Returns True if the cache was flushed."""
+    global _pending, _timer
+    with _lock:
+        if _timer:
+            _timer.cancel()
+            _timer = None
+        if not _pending:
+            return False
+        reasons = list(_reasons)
+        checks = dict(list(_checks.items())[:MAX_VERIFY_NAMES])
+        _pending = False
+        _reasons.clear()
+        _checks.clear()
+
+    start = time.perf_counter()
+    ok, method = flush_now()
+    duration_ms = (time.perf_counter() - start) * 1000
+    if not ok:
+        print_error(f"Failed to flush the DNS cache ({method})", target="dns-cache")
+        return False
+    print_success(f"DNS cache flushed once for: {', '.join(reasons) or 'pending changes'}",
+                  target="dns-cache", after=method, duration_ms=duration_ms)
+    _verify(checks)
+    return True
+
+
+def _resolve(name):
+    try:
+        return {info[4][0] for info in socket.getaddrinfo(name, None, proto=socket.IPPROTO_TCP)}
+    except (OSError, UnicodeError):
+        return None
+
+
+def _verify(checks):
+    """Resolve each checked name and warn when the result doesn't match the change."""
+    for name, should_block in checks.items():
+        addresses = _resolve(name)
+        if addresses is None:
+            if not should_block:
+                print_warning(f"{name} does not resolve after the DNS change", target=name)
+            continue
+        sinkholed = addresses <= SINKHOLE_ADDRESSES
+        if sinkholed != should_block:
+            state = "still blocked" if sinkholed else "still resolves to " + ", ".join(sorted(addresses))
+            print_warning(f"{name} is {state} after the flush", target=name)
+
+
+@contextmanager
+def batch():
+    """Coalesce every flush requested inside the block into one flush at its end."""
+    global _batch_depth
+    with _lock:
+        _batch_depth += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _batch_depth -= 1
+            outermost = _batch_depth == 0
+        if outermost:
+            flush_pending()
+
+
+atexit.register(flush_pending)
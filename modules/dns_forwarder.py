@@ -0,0 +1,652 @@
+#!/usr/bin/env python3
+"""
+Local DNS Forwarder for Windows 11 Update Manager
+A small caching DNS forwarder on 127.0.0.1 (UDP and TCP). Answers are kept in an
+LRU cache that honours record TTLs, and blocked update/telemetry domains (and their
+subdomains) are answered locally with 0.0.0.0, so huge hosts files aren't needed.
+
+Usage:
+    python dns_forwarder.py [--listen 127.0.0.1] [--port 53] [--upstream 1.1.1.1 8.8.8.8]
+                            [--no-blocklist] [--benchmark]
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import asyncio
+import os
+import random
+import secrets
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+try:
+    from console_utils import Colors, print_colored, print_header, print_success, print_error, print_warning, print_info
+    import dns_wire
+except ImportError:
+    from modules.console_utils import Colors, print_colored, print_header, print_success, print_error, print_warning, print_info
+    from modules import dns_wire
+
+DEFAULT_LISTEN = "127.0.0.1"
+DEFAULT_PORT = 53
+DEFAULT_UPSTREAMS = ["1.1.1.1", "8.8.8.8"]
+CACHE_SIZE = 10000
+MAX_TTL = 86400
+NEGATIVE_TTL = 60
+UPSTREAM_TIMEOUT = 2.0
+SINKHOLE_ADDRESSES = ("0.0.0.0", "::")
+SINKHOLE_TTL = 300
+RECEIVE_BUFFER = 1 << 20  # Bursts of queries overflow the small default UDP buffer on Windows
+BENCH_RETRY_TIMEOUT = 0.25  # A benchmark query lost on the loopback is resent after this
+BENCH_ATTEMPTS = 4
+PID_FILE = os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "Win11Manager", "dns_forwarder.pid")
+# Answered locally so callers can check that the forwarder is up
+PROBE_NAME = "forwarder.win11-manager.invalid"
+
+
+def _enlarge_receive_buffer(transport):
+    sock = transport.get_extra_info("socket")
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+    except (OSError, AttributeError):
+        pass
+
+
+def parse_endpoint(text, default_port=53):
+    """'1.1.1.1', '127.0.0.1:5353' or '[::1]:53' -> (host, port)."""
+    if text.startswith("["):
+        host, _, port = text[1:].partition("]")
+        return host, int(port.lstrip(":") or default_port)
+    if text.count(":") == 1:
+        host, port = text.split(":")
+        return host, int(port)
+    return text, default_port
+
+
+class SuffixTrie:
+    """Domain set that also matches every subdomain of its entries.
+
+    Labels are stored right to left, so "microsoft.com" blocks "update.microsoft.com".
+    """
+
+    END = ""
+
+    def __init__(self, domains=()):
+        self.root = {}
+        self.size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain):
+        node = self.root
+        for label in reversed(domain.lower().rstrip(".").split(".")):
+            node = node.setdefault(label, {})
+        if self.END not in node:
+            node[self.END] = True
+            self.size += 1
+
+    def matches(self, name):
+        node = self.root
+        for label in reversed(name.lower().rstrip(".").split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self.END in node:
+                return True
+        return False
+
+    def __len__(self):
+        return self.size
+
+
+class Sinkhole:
+    """Blocked names: a suffix trie for short lists plus compact DomainSets for large
+    blocklists (checked one suffix at a time with binary search)."""
+
+    def __init__(self, trie=None, domain_sets=()):
+        self.trie = trie or SuffixTrie()
+        self.domain_sets = list(domain_sets)
+
+    def blocks(self, name):
+        if self.trie.matches(name):
+            return True
+        if self.domain_sets:
+            labels = name.lower().rstrip(".").split(".")
+            for i in range(len(labels) - 1):
+                suffix = ".".join(labels[i:])
+                if any(suffix in domains for domains in self.domain_sets):
+                    return True
+        return False
+
+    def __len__(self):
+        return len(self.trie) + sum(len(domains) for domains in self.domain_sets)
+
+
+def load_sinkhole(use_blocklists=True):
+    """Build the sinkhole from the hosts sections we manage.
+
+    The blocklist block is read from the hosts file as it is on disk (nothing is
+    downloaded), into a compact DomainSet.
+    """
+    try:
+        import hosts_file
+        import blocklist
+    except ImportError:
+        from modules import hosts_file, blocklist
+
+    trie = SuffixTrie()
+    hosts = hosts_file.HostsFile()
+    for section in hosts.sections:
+        if section != blocklist.BLOCKLIST_SECTION:
+            for domain in hosts.section(section):
+                trie.add(domain)
+
+    domain_sets = []
+    if use_blocklists and blocklist.BLOCKLIST_SECTION in hosts.sections:
+        domains = hosts.iter_section(blocklist.BLOCKLIST_SECTION)
+        domain_sets.append(blocklist.DomainSet.from_unsorted(domain.encode("ascii", "ignore") for domain in domains))
+    return Sinkhole(trie, domain_sets)
+
+
+class AnswerCache:
+    """LRU cache of upstream responses that expires entries by their smallest TTL.
+
+    Responses are returned with their TTLs counted down by the time spent in the cache.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()  # key -> (stored, expires, response, ttl offsets)
+
+    def get(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored, expires, response, offsets = entry
+        if now >= expires:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return dns_wire.with_ttls(response, offsets, now - stored)
+
+    def put(self, key, response, now):
+        rcode = dns_wire.get_rcode(response)
+        if rcode not in (dns_wire.RCODE_NOERROR, dns_wire.RCODE_NXDOMAIN) or dns_wire.is_truncated(response):
+            return
+        try:
+            offsets = dns_wire.ttl_offsets(response)
+        except (ValueError, struct.error):
+            return
+        ttl = min([t for _, t in offsets], default=NEGATIVE_TTL)
+        ttl = min(ttl, MAX_TTL if offsets else NEGATIVE_TTL)
+        if ttl <= 0:
+            return
+        self.entries[key] = (now, now + ttl, response, offsets)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def _question(message):
+    """(name, type, class) of a message's question, for matching replies to queries."""
+    name, qtype, qclass, _ = dns_wire.parse_question(message)
+    return name.lower().rstrip("."), qtype, qclass
+
+
+def _is_reply(response, query_id, question):
+    try:
+        return dns_wire.get_id(response) == query_id and _question(response) == question
+    except (ValueError, struct.error):
+        return False
+
+
+class _Exchange(asyncio.DatagramProtocol):
+    """One query on its own socket. Only a reply with its id and question is accepted."""
+
+    def __init__(self, query_id, question, future):
+        self.query_id = query_id
+        self.question = question
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done() and _is_reply(data, self.query_id, self.question):
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        # e.g. ICMP port unreachable: fail fast so the next upstream is tried
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+class UpstreamClient:
+    """Sends queries to one resolver.
+
+    Every UDP query goes out from a fresh socket on a random ephemeral port with a random
+    id, and a reply only counts if it comes from the resolver and repeats the question,
+    so a spoofed answer has to guess the port as well as the id.
+    """
+
+    def __init__(self, host, port=53):
+        self.host = host
+        self.port = port
+
+    async def connect(self):
+        return self
+
+    async def query(self, message, timeout=UPSTREAM_TIMEOUT):
+        """Send message and return the response (with the upstream's id)."""
+        question = _question(message)
+        query_id = secrets.randbits(16)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # A connected socket only receives datagrams from the resolver's address and port
+        transport, _ = await loop.create_datagram_endpoint(lambda: _Exchange(query_id, question, future),
+                                                           remote_addr=(self.host, self.port))
+        try:
+            transport.sendto(dns_wire.set_id(message, query_id))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            transport.close()
+
+    async def query_tcp(self, message, timeout=UPSTREAM_TIMEOUT):
+        """Send message over TCP (for truncated UDP answers)."""
+        question = _question(message)
+        query_id = secrets.randbits(16)
+
+        async def exchange():
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                request = dns_wire.set_id(message, query_id)
+                writer.write(struct.pack("!H", len(request)) + request)
+                await writer.drain()
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                response = await reader.readexactly(length)
+            finally:
+                writer.close()
+            if not _is_reply(response, query_id, question):
+                raise ValueError("TCP answer does not match the query")
+            return response
+        return await asyncio.wait_for(exchange(), timeout)
+
+    def close(self):
+        pass  # Sockets are per query
+
+
+class _UdpServer(asyncio.DatagramProtocol):
+    def __init__(self, forwarder):
+        self.forwarder = forwarder
+
+    def connection_made(self, transport):
+        self.transport = transport
+        _enlarge_receive_buffer(transport)
+
+    def datagram_received(self, data, addr):
+        self.forwarder.spawn(self._answer(data, addr))
+
+    async def _answer(self, data, addr):
+        response = await self.forwarder.resolve(data)
+        if response:
+            self.transport.sendto(response, addr)
+
+
+class DnsForwarder:
+    """Caching, sinkholing forwarder.
+
+    forwarder = DnsForwarder(["1.1.1.1"], sinkhole)
+    await forwarder.start("127.0.0.1", 53)
+    """
+
+    def __init__(self, upstreams=None, sinkhole=None, cache_size=CACHE_SIZE):
+        self.upstream_specs = [parse_endpoint(u) for u in (upstreams or DEFAULT_UPSTREAMS)]
+        self.upstreams = []
+        self.sinkhole = sinkhole or Sinkhole()
+        self.cache = AnswerCache(cache_size)
+        self.inflight = {}
+        self.servers = []
+        self.tasks = set()  # Keeps running tasks referenced until they finish
+        self.stats = {"queries": 0, "cache_hits": 0, "upstream": 0, "blocked": 0, "failures": 0}
+
+    async def start(self, host=DEFAULT_LISTEN, port=DEFAULT_PORT):
+        """Open the upstream sockets and listen on host:port (UDP and TCP). Returns the port."""
+        loop = asyncio.get_running_loop()
+        self.upstreams = [await UpstreamClient(h, p).connect() for h, p in self.upstream_specs]
+        transport, _ = await loop.create_datagram_endpoint(lambda: _UdpServer(self), local_addr=(host, port))
+        port = transport.get_extra_info("sockname")[1]
+        tcp = await asyncio.start_server(self._serve_tcp, host, port)
+        self.servers = [transport, tcp]
+        return port
+
+    def spawn(self, coroutine):
+        """Run coroutine as a task that is kept alive and whose errors are reported."""
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print_error(f"DNS forwarder task failed: {task.exception()!r}")
+
+    def close(self):
+        for task in list(self.tasks):
+            task.cancel()
+        for server in self.servers:
+            server.close()
+        for upstream in self.upstreams:
+            upstream.close()
+
+    async def _serve_tcp(self, reader, writer):
+        try:
+            while True:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+                response = await self.resolve(await reader.readexactly(length))
+                if response:
+                    writer.write(struct.pack("!H", len(response)) + response)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def resolve(self, query):
+        """Return the response bytes for a raw query, or None for garbage."""
+        try:
+            client_id = dns_wire.get_id(query)
+            name, qtype, qclass, _ = dns_wire.parse_question(query)
+        except (ValueError, struct.error):
+            return None
+        self.stats["queries"] += 1
+
+        if name.lower() == PROBE_NAME:
+            return dns_wire.build_response(query, addresses=["127.0.0.1"], ttl=0)
+        if self.sinkhole.blocks(name):
+            self.stats["blocked"] += 1
+            return dns_wire.build_response(query, addresses=SINKHOLE_ADDRESSES, ttl=SINKHOLE_TTL)
+
+        key = (name.lower(), qtype, qclass, dns_wire.has_edns(query))
+        now = time.monotonic()
+        cached = self.cache.get(key, now)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return dns_wire.set_id(cached, client_id)
+
+        # Identical queries that arrive while one is in flight share its answer
+        pending = self.inflight.get(key)
+        if pending is None:
+            pending = self.spawn(self._forward(query, key))
+            self.inflight[key] = pending
+            pending.add_done_callback(lambda _: self.inflight.pop(key, None))
+        try:
+            response = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            response = None  # Reported by the task's done callback
+        if response is None:
+            self.stats["failures"] += 1
+            return dns_wire.build_response(query, rcode=dns_wire.RCODE_SERVFAIL)
+        return dns_wire.set_id(response, client_id)
+
+    async def _forward(self, query, key):
+        """Ask each upstream in turn; retry over TCP when the UDP answer is truncated."""
+        for upstream in self.upstreams:
+            try:
+                response = await upstream.query(query)
+                if dns_wire.is_truncated(response):
+                    response = await upstream.query_tcp(query)
+            except (asyncio.TimeoutError, OSError, ValueError, struct.error, asyncio.IncompleteReadError):
+                continue
+            self.stats["upstream"] += 1
+            self.cache.put(key, response, time.monotonic())
+            return response
+        return None
+
+
+def is_forwarder_running(host=DEFAULT_LISTEN, port=DEFAULT_PORT, timeout=0.5):
+    """True if a forwarder answers the probe name on host:port."""
+    query = dns_wire.build_query(PROBE_NAME, query_id=random.getrandbits(16))
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(timeout)
+            sock.sendto(query, (host, port))
+            response = sock.recv(512)
+        return dns_wire.parse_addresses(response) == ["127.0.0.1"]
+    except (OSError, ValueError, struct.error):
+        return False
+
+
+def _write_pid_file():
+    try:
+        os.makedirs(os.path.dirname(PID_FILE), exist_ok=True)
+        with open(PID_FILE, "w") as f:
+            f.write(str(os.getpid()))
+    except OSError:
+        pass
+
+
+def _remove_pid_file():
+    try:
+        with open(PID_FILE) as f:
+            if f.read().strip() != str(os.getpid()):
+                return  # Another forwarder owns it now
+        os.remove(PID_FILE)
+    except OSError:
+        pass
+
+
+def stop_forwarder(host=DEFAULT_LISTEN, port=DEFAULT_PORT, timeout=5.0):
+    """Stop the background forwarder started from the DNS Switcher.
+
+    The process is found through its PID file and only killed while a forwarder
+    still answers the probe name. Returns True if a forwarder was stopped.
+    """
+    try:
+        with open(PID_FILE) as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        return False
+    if not is_forwarder_running(host, port):
+        try:
+            os.remove(PID_FILE)  # Left behind by a forwarder that was killed
+        except OSError:
+            pass
+        return False
+
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/f", "/pid", str(pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            return False
+    deadline = time.monotonic() + timeout
+    while is_forwarder_running(host, port):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.1)
+    try:
+        os.remove(PID_FILE)
+    except OSError:
+        pass
+    return True
+
+
+async def _serve(host, port, upstreams, use_blocklists):
+    sinkhole = load_sinkhole(use_blocklists)
+    forwarder = DnsForwarder(upstreams, sinkhole)
+    port = await forwarder.start(host, port)
+    _write_pid_file()
+    print_success(f"DNS forwarder listening on {host}:{port} (UDP/TCP)")
+    print_info(f"Upstreams: {', '.join(f'{h}:{p}' for h, p in forwarder.upstream_specs)}; {len(sinkhole)} blocked domains")
+    try:
+        while True:
+            await asyncio.sleep(60)
+            stats = forwarder.stats
+            print_info(f"{stats['queries']} queries, {stats['cache_hits']} cache hits, "
+                       f"{stats['blocked']} blocked, {stats['failures']} failures, {len(forwarder.cache)} cached")
+    finally:
+        forwarder.close()
+        _remove_pid_file()
+
+
+def run_forwarder(host=DEFAULT_LISTEN, port=DEFAULT_PORT, upstreams=None, use_blocklists=True):
+    """Run the forwarder until interrupted."""
+    try:
+        asyncio.run(_serve(host, port, upstreams, use_blocklists))
+    except KeyboardInterrupt:
+        print_colored("\nDNS forwarder stopped.", Colors.CYAN)
+    except OSError as e:
+        print_error(f"Could not listen on {host}:{port}: {e}")
+
+
+# -- Benchmark against a local stub upstream (no network needed) --
+
+class StubResolver(asyncio.DatagramProtocol):
+    """Answers every A query with 10.0.0.1 after an optional delay, ignoring a fraction
+    (loss) of the queries. For benchmarks."""
+
+    def __init__(self, delay=0.0, address="10.0.0.1", ttl=300, loss=0.0):
+        self.delay = delay
+        self.loss = loss
+        self.address = address
+        self.ttl = ttl
+        self.answered = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.loss and random.random() < self.loss:
+            return
+        try:
+            response = dns_wire.build_response(data, addresses=[self.address], ttl=self.ttl)
+        except (ValueError, struct.error):
+            return
+        self.answered += 1
+        if self.delay:
+            asyncio.get_running_loop().call_later(self.delay, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+
+async def start_stub(delay=0.0, host="127.0.0.1", port=0, loss=0.0):
+    """Start a StubResolver and return (transport, protocol, port)."""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(lambda: StubResolver(delay, loss=loss),
+                                                              local_addr=(host, port))
+    return transport, protocol, transport.get_extra_info("sockname")[1]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+async def _run_phase(client, names, concurrency):
+    """Send every name, resending a query that got no answer like a stub resolver would.
+
+    Without the resend, one datagram dropped on the loopback stalls the phase for the
+    whole upstream timeout and dominates its throughput.
+    """
+    latencies = []
+    counts = {"failures": 0, "retries": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(name):
+        async with semaphore:
+            start = time.perf_counter()
+            for attempt in range(BENCH_ATTEMPTS):
+                try:
+                    await client.query(dns_wire.build_query(name), timeout=BENCH_RETRY_TIMEOUT)
+                except asyncio.TimeoutError:
+                    counts["retries"] += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                return
+            counts["failures"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(name) for name in names))
+    return latencies, counts, time.perf_counter() - start
+
+
+async def _benchmark(queries, concurrency, upstream_delay):
+    stub_transport, stub, stub_port = await start_stub(upstream_delay)
+    sinkhole = Sinkhole(SuffixTrie(["blocked.test"]))
+    forwarder = DnsForwarder([f"127.0.0.1:{stub_port}"], sinkhole)
+    port = await forwarder.start("127.0.0.1", 0)
+    client = await UpstreamClient("127.0.0.1", port).connect()
+
+    names = [f"host{i}.bench.test" for i in range(queries)]
+    phases = [
+        ("Uncached (forwarded)", names),
+        ("Cached", names),
+        ("Sinkholed", [f"host{i}.blocked.test" for i in range(queries)]),
+    ]
+    results = []
+    try:
+        for label, phase_names in phases:
+            latencies, counts, seconds = await _run_phase(client, phase_names, concurrency)
+            results.append({"phase": label, "qps": len(latencies) / seconds if seconds else 0,
+                            "p50_ms": percentile(latencies, 0.50), "p99_ms": percentile(latencies, 0.99),
+                            "retries": counts["retries"], "failures": counts["failures"]})
+    finally:
+        client.close()
+        forwarder.close()
+        stub_transport.close()
+    return results, forwarder.stats, stub.answered
+
+
+def benchmark(queries=5000, concurrency=64, upstream_delay=0.0):
+    """Measure forwarder throughput and latency against a local stub upstream."""
+    print_header("DNS Forwarder Benchmark")
+    print_info(f"{queries} queries per phase, {concurrency} in flight, stub upstream delay {upstream_delay * 1000:.0f} ms")
+    results, stats, answered = asyncio.run(_benchmark(queries, concurrency, upstream_delay))
+    print_colored(f"\n  {'Phase':<22} {'Queries/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'Resent':>7} {'Failed':>7}",
+                  Colors.BOLD)
+    for r in results:
+        print_colored(f"  {r['phase']:<22} {r['qps']:>10.0f} {r['p50_ms'] or 0:>8.2f} {r['p99_ms'] or 0:>8.2f} "
+                      f"{r['retries']:>7} {r['failures']:>7}", Colors.WHITE)
+    if any(r["retries"] or r["failures"] for r in results):
+        print_warning("Queries were lost on the loopback; their resend time is included in the figures above.")
+    print_info(f"Upstream answered {answered} queries; forwarder stats: {stats}")
+    return results
+
+
+def main():
+    args = sys.argv[1:]
+
+    def values(flag):
+        if flag not in args:
+            return []
+        index = args.index(flag) + 1
+        found = []
+        while index < len(args) and not args[index].startswith("--"):
+            found.append(args[index])
+            index += 1
+        return found
+
+    if "--benchmark" in args:
+        benchmark()
+        return
+    host = (values("--listen") or [DEFAULT_LISTEN])[0]
+    port = int((values("--port") or [DEFAULT_PORT])[0])
+    run_forwarder(host, port, values("--upstream") or None, "--no-blocklist" not in args)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,135 +12,391 @@ import subprocess
 import os
 import sys
 import ctypes
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
     from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
+    import dns_benchmark
+    import dns_cache
+    import dns_forwarder
+    import dns_providers
+    import system_queries
 except ImportError:
     from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
+    from modules import dns_benchmark, dns_cache, dns_forwarder, dns_providers, system_queries
+
+FORWARDER_UPSTREAMS = ["1.1.1.1", "8.8.8.8"]
+FORWARDER_START_TIMEOUT = 10
+VERIFY_NAME = "www.microsoft.com"  # Resolved after a DNS change to check it works
+
+_selected_adapters = None  # Adapter names chosen this session; None means every connected adapter
+
+def get_adapters(refresh=False):
+    """Return every network adapter with its DNS servers (discovered once, then cached)."""
+    return system_queries.get_network_adapters(refresh)
+
+def get_connected_adapters(refresh=False):
+    """Return the adapters that are currently up."""
+    return [a for a in get_adapters(refresh) if a['status'] == "Up"]
+
+def get_target_adapters(refresh=False):
+    """Return the adapters DNS changes apply to: the chosen ones, or every connected adapter."""
+    connected = get_connected_adapters(refresh)
+    if _selected_adapters:
+        chosen = [a for a in connected if a['name'] in _selected_adapters]
+        if chosen:
+            return chosen
+    return connected
 
 def get_active_adapter():
-    """Get the name of the currently active network adapter."""
-    try:
-        # PowerShell command to get the interface alias of the connected adapter
-        cmd = 'powershell -Command "Get-NetAdapter | Where-Object Status -eq Up | Select-Object -ExpandProperty Name"'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            adapters = result.stdout.strip().split('\n')
-            if adapters and adapters[0]:
-                return adapters[0].strip()
-    except Exception as e:
-        print_error(f"Error checking adapters: {e}")
-    return "Ethernet" # Fallback
-
-def set_dns(primary, secondary, name):
-    """Set DNS servers for the active adapter."""
-    adapter = get_active_adapter()
-    print_info(f"Setting {name} DNS for adapter: {adapter}...")
-    
-    try:
-        # Set primary DNS
-        cmd_primary = f'netsh interface ip set dns name="{adapter}" source=static addr={primary} register=primary'
-        subprocess.run(cmd_primary, shell=True, check=True, stdout=subprocess.DEVNULL)
-        
-        # Set secondary DNS
-        cmd_secondary = f'netsh interface ip add dns name="{adapter}" addr={secondary} index=2'
-        subprocess.run(cmd_secondary, shell=True, check=False, stdout=subprocess.DEVNULL) # Might fail if already set, check=False
-        
-        print_success(f"DNS changed to {name} ({primary}, {secondary})")
-        
-        # Flush DNS to ensure immediate effect
-        subprocess.run('ipconfig /flushdns', shell=True, stdout=subprocess.DEVNULL)
-        
-    except subprocess.CalledProcessError as e:
-        print_error(f"Failed to set DNS: {e}")
+    """Return the name of the first connected adapter, or None."""
+    connected = get_connected_adapters()
+    return connected[0]['name'] if connected else None
+
+def _run_netsh(commands):
+    """Run netsh commands in order. Returns the error text of the first failure, or None."""
+    for command, required in commands:
+        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        if result.returncode != 0 and required:
+            return (result.stdout or result.stderr).strip() or f"exit code {result.returncode}"
+    return None
+
+def _apply_to_adapters(adapters, build_commands):
+    """Run each adapter's netsh commands in parallel, then request a resolver cache flush.
+
+    Returns the number of adapters that were configured.
+    """
+    if not adapters:
+        print_error("No connected network adapter found.")
+        return 0
+    configured = 0
+    with ThreadPoolExecutor(max_workers=len(adapters)) as pool:
+        futures = {pool.submit(_run_netsh, build_commands(a)): a for a in adapters}
+        for future in as_completed(futures):
+            adapter = futures[future]
+            error = future.result()
+            if error:
+                print_error(f"{adapter['name']}: {error}", target=adapter['name'])
+            else:
+                configured += 1
+    system_queries.invalidate_network_adapters()
+    if configured:
+        # Flush DNS to ensure immediate effect (once per menu action, see dns_cache)
+        dns_cache.request_flush("DNS servers changed", unblocked=[VERIFY_NAME])
+    return configured
+
+def set_dns(primary, secondary, name, adapters=None, ipv6=()):
+    """Set DNS servers on the target adapters (all connected ones unless given).
+
+    ipv6 optionally lists the provider's IPv6 primary and secondary servers.
+    """
+    invalid = [address for address in [primary, secondary] if not dns_providers.is_plain_address(address, 4)]
+    invalid += [address for address in ipv6 if not dns_providers.is_plain_address(address, 6)]
+    if invalid:
+        print_error(f"Not a DNS server address an adapter can use: {', '.join(map(str, invalid))}")
+        return 0
+    # Rediscovered: the cached list can be an hour old and miss a newly connected adapter
+    adapters = get_target_adapters(refresh=True) if adapters is None else adapters
+    print_info(f"Setting {name} DNS for: {', '.join(a['name'] for a in adapters) or 'no adapters'}...")
+
+    def commands(adapter):
+        # validate=no skips netsh's slow reachability test of each server
+        result = [
+            (f'netsh interface ipv4 set dnsservers name="{adapter["name"]}" source=static address={primary} '
+             f'register=primary validate=no', True),
+            # Might fail if already set
+            (f'netsh interface ipv4 add dnsservers name="{adapter["name"]}" address={secondary} index=2 validate=no', False),
+        ]
+        for index, address in enumerate(ipv6):
+            # IPv6 may be disabled on the adapter, so these never count as failures
+            if index == 0:
+                result.append((f'netsh interface ipv6 set dnsservers name="{adapter["name"]}" source=static '
+                               f'address={address} register=primary validate=no', False))
+            else:
+                result.append((f'netsh interface ipv6 add dnsservers name="{adapter["name"]}" address={address} '
+                               f'index={index + 1} validate=no', False))
+        return result
+
+    configured = _apply_to_adapters(adapters, commands)
+    if configured:
+        print_success(f"DNS changed to {name} ({primary}, {secondary}) on {configured} adapter(s)",
+                      after=[primary, secondary])
+    elif adapters:
         print_info("Make sure you are running as Administrator.")
+    return configured
 
-def reset_to_dhcp():
-    """Reset DNS to automatic (DHCP)."""
-    adapter = get_active_adapter()
-    print_info(f"Reseting DNS to Automatic (DHCP) for: {adapter}...")
-    
-    try:
-        cmd = f'netsh interface ip set dns name="{adapter}" source=dhcp'
-        subprocess.run(cmd, shell=True, check=True, stdout=subprocess.DEVNULL)
-        
-        print_success("DNS reset to Automatic (DHCP).")
-        subprocess.run('ipconfig /flushdns', shell=True, stdout=subprocess.DEVNULL)
-        
-    except subprocess.CalledProcessError:
+def reset_to_dhcp(adapters=None):
+    """Reset IPv4 and IPv6 DNS to automatic (DHCP) on the target adapters.
+
+    A local forwarder started from here is stopped too, since nothing points at it anymore.
+    """
+    adapters = get_target_adapters(refresh=True) if adapters is None else adapters
+    if dns_forwarder.stop_forwarder():
+        print_success("Local DNS forwarder stopped.")
+    print_info(f"Reseting DNS to Automatic (DHCP) for: {', '.join(a['name'] for a in adapters) or 'no adapters'}...")
+
+    def commands(adapter):
+        return [
+            (f'netsh interface ipv4 set dnsservers name="{adapter["name"]}" source=dhcp', True),
+            (f'netsh interface ipv6 set dnsservers name="{adapter["name"]}" source=dhcp', False),
+        ]
+
+    configured = _apply_to_adapters(adapters, commands)
+    if configured:
+        print_success(f"DNS reset to Automatic (DHCP) on {configured} adapter(s).")
+    elif adapters:
         print_error("Failed to reset DNS.")
+    return configured
 
-def check_current_dns():
-    """Show current DNS settings."""
-    adapter = get_active_adapter()
-    print_header(f"Current DNS Settings ({adapter})")
-    
+def choose_adapters():
+    """Let the user pick which connected adapters DNS changes apply to (for this session)."""
+    global _selected_adapters
+    print_header("Choose Adapters")
+    connected = get_connected_adapters(refresh=True)
+    if not connected:
+        print_error("No connected network adapter found.")
+        return
+    targets = [a['name'] for a in get_target_adapters()]
+    for number, adapter in enumerate(connected, 1):
+        marker = symbols.CHECK if adapter['name'] in targets else " "
+        print_colored(f"  {number}. {marker} {adapter['name']} - {adapter['description']}", Colors.WHITE)
+    answer = input(f"\n{Colors.BOLD}Adapter numbers separated by spaces (Enter = all connected): {Colors.END}").strip()
+    if not answer:
+        _selected_adapters = None
+        print_success("DNS changes will apply to every connected adapter.")
+        return
+    chosen = [connected[int(n) - 1]['name'] for n in answer.split() if n.isdigit() and 0 < int(n) <= len(connected)]
+    if chosen:
+        _selected_adapters = chosen
+        print_success(f"DNS changes will apply to: {', '.join(chosen)}")
+    else:
+        print_error("No valid adapter numbers given.")
+
+def start_local_forwarder(upstreams=FORWARDER_UPSTREAMS):
+    """Start the caching DNS forwarder in the background and point the adapter at it.
+
+    The first upstream stays configured as the secondary server, so name resolution
+    keeps working if the forwarder is stopped.
+    """
+    if dns_forwarder.is_forwarder_running():
+        print_info("Local DNS forwarder is already running.")
+    else:
+        print_info(f"Starting local DNS forwarder (upstreams: {', '.join(upstreams)})...")
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dns_forwarder.py')
+        flags = getattr(subprocess, 'DETACHED_PROCESS', 0) | getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+        subprocess.Popen([sys.executable, script, '--upstream', *upstreams],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         creationflags=flags, close_fds=True)
+        deadline = time.monotonic() + FORWARDER_START_TIMEOUT
+        while not dns_forwarder.is_forwarder_running():
+            if time.monotonic() > deadline:
+                print_error("The DNS forwarder did not start (is port 53 already in use?).")
+                return False
+            time.sleep(0.25)
+        print_success("Local DNS forwarder is running on 127.0.0.1")
+    set_dns(dns_forwarder.DEFAULT_LISTEN, upstreams[0], "Local forwarder")
+    return True
+
+def stop_local_forwarder():
+    """Stop the background forwarder and reset the adapters that still point at it."""
+    if not dns_forwarder.stop_forwarder():
+        if dns_forwarder.is_forwarder_running():
+            print_error("The DNS forwarder was not started from here and could not be stopped.")
+            return False
+        print_info("Local DNS forwarder is not running.")
+    else:
+        print_success("Local DNS forwarder stopped.")
+    pointing = [a for a in get_target_adapters() if dns_forwarder.DEFAULT_LISTEN in a['ipv4']]
+    if pointing:
+        reset_to_dhcp(pointing)
+    return True
+
+def get_dns_servers(adapter):
+    """Return the IPv4 DNS servers configured on an adapter, or None if it is unknown."""
+    for a in get_adapters():
+        if a['name'] == adapter:
+            return a['ipv4']
+    return None
+
+def get_dhcp_dns_servers():
+    """Return the DNS servers handed out by DHCP on any interface (read from the registry)."""
     try:
-        cmd = f'powershell -Command "Get-DnsClientServerAddress -InterfaceAlias \'{adapter}\' | Select-Object -ExpandProperty ServerAddresses"'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            dns_servers = result.stdout.strip().split('\n')
-                if dns_servers and dns_servers[0]:
-                    for dns in dns_servers:
-                        if dns.strip():
-                            print_colored(f"  {symbols.BULLET} {dns.strip()}", Colors.YELLOW)
-                else:
-                    print_colored(f"  {symbols.BULLET} Automatic (DHCP) / Unknown", Colors.WHITE)
-        else:
-            # Fallback to netsh
-            os.system(f'netsh interface ip show dns "{adapter}"')
-            
-    except Exception:
+        import winreg
+    except ImportError:
+        return []
+    servers = []
+    path = r"SYSTEM\CurrentControlSet\Services\Tcpip\Parameters\Interfaces"
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path) as interfaces:
+            for i in range(winreg.QueryInfoKey(interfaces)[0]):
+                try:
+                    with winreg.OpenKey(interfaces, winreg.EnumKey(interfaces, i)) as key:
+                        value, _ = winreg.QueryValueEx(key, "DhcpNameServer")
+                except OSError:
+                    continue
+                for server in value.replace(",", " ").split():
+                    if server not in servers:
+                        servers.append(server)
+    except OSError:
         pass
+    return servers
+
+def get_benchmark_candidates():
+    """Every provider address plus the DHCP and currently configured servers."""
+    candidates = []
+    seen = set()
 
-def show_menu():
+    def add(name, address):
+        if address and address not in seen and not address.startswith("127."):
+            seen.add(address)
+            candidates.append({'name': name, 'address': address})
+
+    for provider in dns_providers.load_catalog():
+        for address in provider['ipv4']:
+            add(provider['name'], address)
+    for server in get_dhcp_dns_servers():
+        add("DHCP", server)
+    for adapter in get_connected_adapters():
+        for server in adapter['ipv4']:
+            add("Current", server)
+    return candidates
+
+def benchmark_providers(apply=None):
+    """Measure every candidate resolver and recommend the fastest pair.
+
+    apply=True sets the pair without asking, False only reports it, None asks.
+    """
+    print_header("DNS Benchmark")
+    candidates = get_benchmark_candidates()
+    print_info(f"Querying {len(candidates)} resolvers ({dns_benchmark.DEFAULT_ROUNDS} rounds of "
+               f"{len(dns_benchmark.DEFAULT_NAMES)} cached and uncached names each)...")
+    results = dns_benchmark.run_benchmark(candidates)
+    dns_benchmark.print_results(results)
+    primary, secondary = dns_benchmark.report_recommendation(results)
+    if primary is None:
+        return
+    if apply is None:
+        answer = input(f"\n{Colors.BOLD}Apply this pair now? (y/N): {Colors.END}").strip().lower()
+        apply = answer == 'y'
+    if apply:
+        secondary_address = secondary['address'] if secondary else primary['address']
+        set_dns(primary['address'], secondary_address, f"Fastest ({primary['name']})")
+
+def check_current_dns():
+    """Show the DNS settings of every adapter, connected ones first."""
+    adapters = sorted(get_adapters(refresh=True), key=lambda a: a['status'] != "Up")
+    print_header("Current DNS Settings")
+    if not adapters:
+        # Fallback to netsh
+        os.system('netsh interface ip show dns')
+        return
+    for adapter in adapters:
+        color = Colors.GREEN if adapter['status'] == "Up" else Colors.WHITE
+        print_colored(f"\n{adapter['name']} ({adapter['status']}) - {adapter['description']}", color)
+        servers = adapter['ipv4'] + adapter['ipv6']
+        if servers:
+            for dns in servers:
+                print_colored(f"  {symbols.BULLET} {dns}", Colors.YELLOW)
+        else:
+            print_colored(f"  {symbols.BULLET} Automatic (DHCP) / Unknown", Colors.WHITE)
+
+
+HEALTH_COLORS = {"healthy": Colors.GREEN, "degraded": Colors.YELLOW, "down": Colors.RED, "unknown": Colors.WHITE}
+
+TOOLS = [
+    (symbols.RECYCLE, "Reset to Automatic (DHCP)", "Use your ISP's default DNS", Colors.BLUE, lambda: reset_to_dhcp()),
+    (symbols.ROCKET, "Local Caching Forwarder (127.0.0.1)", "Caches answers and blocks update/telemetry domains locally",
+     Colors.GREEN, lambda: start_local_forwarder()),
+    (symbols.STOP, "Stop Local Forwarder", "Stops it and resets adapters that use it to DHCP", Colors.RED,
+     lambda: stop_local_forwarder()),
+    (symbols.LIGHTNING, "Benchmark Providers", "Find the fastest DNS servers from your network", Colors.YELLOW,
+     lambda: benchmark_providers()),
+    (symbols.INFO, "Check Current DNS", None, Colors.CYAN, lambda: check_current_dns()),
+    (symbols.GEAR, "Choose Adapters", "Wi-Fi, Ethernet, VPN... (default: every connected adapter)", Colors.CYAN,
+     lambda: choose_adapters()),
+    (symbols.BOOK, "Edit Provider Catalog", None, Colors.CYAN, lambda: edit_catalog()),
+]
+
+def _health_text(health):
+    if health['status'] == "unknown":
+        return "checking..."
+    if health['status'] == "down":
+        return "not responding"
+    text = f"{health['p50']:.0f} ms"
+    if health['loss']:
+        text += f", {health['loss']:.0%} lost"
+    return text
+
+def edit_catalog():
+    """Write the catalog file (if missing) so providers can be added or changed by hand."""
+    if not os.path.exists(dns_providers.CATALOG_FILE):
+        dns_providers.write_catalog(dns_providers.load_catalog())
+    print_info(f"Provider catalog: {dns_providers.CATALOG_FILE}")
+    print_info("Edit it and reopen the DNS Switcher to see your changes.")
+    if hasattr(os, 'startfile'):
+        os.startfile(dns_providers.CATALOG_FILE)
+
+def show_menu(providers, checker):
+    """Print the providers (fastest first, with live health) and the tools. Returns the providers in menu order."""
     print_colored("\n" + "=" * 60, Colors.CYAN)
     print_colored(f"{symbols.CLOUD}  DNS SWITCHER", Colors.BOLD + Colors.CYAN)
     print_colored("=" * 60, Colors.CYAN)
-    print_colored(f"\n{symbols.TARGET} Choose a DNS Provider:", Colors.BOLD + Colors.CYAN)
-    print_colored(f"\n1. {symbols.GLOBE} Google DNS (8.8.8.8)", Colors.GREEN)
-    print_colored("   - Fast, reliable, standard choice", Colors.WHITE)
-    print_colored(f"2. {symbols.CLOUD}  Cloudflare DNS (1.1.1.1)", Colors.MAGENTA)
-    print_colored("   - Focused on privacy and speed", Colors.WHITE)
-    print_colored(f"3. {symbols.SHIELD}  OpenDNS (208.67.222.222)", Colors.YELLOW)
-    print_colored("   - Good for phishing protection", Colors.WHITE)
-    print_colored(f"4. {symbols.RECYCLE} Reset to Automatic (DHCP)", Colors.BLUE)
-    print_colored("   - Use your ISP's default DNS", Colors.WHITE)
-    print_colored(f"5. {symbols.INFO} Check Current DNS", Colors.CYAN)
-    print_colored(f"6. {symbols.WAVE} Return to Main Menu", Colors.CYAN)
+    print_colored(f"\n{symbols.TARGET} Choose a DNS Provider (fastest first):", Colors.BOLD + Colors.CYAN)
+    ordered = checker.ordered()
+    print_colored("")
+    for number, provider in enumerate(ordered, 1):
+        health = checker.health(provider['name'])
+        print_colored(f"{number}. {symbols.GLOBE} {provider['name']} DNS ({provider['ipv4'][0]})  "
+                      f"[{_health_text(health)}]", HEALTH_COLORS[health['status']])
+        details = " ".join([provider['description']] + [f"#{tag}" for tag in provider['tags']]).strip()
+        if details:
+            print_colored(f"   - {details}", Colors.WHITE)
+    for number, (symbol, label, description, color, _) in enumerate(TOOLS, len(ordered) + 1):
+        print_colored(f"{number}. {symbol} {label}", color)
+        if description:
+            print_colored(f"   - {description}", Colors.WHITE)
+    print_colored(f"{len(ordered) + len(TOOLS) + 1}. {symbols.WAVE} Return to Main Menu", Colors.CYAN)
+    return ordered
 
 def main():
-    while True:
-        show_menu()
-        try:
-            choice = input(f"\n{Colors.BOLD}Enter your choice (1-6): {Colors.END}").strip()
-            
-            if choice == '1':
-                set_dns("8.8.8.8", "8.8.4.4", "Google")
-            elif choice == '2':
-                set_dns("1.1.1.1", "1.0.0.1", "Cloudflare")
-            elif choice == '3':
-                set_dns("208.67.222.222", "208.67.220.220", "OpenDNS")
-            elif choice == '4':
-                reset_to_dhcp()
-            elif choice == '5':
-                check_current_dns()
-            elif choice == '6':
+    providers = dns_providers.load_catalog()
+    checker = dns_providers.HealthChecker(providers).start()
+    try:
+        while True:
+            ordered = show_menu(providers, checker)
+            last = len(ordered) + len(TOOLS) + 1
+            try:
+                choice = input(f"\n{Colors.BOLD}Enter your choice (1-{last}): {Colors.END}").strip()
+                number = int(choice) if choice.isdigit() else 0
+
+                if number == last:
+                    break
+                with dns_cache.batch():
+                    if 1 <= number <= len(ordered):
+                        provider = ordered[number - 1]
+                        set_dns(provider['ipv4'][0], provider['ipv4'][-1], provider['name'], ipv6=provider['ipv6'])
+                    elif len(ordered) < number < last:
+                        TOOLS[number - len(ordered) - 1][4]()
+                    else:
+                        print_error(f"Invalid choice! Please enter 1-{last}.")
+
+                if 1 <= number < last:
+                    input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
+
+            except KeyboardInterrupt:
+                print_colored("\n\nReturning to main menu...", Colors.CYAN)
                 break
-            else:
-                print_error("Invalid choice! Please enter 1-6.")
-            
-            if choice in ['1', '2', '3', '4', '5']:
+            except Exception as e:
+                print_error(f"An error occurred: {e}")
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
-                
-        except KeyboardInterrupt:
-            print_colored("\n\nReturning to main menu...", Colors.CYAN)
-            break
-        except Exception as e:
-            print_error(f"An error occurred: {e}")
-            input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
+    finally:
+        checker.stop()
 
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_providers(apply="--apply" in sys.argv)
+        sys.exit(0)
     if not ctypes.windll.shell32.IsUserAnAdmin():
         print_warning("Warning: Admin privileges required to change DNS settings.")
     main()
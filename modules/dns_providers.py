@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+DNS Provider Catalog for Windows 11 Update Manager
+The DNS providers offered by the DNS Switcher, read from an editable JSON catalog,
+and a background health checker that keeps a rolling latency window per provider.
+
+Catalog entries look like:
+    {"name": "Quad9", "ipv4": ["9.9.9.9", "149.112.112.112"],
+     "ipv6": ["2620:fe::fe", "2620:fe::9"], "tags": ["security"], "description": "..."}
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import ipaddress
+import json
+import os
+import random
+import socket
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+
+try:
+    from console_utils import print_warning
+    import dns_wire
+    from dns_forwarder import parse_endpoint, percentile
+except ImportError:
+    from modules.console_utils import print_warning
+    from modules import dns_wire
+    from modules.dns_forwarder import parse_endpoint, percentile
+
+CATALOG_FILE = os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "Win11Manager", "dns_providers.json")
+
+BUILTIN_PROVIDERS = [
+    {"name": "Google", "ipv4": ["8.8.8.8", "8.8.4.4"], "ipv6": ["2001:4860:4860::8888", "2001:4860:4860::8844"],
+     "tags": ["fast"], "description": "Fast, reliable, standard choice"},
+    {"name": "Cloudflare", "ipv4": ["1.1.1.1", "1.0.0.1"], "ipv6": ["2606:4700:4700::1111", "2606:4700:4700::1001"],
+     "tags": ["privacy", "fast"], "description": "Focused on privacy and speed"},
+    {"name": "OpenDNS", "ipv4": ["208.67.222.222", "208.67.220.220"], "ipv6": ["2620:119:35::35", "2620:119:53::53"],
+     "tags": ["security"], "description": "Good for phishing protection"},
+    {"name": "Quad9", "ipv4": ["9.9.9.9", "149.112.112.112"], "ipv6": ["2620:fe::fe", "2620:fe::9"],
+     "tags": ["security", "privacy"], "description": "Blocks known malicious domains"},
+]
+
+HEALTH_INTERVAL = 30      # seconds between probe rounds
+HEALTH_WINDOW = 20        # samples kept per provider
+HEALTH_TIMEOUT = 1.0
+MIN_PROBE_SPACING = 0.2   # at most 5 probes per second, across all providers
+PROBE_NAMES = ["www.microsoft.com", "www.google.com", "www.cloudflare.com"]
+
+
+def is_plain_address(value, version=None):
+    """True for an IP address without a port, the only form netsh sets on an adapter.
+
+    Ports ("127.0.0.1:5353") are only understood by the benchmark and health probes.
+    """
+    if not isinstance(value, str):
+        return False
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return version in (None, address.version)
+
+
+def _valid_addresses(values, version):
+    addresses = []
+    for value in values or []:
+        if not is_plain_address(value, version):
+            return None
+        addresses.append(value)
+    return addresses
+
+
+def _normalize(entry):
+    """Return a clean provider dict, or None if the entry is unusable."""
+    if not isinstance(entry, dict) or not entry.get("name"):
+        return None
+    # Catalog servers are applied to adapters, so they can't carry a port
+    ipv4 = _valid_addresses(entry.get("ipv4"), 4)
+    ipv6 = _valid_addresses(entry.get("ipv6"), 6)
+    if not ipv4 or ipv6 is None:
+        return None
+    return {
+        "name": str(entry["name"]),
+        "ipv4": ipv4[:2],
+        "ipv6": ipv6[:2],
+        "tags": [str(tag) for tag in entry.get("tags") or []],
+        "description": str(entry.get("description") or ""),
+    }
+
+
+def load_catalog(path=CATALOG_FILE):
+    """Return the providers: the built-in ones, overridden or extended by the catalog file."""
+    providers = {p["name"]: dict(p) for p in BUILTIN_PROVIDERS}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        entries = []
+    except (OSError, ValueError) as e:
+        print_warning(f"Ignoring DNS provider catalog {path}: {e}")
+        entries = []
+    for entry in entries if isinstance(entries, list) else []:
+        provider = _normalize(entry)
+        if provider is None:
+            print_warning(f"Skipping invalid DNS provider entry: {entry}")
+            continue
+        providers[provider["name"]] = provider
+    return list(providers.values())
+
+
+def write_catalog(providers, path=CATALOG_FILE):
+    """Save providers as the catalog file (so it can be edited by hand)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(providers, f, indent=2)
+
+
+def probe(address, timeout=HEALTH_TIMEOUT, name=None):
+    """Send one query to address ('ip' or 'ip:port'). Returns the latency in ms, or None."""
+    host, port = parse_endpoint(address)
+    query_id = random.getrandbits(16)
+    query = dns_wire.build_query(name or random.choice(PROBE_NAMES), query_id=query_id)
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    try:
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect((host, port))
+            start = time.perf_counter()
+            sock.send(query)
+            deadline = start + timeout
+            while True:
+                response = sock.recv(4096)
+                if len(response) >= 2 and dns_wire.get_id(response) == query_id:
+                    return (time.perf_counter() - start) * 1000
+                sock.settimeout(max(0.001, deadline - time.perf_counter()))
+    except (OSError, struct.error):
+        return None
+
+
+class HealthChecker:
+    """Probes each provider's primary IPv4 server in a daemon thread.
+
+    checker = HealthChecker(providers)
+    checker.start()
+    checker.health("Cloudflare")   # {'status', 'p50', 'loss', 'samples'}
+    checker.stop()
+
+    Every interval the providers are probed once each, spaced at least
+    MIN_PROBE_SPACING apart; the last `window` results are kept per provider.
+    """
+
+    def __init__(self, providers, interval=HEALTH_INTERVAL, window=HEALTH_WINDOW, timeout=HEALTH_TIMEOUT,
+                 spacing=MIN_PROBE_SPACING):
+        self.providers = list(providers)
+        self.interval = interval
+        self.timeout = timeout
+        self.spacing = spacing
+        self.samples = {p["name"]: deque(maxlen=window) for p in self.providers}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_probe = 0.0  # Spacing also holds across rounds
+
+    def check_once(self):
+        """Probe every provider once (rate limited)."""
+        for provider in self.providers:
+            if self._stop.is_set():
+                return
+            wait = self._last_probe + self.spacing - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                return
+            self._last_probe = time.monotonic()
+            latency = probe(provider["ipv4"][0], self.timeout)
+            with self._lock:
+                self.samples[provider["name"]].append(latency)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dns-health", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def health(self, name):
+        """Return {'status': healthy|degraded|down|unknown, 'p50', 'loss', 'samples'}."""
+        with self._lock:
+            window = list(self.samples.get(name, ()))
+        if not window:
+            return {"status": "unknown", "p50": None, "loss": None, "samples": 0}
+        latencies = [ms for ms in window if ms is not None]
+        loss = 1 - len(latencies) / len(window)
+        if not latencies:
+            status = "down"
+        elif loss > 0.2:
+            status = "degraded"
+        else:
+            status = "healthy"
+        return {"status": status, "p50": percentile(latencies, 0.5), "loss": loss, "samples": len(window)}
+
+    def ordered(self):
+        """Return the providers sorted by median latency; unmeasured and down ones last."""
+        def key(provider):
+            health = self.health(provider["name"])
+            return (health["p50"] is None, (health["loss"] or 0) > 0.2, health["p50"] or 0)
+        return sorted(self.providers, key=key)
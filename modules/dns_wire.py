@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+DNS Wire Format Helpers for Windows 11 Update Manager
+Just enough of RFC 1035 to build queries, read questions and TTLs, and answer
+blocked names locally. Used by the DNS forwarder and the resolver benchmark.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import ipaddress
+import struct
+
+HEADER = struct.Struct("!HHHHHH")  # id, flags, qdcount, ancount, nscount, arcount
+RR_FIXED = struct.Struct("!HHIH")  # type, class, ttl, rdlength
+
+TYPE_A = 1
+TYPE_AAAA = 28
+TYPE_OPT = 41
+CLASS_IN = 1
+
+FLAG_QR = 0x8000
+FLAG_TC = 0x0200
+FLAG_RD = 0x0100
+FLAG_RA = 0x0080
+
+RCODE_NOERROR = 0
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+
+
+def encode_name(name):
+    """Encode a dotted name as DNS labels."""
+    out = bytearray()
+    for label in name.rstrip(".").split("."):
+        if label:
+            data = label.encode("idna") if not label.isascii() else label.encode("ascii")
+            if len(data) > 63:
+                raise ValueError(f"label too long: {label}")
+            out.append(len(data))
+            out += data
+    out.append(0)
+    return bytes(out)
+
+
+def read_name(message, offset):
+    """Read a possibly compressed name. Returns (name, offset after the name)."""
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(message):
+            raise ValueError("name runs past the end of the message")
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(message) or jumps > 16:
+                raise ValueError("bad compression pointer")
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            jumps += 1
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(message[offset:offset + length].decode("ascii", "replace"))
+        offset += length
+    return ".".join(labels), end if end is not None else offset
+
+
+def build_query(name, qtype=TYPE_A, query_id=0, recursion=True):
+    """Return a standard query for name."""
+    flags = FLAG_RD if recursion else 0
+    return HEADER.pack(query_id, flags, 1, 0, 0, 0) + encode_name(name) + struct.pack("!HH", qtype, CLASS_IN)
+
+
+def parse_header(message):
+    """Return (id, flags, qdcount, ancount, nscount, arcount)."""
+    if len(message) < HEADER.size:
+        raise ValueError("message shorter than a DNS header")
+    return HEADER.unpack_from(message)
+
+
+def parse_question(message):
+    """Return (qname, qtype, qclass, offset after the question) of the first question."""
+    _, _, qdcount, _, _, _ = parse_header(message)
+    if qdcount < 1:
+        raise ValueError("no question")
+    name, offset = read_name(message, HEADER.size)
+    if offset + 4 > len(message):
+        raise ValueError("truncated question")
+    qtype, qclass = struct.unpack_from("!HH", message, offset)
+    return name, qtype, qclass, offset + 4
+
+
+def get_id(message):
+    return struct.unpack_from("!H", message)[0]
+
+
+def set_id(message, query_id):
+    """Return message with its id replaced."""
+    return struct.pack("!H", query_id) + message[2:]
+
+
+def get_rcode(message):
+    return parse_header(message)[1] & 0x000F
+
+
+def is_truncated(message):
+    return bool(parse_header(message)[1] & FLAG_TC)
+
+
+def has_edns(message):
+    """True if the message carries additional records (in practice the EDNS OPT record)."""
+    return parse_header(message)[5] > 0
+
+
+def ttl_offsets(message):
+    """Return [(offset, ttl)] of the TTL field of every answer, authority and additional record.
+
+    The OPT pseudo-record is skipped, its TTL field holds EDNS flags.
+    """
+    _, _, qdcount, ancount, nscount, arcount = parse_header(message)
+    offset = HEADER.size
+    for _ in range(qdcount):
+        _, offset = read_name(message, offset)
+        offset += 4
+    result = []
+    for _ in range(ancount + nscount + arcount):
+        _, offset = read_name(message, offset)
+        if offset + RR_FIXED.size > len(message):
+            raise ValueError("truncated resource record")
+        rtype, _, ttl, rdlength = RR_FIXED.unpack_from(message, offset)
+        if rtype != TYPE_OPT:
+            result.append((offset + 4, ttl))
+        offset += RR_FIXED.size + rdlength
+    return result
+
+
+def with_ttls(message, offsets, elapsed):
+    """Return message with every TTL reduced by elapsed seconds (never below zero)."""
+    data = bytearray(message)
+    for offset, ttl in offsets:
+        struct.pack_into("!I", data, offset, max(0, ttl - int(elapsed)))
+    return bytes(data)
+
+
+def build_response(query, rcode=RCODE_NOERROR, addresses=(), ttl=300):
+    """Answer query locally with the given A/AAAA addresses (matching the query type).
+
+    Only the first question is echoed; additional records (EDNS) are dropped.
+    """
+    query_id, flags, _, _, _, _ = parse_header(query)
+    name, qtype, qclass, end = parse_question(query)
+    answers = bytearray()
+    count = 0
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if (qtype, ip.version) not in ((TYPE_A, 4), (TYPE_AAAA, 6)):
+            continue
+        # Name is a compression pointer to the question at offset 12
+        answers += struct.pack("!H", 0xC000 | HEADER.size) + RR_FIXED.pack(qtype, qclass, ttl, len(ip.packed)) + ip.packed
+        count += 1
+    response_flags = FLAG_QR | FLAG_RA | (flags & FLAG_RD) | (rcode & 0x000F)
+    return HEADER.pack(query_id, response_flags, 1, count, 0, 0) + query[HEADER.size:end] + bytes(answers)
+
+
+def parse_addresses(message):
+    """Return the A and AAAA addresses in the answer section."""
+    _, _, qdcount, ancount, _, _ = parse_header(message)
+    offset = HEADER.size
+    for _ in range(qdcount):
+        _, offset = read_name(message, offset)
+        offset += 4
+    addresses = []
+    for _ in range(ancount):
+        _, offset = read_name(message, offset)
+        rtype, _, _, rdlength = RR_FIXED.unpack_from(message, offset)
+        offset += RR_FIXED.size
+        if rtype in (TYPE_A, TYPE_AAAA):
+            addresses.append(str(ipaddress.ip_address(message[offset:offset + rdlength])))
+        offset += rdlength
+    return addresses
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Firewall Blocking for Windows 11 Update Manager
+Blocks update/telemetry endpoints by address with Windows Firewall rules, which also
+catches programs that connect by IP and never consult the hosts file.
+
+Addresses are collapsed into the smallest CIDR set and packed into a few rules with
+comma-separated remoteip lists, all added by a single "netsh -f" script. Every rule
+shares one name, so removing that name removes them all.
+
+Note: update CDNs share addresses with other sites, so blocking them can affect
+unrelated downloads until the rules are removed.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import asyncio
+import ipaddress
+import os
+import struct
+import subprocess
+import tempfile
+import time
+
+try:
+    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
+    import dns_wire
+    from dns_forwarder import UpstreamClient, parse_endpoint
+except ImportError:
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
+    from modules import dns_wire
+    from modules.dns_forwarder import UpstreamClient, parse_endpoint
+
+RULE_NAME = "Win11 Manager - Block Update Endpoints"
+RULE_DESCRIPTION = "Added by Windows 11 Update Manager. Remove with restore_windows_updates.py."
+MAX_ADDRESSES_PER_RULE = 200
+RESOLVER = "1.1.1.1"
+# Extra addresses or CIDR ranges to block, one per line
+RANGES_FILE = os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "Win11Manager", "firewall_ranges.txt")
+
+
+def resolve_domains(domains, resolver=RESOLVER, timeout=2.0):
+    """Resolve the A and AAAA records of domains concurrently through a public resolver.
+
+    The hosts file is bypassed on purpose, since it may already sinkhole these names.
+    Returns {domain: [addresses]} (empty when unresolvable).
+    """
+    async def resolve_all(names):
+        client = await UpstreamClient(*parse_endpoint(resolver)).connect()
+
+        async def resolve(domain):
+            found = []
+            for qtype in (dns_wire.TYPE_A, dns_wire.TYPE_AAAA):
+                try:
+                    response = await client.query(dns_wire.build_query(domain, qtype), timeout)
+                    found += dns_wire.parse_addresses(response)
+                except (asyncio.TimeoutError, OSError, ValueError, struct.error):
+                    pass
+            return domain, sorted(set(found))
+
+        try:
+            return dict(await asyncio.gather(*(resolve(domain) for domain in names)))
+        finally:
+            client.close()
+
+    domains = list(dict.fromkeys(domains))
+    return asyncio.run(resolve_all(domains)) if domains else {}
+
+
+def load_extra_ranges(path=RANGES_FILE):
+    """Return the addresses and ranges listed in the ranges file (comments allowed)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+    except OSError:
+        return []
+
+
+def aggregate(addresses):
+    """Collapse addresses and CIDR ranges into the smallest covering set of networks.
+
+    Returns (networks, invalid) with IPv4 networks first, then IPv6, each sorted.
+    Loopback, unspecified and private addresses (e.g. a sinkholed hosts entry) are skipped.
+    """
+    ipv4, ipv6, invalid = [], [], []
+    for text in addresses:
+        try:
+            network = ipaddress.ip_network(text.strip(), strict=False)
+        except ValueError:
+            invalid.append(text)
+            continue
+        if network.is_loopback or network.is_unspecified or network.is_private or network.is_link_local:
+            continue
+        (ipv4 if network.version == 4 else ipv6).append(network)
+    return list(ipaddress.collapse_addresses(ipv4)) + list(ipaddress.collapse_addresses(ipv6)), invalid
+
+
+def _format_network(network):
+    # netsh accepts bare addresses for single hosts
+    return str(network.network_address) if network.num_addresses == 1 else str(network)
+
+
+def build_rule_commands(networks, name=RULE_NAME, per_rule=MAX_ADDRESSES_PER_RULE):
+    """Return the netsh script lines that replace our rules with rules blocking networks.
+
+    The first line deletes the previous rules of the same name, so applying is idempotent.
+    """
+    remote = [_format_network(network) for network in networks]
+    commands = [f'advfirewall firewall delete rule name="{name}"']
+    for start in range(0, len(remote), per_rule):
+        commands.append(
+            f'advfirewall firewall add rule name="{name}" dir=out action=block protocol=any enable=yes '
+            f'profile=any remoteip={",".join(remote[start:start + per_rule])} description="{RULE_DESCRIPTION}"'
+        )
+    return commands
+
+
+def run_netsh_script(commands):
+    """Run the commands in one netsh process. Returns the CompletedProcess."""
+    fd, path = tempfile.mkstemp(prefix="win11_firewall_", suffix=".txt")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(commands) + "\n")
+        return subprocess.run(["netsh", "-f", path], capture_output=True, text=True)
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def count_rules(name=RULE_NAME):
+    """Return how many firewall rules carry our rule name."""
+    result = subprocess.run(["netsh", "advfirewall", "firewall", "show", "rule", f"name={name}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return 0
+    # Each rule is printed under a row of dashes (the labels are localized)
+    return sum(1 for line in result.stdout.splitlines() if line.strip() and set(line.strip()) == {"-"})
+
+
+def block_endpoints(domains, extra=None):
+    """Resolve domains, aggregate their addresses and install the blocking rules.
+
+    Returns the list of blocked networks.
+    """
+    print_header("Firewall Blocking")
+    start = time.perf_counter()
+    resolved = resolve_domains(domains)
+    unresolved = [domain for domain, addresses in resolved.items() if not addresses]
+    addresses = [address for found in resolved.values() for address in found]
+    extra = load_extra_ranges() if extra is None else extra
+    networks, invalid = aggregate(addresses + list(extra))
+
+    print_info(f"Resolved {len(resolved) - len(unresolved)}/{len(resolved)} domains to {len(set(addresses))} addresses"
+               f" (+{len(extra)} extra ranges)")
+    if unresolved:
+        print_warning(f"Could not resolve: {', '.join(unresolved)}")
+    for text in invalid:
+        print_warning(f"Ignoring invalid address or range: {text}")
+    if not networks:
+        print_error("Nothing to block: no public addresses found.")
+        return []
+
+    commands = build_rule_commands(networks)
+    result = run_netsh_script(commands)
+    rules = count_rules()
+    if rules:
+        print_success(f"Blocked {len(networks)} networks with {rules} firewall rule(s)", target=RULE_NAME,
+                      after=[_format_network(n) for n in networks], duration_ms=(time.perf_counter() - start) * 1000)
+    else:
+        print_error("Failed to add the firewall rules.", target=RULE_NAME)
+        print_colored(f"  - {(result.stdout or result.stderr).strip()}", Colors.RED)
+        print_info("Make sure you are running as Administrator.")
+    return networks
+
+
+def remove_blocking_rules(name=RULE_NAME):
+    """Delete every rule we added. Returns True if any were removed."""
+    before = count_rules(name)
+    if not before:
+        print_info("No firewall blocking rules found")
+        return False
+    subprocess.run(["netsh", "advfirewall", "firewall", "delete", "rule", f"name={name}"],
+                   capture_output=True, text=True)
+    if count_rules(name):
+        print_error("Failed to remove the firewall blocking rules.", target=name)
+        return False
+    print_success(f"Removed {before} firewall blocking rule(s)", target=name, before=before, after=0)
+    return True
@@ -18,6 +18,11 @@ try:
 except ImportError:
     from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
 
+try:
+    from query_cache import invalidate as invalidate_query_cache
+except ImportError:
+    from modules.query_cache import invalidate as invalidate_query_cache
+
 def enable_gaming_mode():
     """Enable Gaming Mode optimizations."""
     print_header("Activating Gaming Mode")
@@ -111,6 +116,7 @@ def main():
                 print_error("Invalid choice! Please enter 1-3.")
             
             if choice in ['1', '2']:
+                invalidate_query_cache()  # Services were stopped or restarted
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
         except KeyboardInterrupt:
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Hosts File Engine for Windows 11 Update Manager
+Indexes the hosts file in one streaming pass and keeps our entries inside marked blocks:
+
+    # BEGIN win11-manager:<section>
+    127.0.0.1 example.com
+    # END win11-manager:<section>
+
+Edits are applied in a single pass while streaming to a temporary file, which then
+atomically replaces the hosts file. Nothing is written when the result is identical.
+The file's lines are never held in memory: only the block positions and the hostnames
+outside our blocks are indexed, so a block of millions of entries costs nothing until
+it is streamed through on save.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+
+HOSTS_PATH = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'System32', 'drivers', 'etc', 'hosts')
+BLOCK_ADDRESS = "127.0.0.1"
+BLOCK_ADDRESSES = ("127.0.0.1", "0.0.0.0", "::1", "::")
+BEGIN_MARKER = "# BEGIN win11-manager:"
+END_MARKER = "# END win11-manager:"
+
+
+def _parse_entry(line):
+    """Return (address, [hostnames]) for an entry line, or None for comments and blanks."""
+    content = line.split("#", 1)[0].split()
+    if len(content) < 2:
+        return None
+    return content[0], [host.lower() for host in content[1:]]
+
+
+def _strip_newline(line):
+    if line.endswith("\r\n"):
+        return line[:-2]
+    if line.endswith(("\n", "\r")):
+        return line[:-1]
+    return line
+
+
+class _Layout:
+    """Where our blocks are and which hostnames the other entries map, built line by line."""
+
+    def __init__(self):
+        self.sections = {}  # name -> (begin line, end line)
+        self.index = {}     # hostname -> line numbers of entries outside our blocks
+        self.count = 0
+        self._open = None
+
+    def skips(self, line):
+        """True (and the line is counted) for a line inside a block that can't end it."""
+        if self._open is None or END_MARKER in line:
+            return False
+        self.count += 1
+        return True
+
+    def feed(self, line):
+        number = self.count
+        self.count += 1
+        stripped = line.strip()
+        if stripped.startswith(BEGIN_MARKER):
+            self._open = (stripped[len(BEGIN_MARKER):].strip(), number)
+            return
+        if stripped.startswith(END_MARKER) and self._open:
+            self.sections[self._open[0]] = (self._open[1], number)
+            self._open = None
+            return
+        if self._open:
+            return
+        entry = _parse_entry(line)
+        if entry:
+            for host in entry[1]:
+                self.index.setdefault(host, []).append(number)
+
+    def finish(self):
+        # An unterminated block runs to the end of the file
+        if self._open:
+            self.sections[self._open[0]] = (self._open[1], self.count)
+            self._open = None
+        return self
+
+
+class HostsFile:
+    """An indexed hosts file.
+
+    hosts = HostsFile()
+    added, removed = hosts.update_section("windows-update", add=urls)
+    hosts.save()
+    """
+
+    def __init__(self, path=HOSTS_PATH):
+        self.path = path
+        self._replaced = {}  # name -> (address, iterable of hostnames) or None to remove
+        self._dropped = set()
+        try:
+            self._scan("utf-8")
+        except UnicodeDecodeError:
+            self._scan("latin-1")  # Round-trips any byte
+
+    def _raw_lines(self):
+        try:
+            with open(self.path, "rb") as f:
+                yield from f
+        except FileNotFoundError:
+            return
+
+    def _scan(self, encoding):
+        """Index the file in one streaming pass."""
+        digest = hashlib.sha256()
+        layout = _Layout()
+        newline = "\n"
+        last = b""
+        for raw in self._raw_lines():
+            digest.update(raw)
+            last = raw
+            if raw.endswith(b"\r\n"):
+                newline = "\r\n"
+            line = raw.decode(encoding)
+            if not layout.skips(line):
+                layout.feed(_strip_newline(line))
+        self.encoding = encoding
+        self.digest = digest.digest()
+        self.newline = newline
+        self.ends_with_newline = last.endswith((b"\n", b"\r")) or not last
+        self._set_layout(layout.finish())
+
+    def _set_layout(self, layout):
+        self.sections = layout.sections
+        self.index = layout.index
+        self.line_count = layout.count
+
+    def _lines(self, digest=None):
+        """Stream the file's lines again (feeding digest with the raw bytes)."""
+        for raw in self._raw_lines():
+            if digest is not None:
+                digest.update(raw)
+            yield _strip_newline(raw.decode(self.encoding, "replace"))
+
+    def iter_section(self, name):
+        """Yield the hostnames currently in a managed block, in file order."""
+        if name not in self.sections:
+            return
+        begin, end = self.sections[name]
+        # Entries are split as bytes: blocks can hold millions of lines
+        for number, raw in enumerate(self._raw_lines()):
+            if number >= end:
+                break
+            if number > begin:
+                content = raw.split(b"#", 1)[0].split()
+                for host in content[1:]:
+                    yield host.decode(self.encoding, "replace").lower()
+
+    def section(self, name):
+        """Return the hostnames currently in a managed block, in file order."""
+        return list(self.iter_section(name))
+
+    def set_section(self, name, hosts, address=BLOCK_ADDRESS):
+        """Replace a managed block with hosts (any iterable, consumed when saving)."""
+        self._replaced[name] = (address, hosts)
+
+    def update_section(self, name, add=(), remove=(), address=BLOCK_ADDRESS):
+        """Add and remove hostnames in a managed block. Returns (added, removed)."""
+        current = self.section(name)
+        existing = set(current)
+        remove = {host.lower() for host in remove}
+        added = []
+        for host in add:
+            host = host.lower()
+            if host not in existing and host not in remove:
+                existing.add(host)
+                added.append(host)
+        removed = [host for host in current if host in remove]
+        kept = [host for host in current if host not in remove]
+        if added or removed:  # Never create an empty block
+            self.set_section(name, kept + added, address)
+        return added, removed
+
+    def discard_section(self, name):
+        """Remove a managed block without reading it. Returns True if it exists."""
+        if name not in self.sections:
+            return False
+        self._replaced[name] = None
+        return True
+
+    def remove_section(self, name):
+        """Remove a managed block completely. Returns the hostnames it held."""
+        hosts = self.section(name)
+        self.discard_section(name)
+        return hosts
+
+    def drop_unmanaged(self, hosts):
+        """Remove blocking entries for hosts outside our blocks (e.g. from older versions).
+
+        Only lines that point at a loopback/null address and list nothing but the given
+        hosts are removed. Returns the hostnames whose lines were dropped.
+        """
+        hosts = {host.lower() for host in hosts}
+        candidates = {number for host in hosts for number in self.index.get(host, ())} - self._dropped
+        dropped = []
+        if not candidates:
+            return dropped
+        last = max(candidates)
+        for number, line in enumerate(self._lines()):
+            if number > last:
+                break
+            if number in candidates:
+                address, names = _parse_entry(line)
+                if address in BLOCK_ADDRESSES and hosts.issuperset(names):
+                    self._dropped.add(number)
+                    dropped.extend(names)
+        return dropped
+
+    def _render(self, lines):
+        """Yield the new file line by line, in one pass over the original lines."""
+        replaced = dict(self._replaced)
+        skip_until = None
+        for number, line in enumerate(lines):
+            if skip_until is not None:
+                if number == skip_until:
+                    skip_until = None
+                continue
+            stripped = line.strip()
+            if stripped.startswith(BEGIN_MARKER):
+                name = stripped[len(BEGIN_MARKER):].strip()
+                if name in replaced and self.sections.get(name, (None,))[0] == number:
+                    end = self.sections[name][1]
+                    replacement = replaced.pop(name)
+                    if replacement is not None:
+                        yield from self._render_section(name, *replacement)
+                    skip_until = end  # An unterminated block (end == count) skips the rest
+                    continue
+            if number not in self._dropped:
+                yield line
+
+        # New blocks go at the end
+        for name, replacement in replaced.items():
+            if replacement is not None:
+                yield from self._render_section(name, *replacement)
+
+    @staticmethod
+    def _render_section(name, address, hosts):
+        yield f"{BEGIN_MARKER}{name}"
+        for host in hosts:
+            yield f"{address} {host}"
+        yield f"{END_MARKER}{name}"
+
+    def save(self):
+        """Write the changes through a temporary file and an atomic rename.
+
+        The original is streamed through once; the new layout is indexed as it is
+        written, so the file is not read again afterwards. Returns False (and leaves
+        the file untouched) when the content is unchanged. Raises OSError if the file
+        was modified by someone else since it was indexed.
+        """
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix="hosts_", dir=directory)
+        original = hashlib.sha256()
+        digest = hashlib.sha256()
+        layout = _Layout()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                first = True
+                for line in self._render(self._lines(original)):
+                    layout.feed(line)
+                    data = (line if first else self.newline + line).encode(self.encoding)
+                    first = False
+                    digest.update(data)
+                    f.write(data)
+                if not first and self.ends_with_newline:
+                    data = self.newline.encode(self.encoding)
+                    digest.update(data)
+                    f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            if original.digest() != self.digest:
+                raise OSError(f"{self.path} was changed by another program; nothing was written")
+
+            self._replaced = {}
+            self._dropped = set()
+            if digest.digest() == self.digest:
+                os.unlink(tmp_path)
+                return False
+
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode) | stat.S_IWRITE)
+            except OSError:
+                pass
+            try:
+                os.replace(tmp_path, self.path)
+            except PermissionError:
+                # A read-only hosts file can't be replaced until the attribute is cleared
+                os.chmod(self.path, stat.S_IWRITE)
+                os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        # What was written is now on disk
+        self.digest = digest.digest()
+        if first:
+            self.ends_with_newline = True
+        self._set_layout(layout.finish())
+        return True
@@ -9,6 +9,7 @@ Year: 2025
 """
 
 import subprocess
+import time
 import winreg
 import os
 import sys
@@ -16,20 +17,28 @@ from pathlib import Path
 import ctypes
 
 try:
-    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
 except ImportError:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
+
+try:
+    from system_queries import get_onedrive_state, read_registry_value
+    from query_cache import invalidate as invalidate_query_cache
+except ImportError:
+    from modules.system_queries import get_onedrive_state, read_registry_value
+    from modules.query_cache import invalidate as invalidate_query_cache
 
 def run_command(command, description):
     """Run a command and handle errors."""
+    start = time.perf_counter()
     try:
         result = subprocess.run(command, shell=True, capture_output=True, text=True)
         if result.returncode == 0:
-            print_success(f"{description}")
+            print_success(f"{description}", target=command, duration_ms=elapsed_ms(start))
         else:
-            print_error(f"{description} - {result.stderr.strip()}")
+            print_error(f"{description} - {result.stderr.strip()}", target=command, duration_ms=elapsed_ms(start))
     except Exception as e:
-        print_error(f"{description} - {str(e)}")
+        print_error(f"{description} - {str(e)}", target=command, duration_ms=elapsed_ms(start))
 
 def stop_onedrive_processes():
     """Stop all OneDrive processes."""
@@ -93,8 +102,9 @@ def modify_onedrive_registry():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Set registry value: {reg_change['subkey']}\\{value_name}")
+                print_success(f"Set registry value: {reg_change['subkey']}\\{value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -187,25 +197,23 @@ def check_onedrive_status():
     """Check current OneDrive status."""
     print_colored(f"\n{symbols.INFO} Checking OneDrive Status", Colors.BOLD + Colors.CYAN)
     
+    state = get_onedrive_state()
+
     # Check if OneDrive process is running
-    try:
-        result = subprocess.run('tasklist /fi "imagename eq OneDrive.exe"', shell=True, capture_output=True, text=True)
-        if "OneDrive.exe" in result.stdout:
-            print_colored(f"{symbols.CHECK} OneDrive Process: RUNNING", Colors.GREEN)
-        else:
-            print_colored(f"{symbols.CROSS} OneDrive Process: NOT RUNNING", Colors.RED)
-    except:
+    if state["running"] is None:
         print_colored(f"{symbols.WARNING} OneDrive Process: ERROR CHECKING", Colors.YELLOW)
+    elif state["running"]:
+        print_colored(f"{symbols.CHECK} OneDrive Process: RUNNING", Colors.GREEN)
+    else:
+        print_colored(f"{symbols.CROSS} OneDrive Process: NOT RUNNING", Colors.RED)
     
     # Check registry settings
-    try:
-        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Policies\Microsoft\Windows\OneDrive")
+    if state["policy"] == "DISABLED":
         print_colored(f"{symbols.BLOCK} OneDrive Policies: DISABLED", Colors.RED)
-        winreg.CloseKey(key)
-    except FileNotFoundError:
+    elif state["policy"] == "ENABLED":
         print_colored(f"{symbols.CHECK} OneDrive Policies: ENABLED", Colors.GREEN)
-    except Exception as e:
-        print_colored(f"{symbols.WARNING} OneDrive Policies: ERROR - {str(e)}", Colors.YELLOW)
+    else:
+        print_colored(f"{symbols.WARNING} OneDrive Policies: ERROR - {state.get('error')}", Colors.YELLOW)
 
 def main():
     """Main OneDrive management function."""
@@ -226,6 +234,9 @@ def main():
             else:
                 print_error("Invalid choice! Please enter a number between 1-4.")
             
+            if choice == '1':
+                invalidate_query_cache()
+
             if choice in ['1', '2', '3']:
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
@@ -9,27 +9,42 @@ Year: 2025
 """
 
 import subprocess
+import time
 import winreg
 import os
 import sys
+import json
+import socket
+import tempfile
+import threading
 from pathlib import Path
 import ctypes
 
 try:
-    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
+    from stream_parse import CommandStream, parse_fixed_width, parse_key_value
 except ImportError:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
+    from modules.stream_parse import CommandStream, parse_fixed_width, parse_key_value
+
+try:
+    from query_cache import invalidate as invalidate_query_cache
+    from system_queries import read_registry_value
+except ImportError:
+    from modules.query_cache import invalidate as invalidate_query_cache
+    from modules.system_queries import read_registry_value
 
 def run_command(command, description):
     """Run a command and handle errors."""
+    start = time.perf_counter()
     try:
         result = subprocess.run(command, shell=True, capture_output=True, text=True)
         if result.returncode == 0:
-            print_success(f"{description}")
+            print_success(f"{description}", target=command, duration_ms=elapsed_ms(start))
         else:
-            print_error(f"{description} - {result.stderr.strip()}")
+            print_error(f"{description} - {result.stderr.strip()}", target=command, duration_ms=elapsed_ms(start))
     except Exception as e:
-        print_error(f"{description} - {str(e)}")
+        print_error(f"{description} - {str(e)}", target=command, duration_ms=elapsed_ms(start))
 
 def disable_unnecessary_services():
     """Disable unnecessary Windows services for better performance."""
@@ -107,8 +122,9 @@ def optimize_visual_effects():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Optimized visual effect: {value_name}")
+                print_success(f"Optimized visual effect: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -133,20 +149,19 @@ def disable_startup_programs():
     print_info("Checking for common startup programs to disable...")
     
     try:
-        # Get list of startup programs
-        result = subprocess.run(
-            'wmic startup get caption,command', 
-            shell=True, 
-            capture_output=True, 
-            text=True
-        )
-        
-        if result.returncode == 0:
-            startup_list = result.stdout
-            print_info("Current startup programs found:")
-            print_colored(startup_list, Colors.WHITE)
-        else:
+        # Print each startup entry as wmic produces it
+        found = 0
+        with CommandStream('wmic startup get caption,command') as output:
+            for entry in parse_fixed_width(output):
+                if found == 0:
+                    print_info("Current startup programs found:")
+                found += 1
+                print_colored(f"  {symbols.BULLET} {entry.get('Caption', '')}: {entry.get('Command', '')}", Colors.WHITE)
+
+        if output.returncode != 0:
             print_error("Failed to retrieve startup programs")
+        elif found == 0:
+            print_info("No startup programs found")
     except Exception as e:
         print_error(f"Error checking startup programs: {str(e)}")
 
@@ -199,8 +214,9 @@ def optimize_memory_management():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Optimized memory setting: {value_name}")
+                print_success(f"Optimized memory setting: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -256,6 +272,348 @@ def optimize_all_performance():
     print_warning("A system restart is recommended for all changes to take effect.")
     print_info("Your system should now run faster and more efficiently.")
 
+# Network tuning: each setting is read before and after so the changes can be shown as a diff
+TCPIP_INTERFACES_KEY = r"SYSTEM\CurrentControlSet\Services\Tcpip\Parameters\Interfaces"
+NETWORK_CONNECTIONS_KEY = r"SYSTEM\CurrentControlSet\Control\Network\{4D36E972-E325-11CE-BFC1-08002BE10318}"
+MULTIMEDIA_PROFILE_KEY = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\Multimedia\SystemProfile"
+BENCHMARK_SECONDS = 2.0
+BENCHMARK_ROUND_TRIPS = 2000
+# Original values of the tuned network settings, for restore_network_settings()
+NETWORK_BACKUP_FILE = os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "Win11Manager",
+                                   "network_tuning_backup.json")
+REGISTRY_ROOTS = {"HKLM": winreg.HKEY_LOCAL_MACHINE}
+
+def _read_registry_value(root, subkey, name):
+    """Return a registry value, or None if it does not exist."""
+    try:
+        with winreg.OpenKey(root, subkey) as key:
+            return winreg.QueryValueEx(key, name)[0]
+    except OSError:
+        return None
+
+def _registry_setting(label, root, subkey, name, value, value_type=winreg.REG_DWORD, pending_restart=False):
+    spec = {'kind': "registry", 'root': next(k for k, v in REGISTRY_ROOTS.items() if v == root),
+            'subkey': subkey, 'name': name, 'type': value_type}
+    return {
+        'label': label,
+        'target': f"{subkey}\\{name}",
+        'desired': value,
+        'read': lambda: _read_registry_value(root, subkey, name),
+        'apply': lambda: _write_setting(spec, value),
+        'spec': spec,
+        'pending_restart': pending_restart,
+    }
+
+def _tcp_global_setting(label, option, field, desired):
+    spec = {'kind': "netsh", 'option': option, 'field': field}
+    return {
+        'label': label,
+        'target': f"netsh tcp {option}",
+        'desired': desired,
+        'apply': lambda: _write_setting(spec, desired),
+        'spec': spec,
+        'pending_restart': False,
+    }
+
+def _write_setting(spec, value):
+    """Set a tuned value; for registry settings None deletes the value (Windows default)."""
+    if spec['kind'] == "netsh":
+        subprocess.run(f'netsh interface tcp set global {spec["option"]}={str(value).lower()}', shell=True,
+                       capture_output=True, check=True)
+        return
+    root = REGISTRY_ROOTS[spec['root']]
+    if value is None:
+        try:
+            with winreg.OpenKey(root, spec['subkey'], 0, winreg.KEY_SET_VALUE) as key:
+                winreg.DeleteValue(key, spec['name'])
+        except FileNotFoundError:
+            pass
+        return
+    with winreg.CreateKey(root, spec['subkey']) as key:
+        winreg.SetValueEx(key, spec['name'], 0, spec['type'], value)
+
+def _query_tcp_globals():
+    """Return {'autotuning': str|None, 'rss': str|None} from one PowerShell call."""
+    command = ("[pscustomobject]@{"
+               "AutoTuning = [string](Get-NetTCPSetting -SettingName Internet -ErrorAction SilentlyContinue).AutoTuningLevelLocal; "
+               "Rss = [string](Get-NetOffloadGlobalSetting -ErrorAction SilentlyContinue).ReceiveSideScaling"
+               "} | ConvertTo-Json -Compress")
+    result = subprocess.run(["powershell", "-NoProfile", "-Command", command], capture_output=True, text=True)
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return {'autotuning': None, 'rss': None}
+    return {'autotuning': data.get("AutoTuning") or None, 'rss': data.get("Rss") or None}
+
+def _interface_name(guid):
+    return _read_registry_value(winreg.HKEY_LOCAL_MACHINE, f"{NETWORK_CONNECTIONS_KEY}\\{guid}\\Connection", "Name") or guid
+
+def _connected_interfaces():
+    """Return [(guid, name)] for TCP/IP interfaces that have an address."""
+    interfaces = []
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, TCPIP_INTERFACES_KEY) as key:
+            for i in range(winreg.QueryInfoKey(key)[0]):
+                guid = winreg.EnumKey(key, i)
+                subkey = f"{TCPIP_INTERFACES_KEY}\\{guid}"
+                dhcp = _read_registry_value(winreg.HKEY_LOCAL_MACHINE, subkey, "DhcpIPAddress")
+                static = _read_registry_value(winreg.HKEY_LOCAL_MACHINE, subkey, "IPAddress")
+                if (dhcp and dhcp != "0.0.0.0") or (static and any(a != "0.0.0.0" for a in static)):
+                    interfaces.append((guid, _interface_name(guid)))
+    except OSError:
+        pass
+    return interfaces
+
+def get_network_settings():
+    """Return the network settings we tune, each with label, target, desired, read(), apply(),
+    a spec to restore it from and whether it only takes effect after a restart."""
+    tcp = {}
+
+    def tcp_global(setting):
+        def read():
+            if not tcp:
+                tcp.update(_query_tcp_globals())
+            return tcp[setting['spec']['field']]
+        setting['read'] = read
+        return setting
+
+    settings = [
+        tcp_global(_tcp_global_setting("TCP receive window auto-tuning", "autotuninglevel", 'autotuning', "Normal")),
+        tcp_global(_tcp_global_setting("Receive-side scaling (RSS)", "rss", 'rss', "Enabled")),
+        # 0xFFFFFFFF stops multimedia playback from throttling network traffic
+        _registry_setting("Network throttling index", winreg.HKEY_LOCAL_MACHINE, MULTIMEDIA_PROFILE_KEY,
+                          "NetworkThrottlingIndex", 0xFFFFFFFF),
+        # Share of CPU reserved for background tasks; 10 is the lowest value Windows honours
+        _registry_setting("System responsiveness", winreg.HKEY_LOCAL_MACHINE, MULTIMEDIA_PROFILE_KEY,
+                          "SystemResponsiveness", 10),
+    ]
+    for guid, name in _connected_interfaces():
+        subkey = f"{TCPIP_INTERFACES_KEY}\\{guid}"
+        # Send small packets immediately and acknowledge every segment (no Nagle / delayed ACK).
+        # Read by the interface's TCP/IP binding at startup, and never used by the loopback.
+        settings.append(_registry_setting(f"{name}: TCPNoDelay", winreg.HKEY_LOCAL_MACHINE, subkey, "TCPNoDelay", 1,
+                                          pending_restart=True))
+        settings.append(_registry_setting(f"{name}: TcpAckFrequency", winreg.HKEY_LOCAL_MACHINE, subkey,
+                                          "TcpAckFrequency", 1, pending_restart=True))
+    return settings
+
+def _load_network_backup():
+    try:
+        with open(NETWORK_BACKUP_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_network_backup(backup):
+    os.makedirs(os.path.dirname(NETWORK_BACKUP_FILE), exist_ok=True)
+    tmp_path = NETWORK_BACKUP_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(backup, f, indent=2)
+    os.replace(tmp_path, NETWORK_BACKUP_FILE)
+
+def _save_network_backup(settings, before):
+    """Record the values the settings had before tuning. A value already recorded is kept,
+    so tuning twice still restores what was there before the first time."""
+    backup = _load_network_backup()
+    for setting in settings:
+        if setting['target'] not in backup:
+            backup[setting['target']] = {'label': setting['label'], 'before': before[setting['label']],
+                                         'spec': setting['spec'], 'pending_restart': setting['pending_restart']}
+    _write_network_backup(backup)
+
+def _read_setting(spec, tcp):
+    if spec['kind'] == "netsh":
+        if not tcp:
+            tcp.update(_query_tcp_globals())
+        return tcp[spec['field']]
+    return _read_registry_value(REGISTRY_ROOTS[spec['root']], spec['subkey'], spec['name'])
+
+def restore_network_settings():
+    """Put back the values the network settings had before they were tuned."""
+    print_colored(f"\n{symbols.RECYCLE} Restoring Network Settings", Colors.BOLD + Colors.CYAN)
+    backup = _load_network_backup()
+    if not backup:
+        print_info("No network tuning to restore.")
+        return True
+
+    tcp = {}
+    failed = {}
+    for target, entry in backup.items():
+        if entry['spec']['kind'] == "netsh" and entry['before'] is None:
+            print_warning(f"{entry['label']}: original value unknown, left as is", target=target)
+            continue
+        start = time.perf_counter()
+        current = _read_setting(entry['spec'], tcp)
+        try:
+            _write_setting(entry['spec'], entry['before'])
+        except (OSError, subprocess.CalledProcessError) as e:
+            print_error(f"{entry['label']}: {e}", target=target, duration_ms=elapsed_ms(start))
+            failed[target] = entry
+            continue
+        print_success(f"Restored {entry['label']}", target=target, before=current, after=entry['before'],
+                      duration_ms=elapsed_ms(start))
+
+    try:
+        if failed:
+            _write_network_backup(failed)  # Try those again next time
+        else:
+            os.remove(NETWORK_BACKUP_FILE)
+    except OSError:
+        pass
+    if any(entry.get('pending_restart') for target, entry in backup.items() if target not in failed):
+        print_warning("Per-interface settings take effect after a restart.")
+    return not failed
+
+def _same(current, desired):
+    return str(current).lower() == str(desired).lower()
+
+def _loopback_listener():
+    """A listening TCP socket on a free loopback port (socket.create_server needs Python 3.8)."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    return server
+
+def _loopback_throughput(seconds):
+    """MB/s pushed through a loopback TCP connection in the given time."""
+    server = _loopback_listener()
+    received = [0]
+
+    def sink():
+        connection, _ = server.accept()
+        with connection:
+            while True:
+                data = connection.recv(1 << 20)
+                if not data:
+                    break
+                received[0] += len(data)
+
+    thread = threading.Thread(target=sink, daemon=True)
+    thread.start()
+    chunk = b"\0" * (64 * 1024)
+    with socket.create_connection(server.getsockname()) as client:
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            client.sendall(chunk)
+    thread.join()
+    elapsed = time.perf_counter() - start
+    server.close()
+    return received[0] / elapsed / (1024 * 1024)
+
+def _loopback_latency(round_trips, seconds):
+    """Round-trip times in microseconds for small request/response exchanges (at most
+    round_trips of them, stopping early after the given time).
+
+    Each request is written in two parts, the pattern that Nagle's algorithm and delayed
+    ACKs slow down, and TCP_NODELAY is left at the system default.
+    """
+    server = _loopback_listener()
+
+    def echo():
+        connection, _ = server.accept()
+        with connection:
+            while True:
+                data = connection.recv(64)
+                if not data:
+                    break
+                if len(data) < 64:
+                    data += connection.recv(64 - len(data))
+                connection.sendall(data)
+
+    thread = threading.Thread(target=echo, daemon=True)
+    thread.start()
+    samples = []
+    deadline = time.perf_counter() + seconds
+    with socket.create_connection(server.getsockname()) as client:
+        for _ in range(round_trips):
+            if samples and time.perf_counter() > deadline:
+                break
+            start = time.perf_counter()
+            client.sendall(b"h" * 16)
+            client.sendall(b"b" * 48)
+            received = 0
+            while received < 64:
+                received += len(client.recv(64 - received))
+            samples.append((time.perf_counter() - start) * 1e6)
+    thread.join()
+    server.close()
+    samples.sort()
+    return samples
+
+def network_benchmark(seconds=BENCHMARK_SECONDS, round_trips=BENCHMARK_ROUND_TRIPS):
+    """Measure loopback TCP throughput and small-message latency."""
+    latencies = _loopback_latency(round_trips, seconds)
+    return {
+        'throughput_mbps': _loopback_throughput(seconds),
+        'latency_p50_us': latencies[len(latencies) // 2],
+        'latency_p99_us': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+def _print_benchmark_diff(before, after):
+    print_colored(f"\n  {'Loopback benchmark':<26} {'Before':>12} {'After':>12} {'Change':>9}", Colors.BOLD)
+    rows = [("Throughput (MB/s)", 'throughput_mbps', True),
+            ("Latency p50 (us)", 'latency_p50_us', False),
+            ("Latency p99 (us)", 'latency_p99_us', False)]
+    for label, key, higher_is_better in rows:
+        change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        better = change > 0 if higher_is_better else change < 0
+        color = Colors.GREEN if better and abs(change) >= 5 else Colors.WHITE
+        print_colored(f"  {label:<26} {before[key]:>12.1f} {after[key]:>12.1f} {change:>+8.1f}%", color)
+
+def tune_network():
+    """Apply the network tuning settings, showing a settings diff and a before/after benchmark."""
+    print_colored(f"\n{symbols.GLOBE} Tuning the Network Stack", Colors.BOLD + Colors.CYAN)
+    settings = get_network_settings()
+    before = {s['label']: s['read']() for s in settings}
+    pending = [s for s in settings if not _same(before[s['label']], s['desired'])]
+    if not pending:
+        print_success("All network settings are already tuned")
+        return
+
+    try:
+        _save_network_backup(pending, before)
+    except OSError as e:
+        print_error(f"Could not save the current values to {NETWORK_BACKUP_FILE}, nothing was changed: {e}")
+        return
+    print_info("Current values saved; \"Restore Network Settings\" puts them back.")
+
+    # The loopback never sees the per-interface values, and they only apply after a restart
+    measurable = [s for s in pending if not s['pending_restart']]
+    if measurable:
+        print_info("Measuring loopback throughput and latency before the changes...")
+        bench_before = network_benchmark()
+
+    for setting in pending:
+        start = time.perf_counter()
+        try:
+            setting['apply']()
+        except (OSError, subprocess.CalledProcessError) as e:
+            print_error(f"{setting['label']}: {e}", target=setting['target'], duration_ms=elapsed_ms(start))
+
+    # Fresh settings, so the TCP globals are queried again
+    after = {setting['label']: setting['read']() for setting in get_network_settings()}
+
+    print_colored(f"\n  {'Setting':<40} {'Before':>12} {'After':>12}", Colors.BOLD)
+    for setting in settings:
+        label = setting['label']
+        old, new = before.get(label), after.get(label)
+        changed = not _same(old, new)
+        if changed:
+            print_success(f"Tuned {label}", target=setting['target'], before=old, after=new,
+                          pending_restart=setting['pending_restart'])
+        color = Colors.YELLOW if changed and setting['pending_restart'] else Colors.GREEN if changed else Colors.WHITE
+        note = "  pending restart" if changed and setting['pending_restart'] else ""
+        print_colored(f"  {label:<40} {str(old):>12} {str(new):>12}{note}", color)
+
+    if measurable:
+        print_info("Measuring again after the changes...")
+        bench_after = network_benchmark()
+        _print_benchmark_diff(bench_before, bench_after)
+    if len(measurable) < len(pending):
+        print_warning("Settings marked \"pending restart\" apply to the network adapters after a restart and are "
+                      "not part of the loopback benchmark.")
+
 def show_performance_menu():
     """Display performance management menu."""
     clear_screen()
@@ -267,47 +625,49 @@ def show_performance_menu():
     print_colored(f"4. {symbols.LIGHTNING} Optimize Power Settings Only", Colors.YELLOW)
     print_colored(f"5. {symbols.HARDWARE} Optimize Memory Management Only", Colors.YELLOW)
     print_colored(f"6. {symbols.CLOUD} Disable Search Indexing Only", Colors.YELLOW)
-    print_colored(f"7. {symbols.GEAR} Check System Performance", Colors.BLUE)
-    print_colored(f"8. {symbols.WAVE} Return to Main Menu", Colors.CYAN)
+    print_colored(f"7. {symbols.GLOBE} Tune Network Stack Only (measured before/after)", Colors.YELLOW)
+    print_colored(f"8. {symbols.RECYCLE} Restore Network Settings", Colors.YELLOW)
+    print_colored(f"9. {symbols.GEAR} Check System Performance", Colors.BLUE)
+    print_colored(f"10. {symbols.WAVE} Return to Main Menu", Colors.CYAN)
+
+def get_system_performance():
+    """Return {'cpu_percent': int|None, 'memory_percent': float|None}."""
+    metrics = {'cpu_percent': None, 'memory_percent': None}
+
+    # Check CPU usage (one key=value block per processor)
+    loads = []
+    with CommandStream('wmic cpu get loadpercentage /value') as output:
+        for record in parse_key_value(output):
+            if record.get('LoadPercentage', '').isdigit():
+                loads.append(int(record['LoadPercentage']))
+    if loads:
+        metrics['cpu_percent'] = round(sum(loads) / len(loads))
+
+    # Check memory usage
+    with CommandStream('wmic OS get TotalVisibleMemorySize,FreePhysicalMemory /value') as output:
+        for record in parse_key_value(output):
+            total_mem = int(record.get('TotalVisibleMemorySize') or 0)
+            free_mem = int(record.get('FreePhysicalMemory') or 0)
+            if total_mem > 0:
+                metrics['memory_percent'] = ((total_mem - free_mem) / total_mem) * 100
+
+    return metrics
 
 def check_system_performance():
     """Check current system performance metrics."""
     print_colored(f"\n{symbols.GEAR} Checking System Performance", Colors.BOLD + Colors.CYAN)
     
     try:
-        # Check CPU usage
-        result = subprocess.run(
-            'wmic cpu get loadpercentage /value', 
-            shell=True, 
-            capture_output=True, 
-            text=True
-        )
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                if 'LoadPercentage' in line and '=' in line:
-                    cpu_usage = line.split('=')[1].strip()
-                    color = Colors.GREEN if int(cpu_usage) < 50 else Colors.YELLOW
-                    print_colored(f"CPU Usage: {cpu_usage}%", color)
+        metrics = get_system_performance()
+        if metrics['cpu_percent'] is not None:
+            cpu_usage = metrics['cpu_percent']
+            color = Colors.GREEN if cpu_usage < 50 else Colors.YELLOW
+            print_colored(f"CPU Usage: {cpu_usage}%", color)
         
-        # Check memory usage
-        result = subprocess.run(
-            'wmic OS get TotalVisibleMemorySize,FreePhysicalMemory /value', 
-            shell=True, 
-            capture_output=True, 
-            text=True
-        )
-        if result.returncode == 0:
-            total_mem = free_mem = 0
-            for line in result.stdout.split('\n'):
-                if 'TotalVisibleMemorySize' in line and '=' in line:
-                    total_mem = int(line.split('=')[1].strip())
-                elif 'FreePhysicalMemory' in line and '=' in line:
-                    free_mem = int(line.split('=')[1].strip())
-            
-            if total_mem > 0:
-                used_percent = ((total_mem - free_mem) / total_mem) * 100
-                color = Colors.GREEN if used_percent < 70 else Colors.YELLOW
-                print_colored(f"Memory Usage: {used_percent:.1f}%", color)
+        if metrics['memory_percent'] is not None:
+            used_percent = metrics['memory_percent']
+            color = Colors.GREEN if used_percent < 70 else Colors.YELLOW
+            print_colored(f"Memory Usage: {used_percent:.1f}%", color)
         
     except Exception as e:
         print_error(f"Error checking system performance: {str(e)}")
@@ -318,7 +678,7 @@ def main():
         show_performance_menu()
         
         try:
-            choice = input(f"\n{Colors.BOLD}Enter your choice (1-8): {Colors.END}").strip()
+            choice = input(f"\n{Colors.BOLD}Enter your choice (1-10): {Colors.END}").strip()
             
             if choice == '1':
                 optimize_all_performance()
@@ -333,13 +693,20 @@ def main():
             elif choice == '6':
                 disable_windows_search_indexing()
             elif choice == '7':
-                check_system_performance()
+                tune_network()
             elif choice == '8':
+                restore_network_settings()
+            elif choice == '9':
+                check_system_performance()
+            elif choice == '10':
                 break
             else:
-                print_error("Invalid choice! Please enter a number between 1-8.")
+                print_error("Invalid choice! Please enter a number between 1-10.")
             
-            if choice in ['1', '2', '3', '4', '5', '6', '7']:
+            if choice in ['1', '2', '5', '6']:
+                invalidate_query_cache()  # These change service states
+
+            if choice in ['1', '2', '3', '4', '5', '6', '7', '8', '9']:
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
         except KeyboardInterrupt:
@@ -350,6 +717,11 @@ def main():
             input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
 
 if __name__ == "__main__":
+    if "--network-benchmark" in sys.argv:
+        results = network_benchmark()
+        print_info(f"Loopback: {results['throughput_mbps']:.0f} MB/s, latency p50 {results['latency_p50_us']:.0f} us, "
+                   f"p99 {results['latency_p99_us']:.0f} us")
+        sys.exit(0)
     if not ctypes.windll.shell32.IsUserAnAdmin():
         print_warning("Not running as Administrator. Some optimizations may fail.")
     main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Live Progress Panel for Windows 11 Update Manager
+Shows per-task status, a spinner, elapsed time and an overall ETA for operations that
+run in parallel. Worker threads only post events to a queue; a single renderer thread
+redraws at a fixed rate, so workers never print over each other.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import queue
+import sys
+import threading
+import time
+from itertools import islice
+
+try:
+    from console_utils import Colors, matches as symbols, events
+except ImportError:
+    from modules.console_utils import Colors, matches as symbols, events
+
+SPINNER = "|/-\\"
+MAX_VISIBLE_TASKS = 12
+
+STATUS_COLORS = {
+    "waiting": Colors.WHITE,
+    "running": Colors.CYAN,
+    "done": Colors.GREEN,
+    "failed": Colors.RED,
+    "skipped": Colors.YELLOW,
+}
+FINISHED = ("done", "failed", "skipped")
+
+
+class ProgressPanel:
+    """Thread-safe progress display.
+
+    with ProgressPanel("Removing apps") as panel:
+        panel.add_task("app1", "Microsoft.BingNews")
+        panel.start_task("app1")
+        panel.finish_task("app1", "done", "removed")
+    """
+
+    def __init__(self, title, refresh_hz=10, stream=None):
+        self.title = title
+        self.interval = 1.0 / refresh_hz
+        # Keep stdout free for JSON Lines when events are streamed there
+        self.stream = stream or (sys.stderr if events and events.to_stdout else sys.stdout)
+        self.live = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self._events = queue.Queue()
+        self._tasks = {}   # task_id -> [label, status, detail, started, finished]
+        self._order = []
+        self._running = {}  # insertion-ordered set of running task ids
+        self._done = 0
+        self._drawn_lines = 0
+        self._frame = 0
+        self._start = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -- API used by worker threads (only enqueues, never prints) --
+    def add_task(self, task_id, label):
+        self._events.put(("add", task_id, label, time.perf_counter()))
+
+    def start_task(self, task_id, detail=""):
+        self._events.put(("running", task_id, detail, time.perf_counter()))
+
+    def update_task(self, task_id, detail):
+        self._events.put(("detail", task_id, detail, time.perf_counter()))
+
+    def finish_task(self, task_id, status="done", detail=""):
+        self._events.put((status, task_id, detail, time.perf_counter()))
+
+    # -- Lifecycle --
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="progress-panel", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._drain()
+        if self.live:
+            self._draw()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # -- Renderer thread --
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._drain()
+            if self.live:
+                self._draw()
+
+    def _drain(self):
+        """Apply every queued event to the task table. Each event is O(1)."""
+        changed = False
+        while True:
+            try:
+                kind, task_id, value, stamp = self._events.get_nowait()
+            except queue.Empty:
+                return changed
+            changed = True
+            if kind == "add":
+                if task_id not in self._tasks:
+                    self._tasks[task_id] = [value, "waiting", "", None, None]
+                    self._order.append(task_id)
+                continue
+
+            task = self._tasks.get(task_id)
+            if task is None:  # An update for a task that was never added
+                task = self._tasks[task_id] = [str(task_id), "waiting", "", None, None]
+                self._order.append(task_id)
+            if kind == "detail":
+                task[2] = value
+                continue
+
+            if kind == "running":
+                task[3] = stamp
+                self._running[task_id] = None
+            elif kind in FINISHED and task[1] not in FINISHED:
+                task[4] = stamp
+                self._done += 1
+                self._running.pop(task_id, None)
+            task[1] = kind
+            task[2] = value
+            if not self.live:
+                self._print_line(task_id, task)
+            if events and kind in FINISHED:
+                duration = (task[4] - task[3]) * 1000 if task[3] else None
+                events.emit("success" if kind == "done" else kind, task[0], target=task_id,
+                            after=value or None, duration_ms=duration, operation=self.title)
+
+    def _eta(self, now):
+        remaining = len(self._tasks) - self._done
+        if not self._done or not remaining:
+            return "--"
+        seconds = (now - self._start) / self._done * remaining
+        return f"{seconds:.0f}s"
+
+    def _visible_tasks(self):
+        """Running tasks first, then the most recent others, capped so a redraw costs the same
+        however many tasks or events there are."""
+        visible = list(islice(self._running, MAX_VISIBLE_TASKS))
+        if len(visible) < MAX_VISIBLE_TASKS:
+            recent = (t for t in reversed(self._order[-MAX_VISIBLE_TASKS * 2:]) if t not in self._running)
+            visible += islice(recent, MAX_VISIBLE_TASKS - len(visible))
+        return visible
+
+    def _format(self, task_id, task, now):
+        label, status, detail, started, finished = task
+        if status == "running":
+            mark = SPINNER[self._frame % len(SPINNER)]
+        elif status == "done":
+            mark = symbols.CHECK
+        elif status == "failed":
+            mark = symbols.CROSS
+        else:
+            mark = symbols.BULLET
+        elapsed = ""
+        if started:
+            elapsed = f"{(finished or now) - started:6.1f}s"
+        text = f"  {mark} {label[:40]:<40} {status:<8} {elapsed:>7}  {detail}"
+        return f"{STATUS_COLORS.get(status, Colors.WHITE)}{text[:110]}{Colors.END}"
+
+    def _draw(self):
+        now = time.perf_counter()
+        self._frame += 1
+        lines = [
+            f"{Colors.BOLD}{Colors.CYAN}{self.title}: {self._done}/{len(self._tasks)} finished, "
+            f"elapsed {now - self._start:.1f}s, ETA {self._eta(now)}{Colors.END}"
+        ]
+        lines += [self._format(t, self._tasks[t], now) for t in self._visible_tasks()]
+
+        out = []
+        if self._drawn_lines:
+            out.append(f"\033[{self._drawn_lines}A")
+        for line in lines:
+            out.append(f"\r\033[K{line}\n")
+        # Clear rows left over from a taller previous frame
+        for _ in range(self._drawn_lines - len(lines)):
+            out.append("\r\033[K\n")
+        self._drawn_lines = max(self._drawn_lines, len(lines))
+        self._write("".join(out))
+
+    def _print_line(self, task_id, task):
+        label, status, detail, _, _ = task
+        self._write(f"[{self.title}] {label}: {status}{' - ' + detail if detail else ''}\n")
+
+    def _write(self, text):
+        try:
+            self.stream.write(text)
+            self.stream.flush()
+        except Exception:
+            pass
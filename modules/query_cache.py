@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Shared Query Cache for Windows 11 Update Manager
+Stores the results of slow status queries (sc, reg, tasklist, PowerShell) on disk
+so that the launcher and every module process can reuse them for a short time.
+
+Writers hold an exclusive lock on LOCK_FILE, so the launcher and module processes
+never lose each other's updates. invalidate() leaves a timestamped marker behind:
+a query that started before the marker (e.g. a slow background prefetch racing a
+module that just changed the system) does not write its stale result back.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+CACHE_FILE = os.path.join(tempfile.gettempdir(), "win11_manager_query_cache.json")
+LOCK_FILE = CACHE_FILE + ".lock"
+DEFAULT_TTL = 120  # seconds
+ALL_KEYS = "*"  # Marker key written by invalidate() without arguments
+
+_lock = threading.Lock()
+
+
+@contextmanager
+def _locked():
+    """Serialise writers within this process and across processes."""
+    with _lock:
+        fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if msvcrt:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # Retries for ~10 s, then raises
+                        break
+                    except OSError:
+                        continue
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if msvcrt:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def _load():
+    """Read the cache file, returning an empty cache if it is missing or corrupt."""
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(data):
+    """Write the cache atomically so concurrent readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(prefix="win11_cache_", dir=os.path.dirname(CACHE_FILE))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def get_cached(key, ttl=DEFAULT_TTL):
+    """Return the cached value for key, or None if it is missing, invalidated or older than ttl."""
+    entry = _load().get(key)  # Writes are atomic, so reading needs no lock
+    if not entry or "value" not in entry or time.time() - entry.get("time", 0) > ttl:
+        return None
+    return entry["value"]
+
+
+def set_cached(key, value, started=None):
+    """Store a JSON-serialisable value under key.
+
+    started is when the query producing value began; the value is dropped (and False
+    returned) if key was invalidated after that.
+    """
+    with _locked():
+        data = _load()
+        if started is not None:
+            invalidated = max(data.get(k, {}).get("invalidated", 0) for k in (key, ALL_KEYS))
+            if invalidated >= started:
+                return False
+        data[key] = {"time": time.time(), "value": value}
+        _save(data)
+    return True
+
+
+def invalidate(*keys):
+    """Drop the given keys, or the whole cache when called without arguments."""
+    now = time.time()
+    with _locked():
+        if not keys:
+            data = {ALL_KEYS: {"invalidated": now}}
+        else:
+            data = _load()
+            for key in keys:
+                data[key] = {"invalidated": now}
+        _save(data)
+
+
+def last_invalidated():
+    """Return when any key (or the whole cache) was last invalidated, 0 if never."""
+    return max((entry.get("invalidated", 0) for entry in _load().values() if isinstance(entry, dict)), default=0)
+
+
+def cached_query(key, query, ttl=DEFAULT_TTL, refresh=False):
+    """Return the cached result of query() or run it and cache the result."""
+    if not refresh:
+        value = get_cached(key, ttl)
+        if value is not None:
+            return value
+    started = time.time()
+    value = query()
+    if value is not None:
+        set_cached(key, value, started)
+    return value
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Persistent Scan Index for Windows 11 Update Manager
+Keeps per-directory file totals in a small SQLite database so the cleaner can estimate
+how much a cleanup would free without walking every file again. A directory is only
+re-listed when its modification time changed since the last scan.
+
+File sizes and modification times are indexed too, so an estimate can apply the same
+retention rules as the cleanup (e.g. only files older than 14 days) without a stat per
+file. The per-directory result of a rule is cached as well, and only worked out again
+when the directory changed or one of its young files has since become old enough.
+
+Note: a directory's mtime changes when entries are added, removed or renamed, not when
+an existing file grows in place, so estimates are estimates.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+
+INDEX_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "Win11Manager")
+INDEX_FILE = os.path.join(INDEX_DIR, "scan_index.sqlite")
+
+FILE_ATTRIBUTE_REPARSE_POINT = 0x400
+SEPARATOR = "\0"
+SCHEMA_VERSION = 2
+
+_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    file_bytes INTEGER NOT NULL,
+    file_count INTEGER NOT NULL,
+    subdirs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+CREATE TABLE IF NOT EXISTS matched (
+    dir TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    file_bytes INTEGER NOT NULL,
+    file_count INTEGER NOT NULL,
+    kept_bytes INTEGER NOT NULL,
+    kept_count INTEGER NOT NULL,
+    young_from REAL,
+    PRIMARY KEY (dir, rule)
+);
+"""
+
+
+def _connect():
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    conn = sqlite3.connect(INDEX_FILE, timeout=5)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        # Older indexes have no per-file rows; rebuild rather than under-estimate
+        conn.executescript("DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS files;")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _is_link(entry):
+    if entry.is_symlink():
+        return True
+    try:
+        return bool(getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0) & FILE_ATTRIBUTE_REPARSE_POINT)
+    except OSError:
+        return False
+
+
+def _list_directory(path):
+    """Return (files, subdir_names) for the direct children of path; files are (name, size, mtime)."""
+    files = []
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if _is_link(entry):
+                continue  # Links are removed, never followed, and free nothing
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+                continue
+            try:
+                info = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            files.append((entry.name, info.st_size, info.st_mtime))
+    return files, subdirs
+
+
+def _forget(conn, path):
+    """Drop the rows of a directory that disappeared and everything below it."""
+    prefix = path.rstrip("\\/") + os.sep
+    # Everything starting with prefix, as a range the indexes can serve
+    upper = prefix[:-1] + chr(ord(os.sep) + 1)
+    conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, prefix, upper))
+    conn.execute("DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, prefix, upper))
+    conn.execute("DELETE FROM matched WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, prefix, upper))
+
+
+def _match_directory(conn, directory, mtime_ns, files, rule):
+    """(file_bytes, file_count, kept_bytes, kept_count) of a directory under rule, cached per rule."""
+    row = conn.execute("SELECT mtime_ns, file_bytes, file_count, kept_bytes, kept_count, young_from "
+                       "FROM matched WHERE dir = ? AND rule = ?", (directory, rule['key'])).fetchone()
+    # Files only ever age into the rule, so the cache holds until its youngest eligible file does
+    if row and row[0] == mtime_ns and (row[5] is None or rule['min_mtime'] < row[5]):
+        return row[1:5]
+
+    if files is None:
+        files = conn.execute("SELECT name, size, mtime FROM files WHERE dir = ?", (directory,))
+    totals = [0, 0, 0, 0]
+    young_from = None
+    for name, size, mtime in files:
+        if not rule['eligible'](os.path.join(directory, name)):
+            totals[2] += size
+            totals[3] += 1
+        elif mtime > rule['min_mtime']:
+            totals[2] += size
+            totals[3] += 1
+            young_from = mtime if young_from is None else min(young_from, mtime)
+        else:
+            totals[0] += size
+            totals[1] += 1
+    conn.execute("INSERT OR REPLACE INTO matched VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                 (directory, rule['key'], mtime_ns, *totals, young_from))
+    return totals
+
+
+def estimate(path, matcher=None, rule=None):
+    """Return {'bytes', 'files', 'dirs', 'rescanned', 'kept', 'kept_bytes'} for everything below path.
+
+    Unchanged directories cost one stat each; only directories whose mtime changed are
+    listed again and written back to the index. 'rescanned' counts those directories.
+
+    rule = {'key': str, 'eligible': callable(file_path), 'min_mtime': float} counts the
+    eligible files modified at or before min_mtime in bytes/files and the rest in
+    kept/kept_bytes. Its per-directory totals are cached under key, which must identify
+    everything eligible() depends on. matcher(file_path, size, mtime) does the same for
+    any predicate, but is called for every file on every estimate.
+    """
+    result = {"bytes": 0, "files": 0, "dirs": 0, "rescanned": 0, "kept": 0, "kept_bytes": 0}
+    if not os.path.isdir(path):
+        return result
+
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                stack = [os.path.abspath(path)]
+                while stack:
+                    directory = stack.pop()
+                    try:
+                        mtime_ns = os.stat(directory).st_mtime_ns
+                    except OSError:
+                        _forget(conn, directory)
+                        continue
+
+                    row = conn.execute("SELECT mtime_ns, file_bytes, file_count, subdirs FROM dirs WHERE path = ?",
+                                       (directory,)).fetchone()
+                    files = None
+                    if row and row[0] == mtime_ns:
+                        file_bytes, file_count = row[1], row[2]
+                        subdirs = row[3].split(SEPARATOR) if row[3] else []
+                    else:
+                        try:
+                            files, subdirs = _list_directory(directory)
+                        except OSError:
+                            continue
+                        if row:
+                            old = set(row[3].split(SEPARATOR)) if row[3] else set()
+                            for name in old.difference(subdirs):
+                                _forget(conn, os.path.join(directory, name))
+                        file_bytes = sum(size for _, size, _ in files)
+                        file_count = len(files)
+                        conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?)",
+                                     (directory, mtime_ns, file_bytes, file_count, SEPARATOR.join(subdirs)))
+                        conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+                        conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?)",
+                                         ((directory, name, size, mtime) for name, size, mtime in files))
+                        result["rescanned"] += 1
+
+                    if rule is not None:
+                        matched_bytes, matched_count, kept_bytes, kept_count = _match_directory(
+                            conn, directory, mtime_ns, files, rule)
+                        result["bytes"] += matched_bytes
+                        result["files"] += matched_count
+                        result["kept_bytes"] += kept_bytes
+                        result["kept"] += kept_count
+                    elif matcher is None:
+                        result["bytes"] += file_bytes
+                        result["files"] += file_count
+                    else:
+                        if files is None:
+                            files = conn.execute("SELECT name, size, mtime FROM files WHERE dir = ?", (directory,))
+                        for name, size, mtime in files:
+                            if matcher(os.path.join(directory, name), size, mtime):
+                                result["bytes"] += size
+                                result["files"] += 1
+                            else:
+                                result["kept"] += 1
+                                result["kept_bytes"] += size
+                    result["dirs"] += len(subdirs)
+                    stack.extend(os.path.join(directory, name) for name in subdirs)
+        finally:
+            conn.close()
+    return result
+
+
+def clear_index():
+    """Remove the index file; the next estimate rebuilds it."""
+    with _lock:
+        try:
+            os.remove(INDEX_FILE)
+        except OSError:
+            pass
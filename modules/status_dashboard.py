@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+System Status Dashboard for Windows 11 Update Manager
+Runs every status probe concurrently under a global deadline and shows one summary table.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+try:
+    from console_utils import Colors, print_colored, print_header, print_success, print_error, print_warning
+except ImportError:
+    from modules.console_utils import Colors, print_colored, print_header, print_success, print_error, print_warning
+
+try:
+    import system_queries
+    import context_menu_manager
+    import dns_manager
+    import activation_manager
+    import performance_manager
+except ImportError:
+    from modules import system_queries, context_menu_manager, dns_manager, activation_manager, performance_manager
+
+try:
+    from progress_panel import ProgressPanel
+except ImportError:
+    from modules.progress_panel import ProgressPanel
+
+DEFAULT_DEADLINE = 8.0  # seconds
+
+
+def probe_updates(refresh=False):
+    """Windows Update services and policy."""
+    services = ["wuauserv", "bits", "dosvc", "UsoSvc"]
+    system_queries.get_service_inventory(refresh)  # Refreshed once for all four services
+    states = {service: system_queries.get_service_state(service) for service in services}
+    policy = system_queries.get_update_policy(refresh)["policy"]
+    running = [s for s, state in states.items() if state == "RUNNING"]
+    summary = f"Policy {policy}, {len(running)}/{len(services)} services running"
+    return summary, {"policy": policy, "services": states}
+
+
+def probe_telemetry(refresh=False):
+    """DiagTrack service and telemetry policy."""
+    diagtrack = system_queries.get_service_state("DiagTrack", refresh)
+    policy = system_queries.get_telemetry_policy(refresh)["policy"]
+    return f"DiagTrack {diagtrack}, policy {policy}", {"diagtrack": diagtrack, "policy": policy}
+
+
+def probe_onedrive(refresh=False):
+    """OneDrive process and policy."""
+    state = system_queries.get_onedrive_state(refresh)
+    running = {True: "RUNNING", False: "NOT RUNNING", None: "UNKNOWN"}[state["running"]]
+    return f"Process {running}, policy {state['policy']}", state
+
+
+def probe_context_menu(refresh=False):
+    """Classic or modern context menu (always read live)."""
+    style = context_menu_manager.get_context_menu_style()
+    return style, {"style": style}
+
+
+def probe_dns(refresh=False):
+    """DNS servers of the connected adapters."""
+    adapters = dns_manager.get_connected_adapters(refresh)
+    summary = "; ".join(f"{a['name']}: {', '.join(a['ipv4']) if a['ipv4'] else 'Automatic (DHCP) / Unknown'}"
+                        for a in adapters) or "No connected adapter"
+    return summary, {"adapters": [{"adapter": a['name'], "servers": a['ipv4'] + a['ipv6']} for a in adapters]}
+
+
+def probe_activation(refresh=False):
+    """Windows license status (always read live)."""
+    status = activation_manager.get_activation_status()
+    if not status:
+        raise RuntimeError("activation status unavailable")
+    return status["license_status"], status
+
+
+def probe_performance(refresh=False):
+    """Current CPU and memory load (always read live)."""
+    metrics = performance_manager.get_system_performance()
+    cpu = metrics["cpu_percent"]
+    mem = metrics["memory_percent"]
+    summary = f"CPU {cpu if cpu is not None else '?'}%, Memory {f'{mem:.1f}' if mem is not None else '?'}%"
+    return summary, metrics
+
+
+PROBES = [
+    ("Windows Update", probe_updates),
+    ("Telemetry", probe_telemetry),
+    ("OneDrive", probe_onedrive),
+    ("Context Menu", probe_context_menu),
+    ("DNS", probe_dns),
+    ("Activation", probe_activation),
+    ("Performance", probe_performance),
+]
+
+
+def _timed(name, probe, panel, results, refresh=False):
+    """Run a probe, measure how long it took and store its result."""
+    panel.start_task(name)
+    start = time.perf_counter()
+    try:
+        summary, data = probe(refresh)
+    except Exception as e:
+        panel.finish_task(name, "failed", str(e))
+        results[name] = {"status": "error", "summary": f"ERROR - {e}", "data": None, "duration_ms": None}
+        return
+    panel.finish_task(name, "done", summary)
+    results[name] = {"status": "ok", "summary": summary, "data": data,
+                     "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def collect_status(deadline=DEFAULT_DEADLINE, refresh=False):
+    """Run all probes concurrently. Probes still running at the deadline are reported as pending.
+
+    Each probe runs in a daemon thread, so one that hangs never keeps the process alive.
+    With refresh, cached system queries are run again instead of being reused.
+    """
+    results = {}
+    with ProgressPanel("Collecting status") as panel:
+        threads = {}
+        for name, probe in PROBES:
+            panel.add_task(name, name)
+            threads[name] = threading.Thread(target=_timed, args=(name, probe, panel, results, refresh),
+                                             name=f"status-{name}", daemon=True)
+            threads[name].start()
+        end = time.monotonic() + deadline
+        for thread in threads.values():
+            thread.join(max(0, end - time.monotonic()))
+        finished = dict(results)  # Late probes may still write to results
+        for name in threads:
+            if name not in finished:
+                panel.finish_task(name, "skipped", "pending")
+
+    for name in threads:
+        if name not in finished:
+            finished[name] = {"status": "pending", "summary": "pending", "data": None, "duration_ms": None}
+    return finished
+
+
+def render_dashboard(results):
+    """Print the collected results as one table."""
+    print_header("SYSTEM STATUS DASHBOARD")
+    width = max(len(name) for name, _ in PROBES)
+    colors = {"ok": Colors.GREEN, "pending": Colors.YELLOW, "error": Colors.RED}
+    for name, _ in PROBES:
+        result = results[name]
+        print_colored(f"  {name.ljust(width)}  {result['summary']}", colors[result["status"]])
+
+    pending = [name for name, result in results.items() if result["status"] == "pending"]
+    if pending:
+        print_warning(f"Still pending after the deadline: {', '.join(pending)}")
+
+
+def write_json(results, path, deadline=DEFAULT_DEADLINE):
+    """Write the collected results to path as JSON."""
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "deadline_seconds": deadline,
+        "probes": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+
+
+def show_dashboard(deadline=DEFAULT_DEADLINE, json_path=None, refresh=False):
+    """Collect, render and optionally save the dashboard."""
+    results = collect_status(deadline, refresh)
+    render_dashboard(results)
+    if json_path:
+        try:
+            write_json(results, json_path, deadline)
+            print_success(f"Status written to {json_path}")
+        except OSError as e:
+            print_error(f"Failed to write {json_path}: {e}")
+    return results
+
+
+def main():
+    json_path = None
+    if "--json" in sys.argv:
+        index = sys.argv.index("--json")
+        json_path = sys.argv[index + 1] if index + 1 < len(sys.argv) else "system_status.json"
+
+    results = show_dashboard(json_path=json_path)
+    if json_path:
+        return
+
+    while True:
+        choice = input(f"\n{Colors.BOLD}[R]efresh, [S]ave as JSON, or Enter to return: {Colors.END}").strip().lower()
+        if choice == 'r':
+            results = show_dashboard(refresh=True)
+        elif choice == 's':
+            path = input(f"{Colors.BOLD}JSON file (system_status.json): {Colors.END}").strip() or "system_status.json"
+            try:
+                write_json(results, os.path.abspath(path))
+                print_success(f"Status written to {os.path.abspath(path)}")
+            except OSError as e:
+                print_error(f"Failed to write {path}: {e}")
+        else:
+            break
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_colored("\n\nReturning to main menu...", Colors.CYAN)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Streaming Command Output for Windows 11 Update Manager
+Runs a command and reads its stdout incrementally as bytes, decoding with the console
+code page, so callers can show the first records while the command is still running
+and never hold the whole output in memory.
+
+    with CommandStream('wmic startup get caption,command') as out:
+        for record in parse_fixed_width(out):
+            print(record['Caption'])
+    out.returncode
+
+Parsers take any iterable of lines: key=value blocks, CSV, fixed-width tables and
+JSON lines.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import codecs
+import csv
+import ctypes
+import json
+import locale
+import re
+import subprocess
+
+CHUNK_SIZE = 8192
+
+
+def _code_page(function):
+    """"cpNNN" from a kernel32 code page function, or None when there is none.
+
+    GetConsoleOutputCP() returns 0 when the process has no console.
+    """
+    try:
+        code_page = getattr(ctypes.windll.kernel32, function)()
+    except (AttributeError, OSError):
+        return None
+    if not code_page:
+        return None
+    try:
+        codecs.lookup(f"cp{code_page}")
+    except LookupError:
+        return None
+    return f"cp{code_page}"
+
+
+def console_encoding():
+    """Encoding console programs use when writing to our pipe (the console output code page)."""
+    encoding = _code_page("GetConsoleOutputCP") or _code_page("GetOEMCP")
+    if encoding == "cp65001":
+        return "utf-8"
+    return encoding or locale.getpreferredencoding(False)
+
+
+def ansi_encoding():
+    """The ANSI code page (used by Windows Script Host output, e.g. slmgr.vbs)."""
+    return _code_page("GetACP") or locale.getpreferredencoding(False)
+
+
+class CommandStream:
+    """Iterate over a command's output lines while it runs.
+
+    Output starting with a UTF-16 byte order mark (as some WMI tools write) is decoded
+    as UTF-16 whatever the encoding. returncode is set once the output is exhausted
+    or the stream is closed.
+    """
+
+    def __init__(self, args, encoding=None, shell=None, chunk_size=CHUNK_SIZE):
+        self.args = args
+        self.encoding = encoding or console_encoding()
+        self.shell = isinstance(args, str) if shell is None else shell
+        self.chunk_size = chunk_size
+        self.process = None
+        self.returncode = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.args, shell=self.shell, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __iter__(self):
+        if self.process is None:
+            self.__enter__()
+        return self.lines()
+
+    def _chunks(self):
+        stdout = self.process.stdout
+        read = getattr(stdout, "read1", stdout.read)
+        while True:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _decoder(self, head):
+        encoding = "utf-16" if head.startswith(codecs.BOM_UTF16_LE) else self.encoding
+        return codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def lines(self):
+        """Yield decoded lines without line endings."""
+        decoder = None
+        head = b""  # The decoder is chosen once the first two bytes (a possible BOM) are in
+        pending = ""
+        for chunk in self._chunks():
+            if decoder is None:
+                head += chunk
+                if len(head) < len(codecs.BOM_UTF16_LE):
+                    continue
+                decoder = self._decoder(head)
+                chunk, head = head, b""
+            pending += decoder.decode(chunk)
+            *complete, pending = pending.split("\n")
+            for line in complete:
+                yield line.rstrip("\r")
+        if decoder is None and head:
+            decoder = self._decoder(head)
+            pending += decoder.decode(head)
+        if decoder is not None:
+            pending += decoder.decode(b"", final=True)
+        if pending.rstrip("\r"):
+            yield pending.rstrip("\r")
+        self.returncode = self.process.wait()
+
+    def close(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.stdout.close()
+        self.returncode = self.process.wait()
+
+
+def parse_key_value(lines, separator="="):
+    """Yield one dict per block of "key=value" lines; blank lines end a block.
+
+    With separator=":" this reads "Name: value" reports such as slmgr /dli. Lines
+    without the separator are skipped.
+    """
+    record = {}
+    for line in lines:
+        if not line.strip():
+            if record:
+                yield record
+                record = {}
+            continue
+        key, found, value = line.partition(separator)
+        if found and key.strip():
+            record[key.strip()] = value.strip()
+    if record:
+        yield record
+
+
+def parse_csv(lines, header=True):
+    """Yield a dict per CSV row (or a list when header=False). Blank lines are skipped."""
+    reader = csv.reader(line for line in lines if line.strip())
+    if not header:
+        yield from reader
+        return
+    columns = next(reader, None)
+    if columns is None:
+        return
+    for row in reader:
+        yield dict(zip(columns, row))
+
+
+def _column_starts(header, ruler=None):
+    """Column start offsets: from a dash ruler line when there is one, else the header words."""
+    source = ruler if ruler is not None else header
+    pattern = r"-+" if ruler is not None else r"\S+"
+    return [match.start() for match in re.finditer(pattern, source)]
+
+
+def parse_fixed_width(lines):
+    """Yield a dict per row of a column-aligned table (wmic, Format-Table, tasklist...).
+
+    The first non-blank line is the header. An optional ruler line of dashes under it
+    defines the columns, otherwise each header word starts a column. The last column
+    runs to the end of the line.
+    """
+    lines = iter(lines)
+    header = next((line for line in lines if line.strip()), None)
+    if header is None:
+        return
+    starts = _column_starts(header)
+    first = next(lines, None)
+    if first is not None and first.strip() and set(first.strip()) <= {"-", " "}:
+        starts = _column_starts(header, first)
+        first = None
+
+    names = [header[start:end].strip() for start, end in zip(starts, starts[1:] + [None])]
+
+    def row(line):
+        return {name: line[start:end].strip() for name, start, end in zip(names, starts, starts[1:] + [None])}
+
+    if first is not None and first.strip():
+        yield row(first)
+    for line in lines:
+        if line.strip():
+            yield row(line)
+
+
+def parse_json_lines(lines):
+    """Yield one object per JSON line; blank and malformed lines are skipped."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
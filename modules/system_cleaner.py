@@ -10,67 +10,918 @@ Year: 2025
 
 import subprocess
 import os
-import shutil
+import stat
+import sys
+import tempfile
 import time
+import zipfile
+import zlib
 import ctypes
+import fnmatch
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import queue
+import re
+import tarfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
 
 try:
     from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
 except ImportError:
     from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info
 
-def get_dir_size(path):
-    """Calculate directory size in MB."""
-    total_size = 0
+try:
+    from progress_panel import ProgressPanel
+except ImportError:
+    from modules.progress_panel import ProgressPanel
+
+try:
+    import scan_index
+    import cleanup_targets
+    import dns_cache
+except ImportError:
+    from modules import scan_index, cleanup_targets, dns_cache
+
+# Parallel delete workers per volume (override with WIN11_CLEAN_WORKERS)
+CLEAN_WORKERS_PER_VOLUME = max(1, int(os.environ.get("WIN11_CLEAN_WORKERS", "4")))
+FILES_PER_TASK = 256
+
+FILE_ATTRIBUTE_REPARSE_POINT = 0x400
+
+def _is_link(entry):
+    """True for symlinks and junctions, which must be unlinked and never descended into."""
+    if entry.is_symlink():
+        return True
     try:
-        if os.path.exists(path):
-            for dirpath, dirnames, filenames in os.walk(path):
-                for f in filenames:
-                    fp = os.path.join(dirpath, f)
-                    try:
-                        total_size += os.path.getsize(fp)
-                    except:
-                        pass
-        return total_size / (1024 * 1024)
-    except:
-        return 0
+        attributes = entry.stat(follow_symlinks=False).st_file_attributes
+        return bool(attributes & FILE_ATTRIBUTE_REPARSE_POINT)
+    except (AttributeError, OSError):
+        return False
 
-def clean_directory(path, name):
-    """Clean contents of a directory."""
-    if not os.path.exists(path):
+ERROR_SHARING_VIOLATION = 32
+ERROR_LOCK_VIOLATION = 33
+ERROR_MORE_DATA = 234
+MOVEFILE_DELAY_UNTIL_REBOOT = 0x4
+MAX_LOCK_OWNER_LOOKUPS = 20
+
+def _is_in_use(error):
+    """True when an OSError means another process has the file open."""
+    return getattr(error, 'winerror', None) in (ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION)
+
+def _remove_file(path):
+    """Delete a file, clearing the read-only attribute if that is what blocks it."""
+    try:
+        os.unlink(path)
+    except PermissionError as e:
+        if _is_in_use(e):
+            raise  # Open in another process: chmod won't help, fail fast
+        os.chmod(path, stat.S_IWRITE)
+        os.unlink(path)
+
+def _remove_link(path):
+    """Delete a symlink or junction without touching its target."""
+    try:
+        os.unlink(path)
+    except (IsADirectoryError, PermissionError):
+        os.rmdir(path)
+
+def new_clean_stats():
+    """Counters filled in by scan_and_delete."""
+    return {'freed_bytes': 0, 'deleted': 0, 'failed': 0, 'failed_bytes': 0, 'kept': 0, 'kept_bytes': 0, 'locked': 0}
+
+# Retention rules per cleanup target. Targets without a rule are emptied completely.
+#   min_age_days: only delete files (and empty folders) not modified for this long
+#   include:      only delete files matching one of these globs
+#   exclude:      never delete files matching one of these globs
+#   max_total_mb: also evict the oldest of the files kept for being too young until
+#                 they fit in this many MB
+# Globs without a "/" match the file name, otherwise the path relative to the target.
+RETENTION_RULES = {
+    "User Temp": {"min_age_days": 1},
+    "Windows Temp": {"min_age_days": 1},
+    "Prefetch": {"min_age_days": 14, "include": ["*.pf"]},
+}
+
+KEEP, YOUNG, DELETE = 0, 1, 2
+
+def _compile_globs(patterns):
+    """Compile a list of globs into one case-insensitive regex, or None."""
+    if not patterns:
+        return None
+    parts = []
+    for pattern in patterns:
+        pattern = pattern.replace("\\", "/")
+        regex = fnmatch.translate(pattern)
+        parts.append(regex if "/" in pattern else "(?:.*/)?" + regex)
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+def compile_retention(rule, root):
+    """Turn a RETENTION_RULES entry into the matcher used during traversal, or None."""
+    if not rule:
+        return None
+    max_total = rule.get("max_total_mb")
+    return {
+        'root_len': len(root.rstrip("\\/")) + 1,
+        'min_mtime': time.time() - rule.get("min_age_days", 0) * 86400,
+        'include': _compile_globs(rule.get("include")),
+        'exclude': _compile_globs(rule.get("exclude")),
+        'max_total': max_total * 1024 * 1024 if max_total is not None else None,
+    }
+
+def _retention_protects(retention, path):
+    """True if the include/exclude patterns keep path whatever its age."""
+    if retention['include'] or retention['exclude']:
+        relative = path[retention['root_len']:].replace("\\", "/")
+        if retention['exclude'] and retention['exclude'].match(relative):
+            return True
+        if retention['include'] and not retention['include'].match(relative):
+            return True
+    return False
+
+def _retention_verdict(retention, path, mtime):
+    """KEEP (protected by the patterns), YOUNG (kept for its age) or DELETE."""
+    if _retention_protects(retention, path):
+        return KEEP
+    return YOUNG if mtime > retention['min_mtime'] else DELETE
+
+def scan_and_delete(path, stats=None, remove_root=False, retention=None, evictable=None, deferred=None):
+    """Delete everything below path in a single post-order os.scandir traversal.
+
+    File sizes come from the DirEntry stat the traversal already has (free on Windows),
+    and bytes are only counted as freed once the delete succeeded. Files that could not
+    be removed are counted in failed/failed_bytes. The root directory itself is kept
+    unless remove_root is set.
+
+    With a compiled retention rule, files it keeps are counted in kept/kept_bytes and
+    folders holding them stay. Files kept only for their age are appended to evictable
+    as (mtime, size, path) when a list is passed.
+
+    When a deferred list is passed, files that are open in another process are appended
+    to it as (path, size) for one later retry instead of being counted as failed.
+    """
+    stats = stats if stats is not None else new_clean_stats()
+    try:
+        # [dir path, iterator, still empty, dir mtime]
+        stack = [[path, os.scandir(path), True, os.stat(path).st_mtime if retention else 0]]
+    except OSError:
+        stats['failed'] += 1
+        return stats
+
+    while stack:
+        frame = stack[-1]
+        entry = next(frame[1], None)
+
+        if entry is None:
+            # Directory finished: remove it once all of its children are gone
+            frame[1].close()
+            stack.pop()
+            if not stack and not remove_root:
+                break
+            if frame[2] and retention and frame[3] > retention['min_mtime']:
+                frame[2] = False  # Freshly created folder, probably about to be used
+            elif frame[2]:
+                try:
+                    os.rmdir(frame[0])
+                    stats['deleted'] += 1
+                    continue
+                except OSError:
+                    stats['failed'] += 1
+            if stack:
+                stack[-1][2] = False
+            continue
+
+        if _is_link(entry):
+            try:
+                _remove_link(entry.path)
+                stats['deleted'] += 1
+            except OSError:
+                stats['failed'] += 1
+                frame[2] = False
+            continue
+
+        try:
+            info = entry.stat(follow_symlinks=False)
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            info = None
+            is_dir = False
+
+        if is_dir:
+            try:
+                stack.append([entry.path, os.scandir(entry.path), True, info.st_mtime])
+            except OSError:
+                stats['failed'] += 1
+                frame[2] = False
+            continue
+
+        size = info.st_size if info else 0
+        if retention and info:
+            verdict = _retention_verdict(retention, entry.path, info.st_mtime)
+            if verdict != DELETE:
+                stats['kept'] += 1
+                stats['kept_bytes'] += size
+                frame[2] = False
+                if verdict == YOUNG and evictable is not None:
+                    evictable.append((info.st_mtime, size, entry.path))
+                continue
+        try:
+            _remove_file(entry.path)
+            stats['freed_bytes'] += size
+            stats['deleted'] += 1
+        except OSError as e:
+            frame[2] = False
+            if deferred is not None and _is_in_use(e):
+                deferred.append((entry.path, size))
+                continue
+            stats['failed'] += 1
+            stats['failed_bytes'] += size
+
+    return stats
+
+def iter_tree(path):
+    """Walk path once with os.scandir, without following links or junctions.
+
+    Yields ('file', path, size, mtime) for every file and ('dir', path, total_bytes, mtime)
+    for every directory after its contents, so directory totals need no second pass.
+    Memory is proportional to the tree depth, not to the number of files.
+    """
+    try:
+        stack = [[path, os.scandir(path), 0, os.stat(path).st_mtime]]  # [path, iterator, bytes, mtime]
+    except OSError:
+        return
+
+    while stack:
+        frame = stack[-1]
+        entry = next(frame[1], None)
+        if entry is None:
+            frame[1].close()
+            stack.pop()
+            if stack:
+                stack[-1][2] += frame[2]
+            yield 'dir', frame[0], frame[2], frame[3]
+            continue
+
+        if _is_link(entry):
+            continue
+        try:
+            info = entry.stat(follow_symlinks=False)
+            if entry.is_dir(follow_symlinks=False):
+                stack.append([entry.path, os.scandir(entry.path), 0, info.st_mtime])
+                continue
+        except OSError:
+            continue
+        frame[2] += info.st_size
+        yield 'file', entry.path, info.st_size, info.st_mtime
+
+AGE_BUCKETS = [(1, "< 1 day"), (7, "1-7 days"), (30, "1-4 weeks"), (90, "1-3 months"), (365, "3-12 months")]
+OLDEST_BUCKET = "> 1 year"
+
+def _age_bucket(mtime, now):
+    age_days = (now - mtime) / 86400
+    for limit, label in AGE_BUCKETS:
+        if age_days < limit:
+            return label
+    return OLDEST_BUCKET
+
+def space_report(roots, top_n=20):
+    """Find the largest files and directories under the (name, path) roots in one pass.
+
+    The top-N lists are bounded min-heaps, so memory stays O(top_n) however many files
+    there are. Totals are also grouped by file extension and by age.
+    """
+    now = time.time()
+    top_files = []  # min-heaps of (size, path)
+    top_dirs = []
+    by_extension = {}
+    by_age = {label: [0, 0] for _, label in AGE_BUCKETS}
+    by_age[OLDEST_BUCKET] = [0, 0]
+    roots_summary = {}
+
+    for name, path in roots:
+        if not os.path.isdir(path):
+            continue
+        root_bytes = 0
+        root_files = 0
+        for kind, item, size, mtime in iter_tree(path):
+            if kind == 'dir':
+                if item == path:
+                    root_bytes = size
+                    continue
+                heap = top_dirs
+            else:
+                root_files += 1
+                extension = os.path.splitext(item)[1].lower() or "(none)"
+                totals = by_extension.setdefault(extension, [0, 0])
+                totals[0] += size
+                totals[1] += 1
+                totals = by_age[_age_bucket(mtime, now)]
+                totals[0] += size
+                totals[1] += 1
+                heap = top_files
+
+            if len(heap) < top_n:
+                heapq.heappush(heap, (size, item))
+            elif size > heap[0][0]:
+                heapq.heapreplace(heap, (size, item))
+        roots_summary[name] = {"path": path, "bytes": root_bytes, "files": root_files}
+
+    def grouped(groups):
+        return [{"group": key, "bytes": value[0], "files": value[1]}
+                for key, value in sorted(groups.items(), key=lambda item: item[1][0], reverse=True)]
+
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "roots": roots_summary,
+        "largest_files": [{"path": p, "bytes": size} for size, p in sorted(top_files, reverse=True)],
+        "largest_dirs": [{"path": p, "bytes": size} for size, p in sorted(top_dirs, reverse=True)],
+        "by_extension": grouped(by_extension),
+        "by_age": [{"group": label, "bytes": by_age[label][0], "files": by_age[label][1]}
+                   for label in [label for _, label in AGE_BUCKETS] + [OLDEST_BUCKET]],
+    }
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def show_space_report(roots=None, top_n=20, json_path=None):
+    """Print the largest files/directories report and optionally save it as JSON."""
+    roots = roots or get_cleanup_roots()
+    print_header("Space Usage Report")
+    print_info("Scanning (nothing is deleted)...")
+    start = time.perf_counter()
+    report = space_report(roots, top_n)
+    elapsed = time.perf_counter() - start
+
+    for name, summary in report["roots"].items():
+        print_colored(f"  {name:<18} {_format_size(summary['bytes']):>10}  ({summary['files']} files)", Colors.YELLOW)
+
+    print_colored(f"\n{symbols.FOLDER} Largest folders:", Colors.BOLD + Colors.CYAN)
+    for item in report["largest_dirs"]:
+        print_colored(f"  {_format_size(item['bytes']):>10}  {item['path']}", Colors.WHITE)
+    print_colored(f"\n{symbols.SEARCH} Largest files:", Colors.BOLD + Colors.CYAN)
+    for item in report["largest_files"]:
+        print_colored(f"  {_format_size(item['bytes']):>10}  {item['path']}", Colors.WHITE)
+    print_colored(f"\n{symbols.BULLET} By extension:", Colors.BOLD + Colors.CYAN)
+    for group in report["by_extension"][:top_n]:
+        print_colored(f"  {_format_size(group['bytes']):>10}  {group['group']:<12} ({group['files']} files)", Colors.WHITE)
+    print_colored(f"\n{symbols.BULLET} By age:", Colors.BOLD + Colors.CYAN)
+    for group in report["by_age"]:
+        print_colored(f"  {_format_size(group['bytes']):>10}  {group['group']:<12} ({group['files']} files)", Colors.WHITE)
+
+    print_info(f"Scanned in {elapsed:.1f}s")
+    if json_path:
+        try:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print_success(f"Report written to {json_path}")
+        except OSError as e:
+            print_error(f"Failed to write {json_path}: {e}")
+    return report
+
+PARTIAL_HASH_BYTES = 64 * 1024
+HASH_CHUNK = 8 * 1024 * 1024
+
+def _partial_hash(path, size):
+    """Hash the first and last 64 KiB. For files up to 128 KiB this covers the whole file."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+        if size > PARTIAL_HASH_BYTES:
+            f.seek(max(PARTIAL_HASH_BYTES, size - PARTIAL_HASH_BYTES))
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+    return digest.hexdigest()
+
+def _full_hash(path):
+    """Hash a whole file through a read-only memory map (runs in a worker process)."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(mapped), HASH_CHUNK):
+                    digest.update(view[offset:offset + HASH_CHUNK])
+            finally:
+                view.release()
+    return path, digest.hexdigest()
+
+def get_duplicate_roots():
+    """The (name, path) roots searched for duplicates: cleanup locations plus Downloads."""
+    roots = get_cleanup_roots()
+    profile = os.environ.get('USERPROFILE')
+    if profile:
+        roots.append(("Downloads", os.path.join(profile, 'Downloads')))
+    return roots
+
+def find_duplicates(roots, min_size=4096, workers=None):
+    """Find groups of identical files under the (name, path) roots.
+
+    Files are bucketed by size first; only sizes that collide are read. Those get a
+    partial hash of their first and last 64 KiB, and only files that still collide and
+    are larger than 128 KiB get a full-content hash, computed in a process pool.
+    Returns a list of {'size', 'hash', 'paths', 'reclaimable'} sorted by reclaimable bytes.
+    """
+    workers = workers or CLEAN_WORKERS_PER_VOLUME
+    by_size = {}
+    seen = set()
+    for name, path in roots:
+        if not os.path.isdir(path) or os.path.abspath(path) in seen:
+            continue
+        seen.add(os.path.abspath(path))
+        for kind, item, size, _ in iter_tree(path):
+            if kind == 'file' and size >= min_size:
+                by_size.setdefault(size, []).append(item)
+    candidates = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+    by_size = None
+
+    # Stage 2: partial hashes, threads (small I/O-bound reads)
+    partial_groups = {}
+    def partial(job):
+        size, item = job
+        try:
+            return size, item, _partial_hash(item, size)
+        except OSError:
+            return size, item, None
+    jobs = [(size, item) for size, paths in candidates for item in paths]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for size, item, digest in pool.map(partial, jobs, chunksize=64):
+            if digest:
+                partial_groups.setdefault((size, digest), []).append(item)
+
+    groups = []
+    full_jobs = []
+    for (size, digest), paths in partial_groups.items():
+        if len(paths) < 2:
+            continue
+        if size <= 2 * PARTIAL_HASH_BYTES:
+            groups.append((size, digest, paths))  # the partial hash already covered every byte
+        else:
+            full_jobs.extend((size, item) for item in paths)
+
+    # Stage 3: full hashes for the remaining collisions, in worker processes
+    if full_jobs:
+        sizes = dict((item, size) for size, item in full_jobs)
+        full_groups = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_full_hash, item) for _, item in full_jobs]
+            for future in as_completed(futures):
+                try:
+                    item, digest = future.result()
+                except (OSError, ValueError):
+                    continue
+                full_groups.setdefault((sizes[item], digest), []).append(item)
+        groups.extend((size, digest, paths) for (size, digest), paths in full_groups.items() if len(paths) > 1)
+
+    result = [{"size": size, "hash": digest, "paths": sorted(paths), "reclaimable": size * (len(paths) - 1)}
+              for size, digest, paths in groups]
+    result.sort(key=lambda group: group["reclaimable"], reverse=True)
+    return result
+
+def show_duplicates(roots=None, json_path=None, limit=20):
+    """Print duplicate groups and the bytes that removing the extra copies would free."""
+    roots = roots or get_duplicate_roots()
+    print_header("Duplicate File Finder")
+    print_info("Scanning (nothing is deleted)...")
+    start = time.perf_counter()
+    groups = find_duplicates(roots)
+    elapsed = time.perf_counter() - start
+
+    reclaimable = sum(group["reclaimable"] for group in groups)
+    for group in groups[:limit]:
+        print_colored(f"\n  {len(group['paths'])} x {_format_size(group['size'])} "
+                      f"(reclaimable {_format_size(group['reclaimable'])})", Colors.YELLOW)
+        for item in group["paths"]:
+            print_colored(f"    {item}", Colors.WHITE)
+    if len(groups) > limit:
+        print_info(f"... and {len(groups) - limit} more groups")
+
+    print_success(f"{len(groups)} duplicate groups, {_format_size(reclaimable)} reclaimable",
+                  after={"groups": len(groups), "reclaimable_bytes": reclaimable}, duration_ms=elapsed * 1000)
+    print_info(f"Scanned in {elapsed:.1f}s")
+    if json_path:
+        try:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"generated": datetime.now().isoformat(timespec="seconds"),
+                           "reclaimable_bytes": reclaimable, "groups": groups}, f, indent=2)
+            print_success(f"Duplicates written to {json_path}")
+        except OSError as e:
+            print_error(f"Failed to write {json_path}: {e}")
+    return groups
+
+def merge_clean_stats(total, stats):
+    """Add the counters of stats into total."""
+    for key in total:
+        total[key] += stats[key]
+    return total
+
+def _plan_clean_tasks(path, min_tasks):
+    """Split the contents of path into independent delete tasks.
+
+    Top-level files are batched, directories become subtree tasks. If that gives fewer
+    tasks than workers, directories are split one more level so a single large folder
+    (e.g. SoftwareDistribution\\Download) still spreads across the pool. Returns the
+    tasks and the split directories, which are removed after their children.
+    """
+    tasks = []
+    split_dirs = []
+    level = [path]
+    for depth in range(2):
+        subdirs = []
+        for directory in level:
+            batch = []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if _is_link(entry):
+                            tasks.append(('link', entry.path))
+                        elif entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        else:
+                            try:
+                                info = entry.stat(follow_symlinks=False)
+                                size, mtime = info.st_size, info.st_mtime
+                            except OSError:
+                                size, mtime = 0, 0
+                            batch.append((entry.path, size, mtime))
+                            if len(batch) >= FILES_PER_TASK:
+                                tasks.append(('files', batch))
+                                batch = []
+            except OSError:
+                pass  # Listing failed partway: still clean what was listed before the error
+            if batch:
+                tasks.append(('files', batch))
+
+        if depth == 0 and len(tasks) + len(subdirs) < min_tasks and subdirs:
+            split_dirs.extend(subdirs)
+            level = subdirs
+            continue
+        tasks.extend(('tree', d) for d in subdirs)
+        break
+    return tasks, split_dirs
+
+def _run_clean_task(task, retention=None):
+    """Execute one delete task. Returns its own stats, evictable files and in-use files."""
+    kind, payload = task
+    stats = new_clean_stats()
+    evictable = [] if retention and retention['max_total'] is not None else None
+    deferred = []
+    if kind == 'tree':
+        scan_and_delete(payload, stats, True, retention, evictable, deferred)
+    elif kind == 'link':
+        try:
+            _remove_link(payload)
+            stats['deleted'] += 1
+        except OSError:
+            stats['failed'] += 1
+    else:
+        for file_path, size, mtime in payload:
+            if retention:
+                verdict = _retention_verdict(retention, file_path, mtime)
+                if verdict != DELETE:
+                    stats['kept'] += 1
+                    stats['kept_bytes'] += size
+                    if verdict == YOUNG and evictable is not None:
+                        evictable.append((mtime, size, file_path))
+                    continue
+            try:
+                _remove_file(file_path)
+                stats['freed_bytes'] += size
+                stats['deleted'] += 1
+            except OSError as e:
+                if _is_in_use(e):
+                    deferred.append((file_path, size))
+                    continue
+                stats['failed'] += 1
+                stats['failed_bytes'] += size
+    return stats, evictable or [], deferred
+
+def _retry_deferred(stats, root, deferred, locked):
+    """Retry each in-use file once. Files still open are counted as failed and locked."""
+    for path, size in deferred:
+        try:
+            _remove_file(path)
+        except OSError as e:
+            stats['failed'] += 1
+            stats['failed_bytes'] += size
+            if _is_in_use(e):
+                stats['locked'] += 1
+                locked.append(path)
+            continue
+        stats['freed_bytes'] += size
+        stats['deleted'] += 1
+        # Remove the folders this file was keeping alive, up to the root
+        parent = os.path.dirname(path)
+        while len(parent) > len(root):
+            try:
+                os.rmdir(parent)
+                stats['deleted'] += 1
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
+def _evict_oldest(stats, evictable, max_total):
+    """Delete the oldest kept files until the young files fit in max_total bytes."""
+    total = sum(size for _, size, _ in evictable)
+    evictable.sort()
+    for mtime, size, path in evictable:
+        if total <= max_total:
+            break
+        try:
+            _remove_file(path)
+            total -= size
+            stats['freed_bytes'] += size
+            stats['deleted'] += 1
+            stats['kept'] -= 1
+            stats['kept_bytes'] -= size
+        except OSError:
+            pass
+
+def estimate_with_retention(path, rule=None):
+    """Estimate what cleaning path would free under a retention rule, from the scan index.
+
+    Applies the same verdicts as the cleanup, including max_total_mb eviction of the
+    oldest young files, so files the cleanup would keep are not counted as freeable.
+    """
+    retention = compile_retention(rule, path)
+    if not retention:
+        return scan_index.estimate(path)
+    if retention['max_total'] is None:
+        # Cached per directory in the index, keyed by the rule and the root its patterns are relative to
+        return scan_index.estimate(path, rule={
+            'key': json.dumps([os.path.abspath(path), rule], sort_keys=True),
+            'eligible': lambda file_path: not _retention_protects(retention, file_path),
+            'min_mtime': retention['min_mtime'],
+        })
+
+    # Eviction needs every young file across the tree, so it is worked out per file
+    young = []
+
+    def deletable(file_path, size, mtime):
+        verdict = _retention_verdict(retention, file_path, mtime)
+        if verdict == YOUNG and retention['max_total'] is not None:
+            young.append((mtime, size))
+        return verdict == DELETE
+
+    estimate = scan_index.estimate(path, deletable)
+    total = sum(size for _, size in young)
+    for _, size in sorted(young):
+        if total <= retention['max_total']:
+            break
+        total -= size
+        estimate['bytes'] += size
+        estimate['files'] += 1
+        estimate['kept'] -= 1
+        estimate['kept_bytes'] -= size
+    return estimate
+
+def _volume(path):
+    return os.path.splitdrive(os.path.abspath(path))[0].upper() or "/"
+
+def clean_roots(roots, workers_per_volume=None, stream=None, rules=None, before_retry=None, locked=None, gates=None):
+    """Clean several (name, path) roots in parallel.
+
+    Every root is split into subtree tasks that run on one bounded thread pool per
+    volume, so roots on different disks don't compete for the same workers. Progress is
+    drawn on stream (the console by default). Roots are cleaned according to their
+    entry in rules (RETENTION_RULES by default). Returns {name: stats}, with None for
+    roots that don't exist.
+
+    A root listed in gates ({name: Future}) is only started once its future completes,
+    e.g. when the services holding its files have stopped; the other roots are cleaned
+    meanwhile.
+
+    Files open in another process are skipped on first contact and retried once after
+    every root is done (after calling before_retry, e.g. to wait for services to stop).
+    Paths still locked after that are collected in locked[name] if a dict is passed.
+    """
+    workers = max(1, workers_per_volume or CLEAN_WORKERS_PER_VOLUME)
+    rules = RETENTION_RULES if rules is None else rules
+    gates = gates or {}
+    results = {}
+    pools = {}
+    futures = {}
+    split_dirs = {}
+    remaining = {}
+    retentions = {}
+    evictable = {}
+    deferred = {}
+
+    with ProgressPanel("Cleaning", stream=stream) as panel:
+        def finish_root(name):
+            retention = retentions[name]
+            if retention and retention['max_total'] is not None:
+                _evict_oldest(results[name], evictable.pop(name), retention['max_total'])
+            # Children are gone; remove directories that were split, deepest first
+            for directory in sorted(split_dirs[name], key=len, reverse=True):
+                try:
+                    os.rmdir(directory)
+                    results[name]['deleted'] += 1
+                except OSError:
+                    pass
+            panel.finish_task(name, "done", f"{results[name]['freed_bytes'] / (1024 * 1024):.1f} MB freed")
+
+        def submit_root(name, path):
+            if not os.path.isdir(path):
+                results[name] = None
+                panel.finish_task(name, "skipped", "not found")
+                return
+            panel.start_task(name, "scanning")
+            tasks, split_dirs[name] = _plan_clean_tasks(path, workers * 2)
+            retentions[name] = compile_retention(rules.get(name), path)
+            evictable[name] = []
+            deferred[name] = []
+            results[name] = new_clean_stats()
+            remaining[name] = len(tasks)
+            if not tasks:
+                finish_root(name)
+                return
+            volume = _volume(path)
+            if volume not in pools:
+                pools[volume] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"clean-{volume}")
+            for task in tasks:
+                futures[pools[volume].submit(_run_clean_task, task, retentions[name])] = name
+
+        gated = {}
+        for name, path in roots:
+            panel.add_task(name, name)
+            if name in gates:
+                panel.update_task(name, "waiting for services to stop")
+                gated.setdefault(gates[name], []).append((name, path))
+            else:
+                submit_root(name, path)
+
+        pending = set(futures) | set(gated)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in gated:
+                    before = set(futures)
+                    for name, path in gated[future]:
+                        submit_root(name, path)
+                    pending.update(set(futures) - before)
+                    continue
+
+                name = futures[future]
+                stats, young, in_use = future.result()
+                merge_clean_stats(results[name], stats)
+                evictable[name].extend(young)
+                deferred[name].extend(in_use)
+                remaining[name] -= 1
+                if remaining[name]:
+                    freed = results[name]['freed_bytes'] / (1024 * 1024)
+                    panel.update_task(name, f"{freed:.1f} MB freed, {remaining[name]} tasks left")
+                else:
+                    finish_root(name)
+
+    for pool in pools.values():
+        pool.shutdown()
+
+    if before_retry:
+        before_retry()
+    pending = sum(len(files) for files in deferred.values())
+    if pending:
+        print_info(f"Retrying {pending} files that were in use...")
+        for name, path in roots:
+            if deferred.get(name):
+                still_locked = []
+                _retry_deferred(results[name], path, deferred[name], still_locked)
+                if locked is not None:
+                    locked[name] = still_locked
+    return results
+
+def find_lock_owners(path):
+    """Return 'name (pid)' for the processes holding path open, using the Restart Manager."""
+    try:
+        rstrtmgr = ctypes.WinDLL("rstrtmgr")
+    except (AttributeError, OSError):
+        return []
+
+    class FILETIME(ctypes.Structure):
+        # Two DWORDs, so 4-byte aligned (a c_ulonglong would pad RM_UNIQUE_PROCESS to 16 bytes)
+        _fields_ = [("dwLowDateTime", ctypes.c_ulong), ("dwHighDateTime", ctypes.c_ulong)]
+
+    class RM_UNIQUE_PROCESS(ctypes.Structure):
+        _fields_ = [("dwProcessId", ctypes.c_ulong), ("ProcessStartTime", FILETIME)]
+
+    class RM_PROCESS_INFO(ctypes.Structure):
+        _fields_ = [("Process", RM_UNIQUE_PROCESS),
+                    ("strAppName", ctypes.c_wchar * 256),
+                    ("strServiceShortName", ctypes.c_wchar * 64),
+                    ("ApplicationType", ctypes.c_int),
+                    ("AppStatus", ctypes.c_ulong),
+                    ("TSSessionId", ctypes.c_ulong),
+                    ("bRestartable", ctypes.c_int)]
+
+    assert ctypes.sizeof(RM_PROCESS_INFO) == 668, "RM_PROCESS_INFO does not match the Win32 layout"
+
+    session = ctypes.c_ulong()
+    key = ctypes.create_unicode_buffer(33)
+    if rstrtmgr.RmStartSession(ctypes.byref(session), 0, key) != 0:
+        return []
+    try:
+        files = (ctypes.c_wchar_p * 1)(path)
+        if rstrtmgr.RmRegisterResources(session, 1, files, 0, None, 0, None) != 0:
+            return []
+        needed = ctypes.c_uint()
+        reasons = ctypes.c_ulong()
+        capacity = 8
+        for _ in range(3):  # More processes may open the file between the calls
+            count = ctypes.c_uint(capacity)
+            infos = (RM_PROCESS_INFO * capacity)()
+            result = rstrtmgr.RmGetList(session, ctypes.byref(needed), ctypes.byref(count), infos,
+                                        ctypes.byref(reasons))
+            if result != ERROR_MORE_DATA:
+                break
+            capacity = max(needed.value, capacity * 2)
+        if result != 0:
+            return []
+        return [f"{infos[i].strAppName} ({infos[i].Process.dwProcessId})" for i in range(count.value)]
+    finally:
+        rstrtmgr.RmEndSession(session)
+
+def schedule_delete_on_reboot(paths):
+    """Ask Windows to delete the given files at the next restart. Returns how many were scheduled."""
+    scheduled = 0
+    for path in paths:
+        if ctypes.windll.kernel32.MoveFileExW(path, None, MOVEFILE_DELAY_UNTIL_REBOOT):
+            scheduled += 1
+    return scheduled
+
+def report_locked(locked):
+    """Show which processes hold the remaining files and offer deletion at reboot."""
+    paths = [path for files in locked.values() for path in files]
+    if not paths:
+        return
+
+    print_warning(f"{len(paths)} files are still in use by other programs.")
+    for path in paths[:MAX_LOCK_OWNER_LOOKUPS]:
+        owners = find_lock_owners(path)
+        print_colored(f"  {path}", Colors.YELLOW)
+        if owners:
+            print_colored(f"    locked by: {', '.join(owners)}", Colors.WHITE)
+    if len(paths) > MAX_LOCK_OWNER_LOOKUPS:
+        print_info(f"... and {len(paths) - MAX_LOCK_OWNER_LOOKUPS} more")
+
+    choice = input(f"\n{Colors.YELLOW}Delete these files at the next restart? (y/N): {Colors.END}").lower().strip()
+    if choice == 'y':
+        scheduled = schedule_delete_on_reboot(paths)
+        if scheduled == len(paths):
+            print_success(f"Scheduled {scheduled} files for deletion at restart.")
+        else:
+            print_warning(f"Scheduled {scheduled} of {len(paths)} files for deletion at restart (requires Administrator).")
+
+def report_clean(name, path, stats, duration_ms=None):
+    """Print the result of cleaning one root and return the MB freed."""
+    if stats is None:
         print_info(f"{name} path not found: {path} (Skipping)")
         return 0
 
-    size_before = get_dir_size(path)
-    print_info(f"Cleaning {name} ({size_before:.2f} MB)...")
-    
-    deleted_files = 0
-    errors = 0
-    
-    for item in os.listdir(path):
-        item_path = os.path.join(path, item)
-        try:
-            if os.path.isfile(item_path) or os.path.islink(item_path):
-                os.unlink(item_path)
-                deleted_files += 1
-            elif os.path.isdir(item_path):
-                shutil.rmtree(item_path)
-                deleted_files += 1
-        except Exception as e:
-            errors += 1
-            # print_error(f"Failed to delete {item}: {e}") # Too verbose
-    
-    size_after = get_dir_size(path)
-    cleaned = size_before - size_after
-    
-    if errors > 0:
-        print_warning(f"Cleaned {name}: Removed {deleted_files} items. {errors} items skipped (in use/access denied).")
+    cleaned = stats['freed_bytes'] / (1024 * 1024)
+    if stats['failed'] > 0:
+        print_warning(f"Cleaned {name}: Removed {stats['deleted']} items. {stats['failed']} items skipped (in use/access denied).",
+                      target=path, after=stats, duration_ms=duration_ms)
+        print_colored(f"Left behind: {stats['failed_bytes'] / (1024 * 1024):.2f} MB", Colors.YELLOW)
+        if stats['locked']:
+            print_colored(f"Still in use after retry: {stats['locked']} files", Colors.YELLOW)
     else:
-        print_success(f"Cleaned {name}: All items removed.")
+        print_success(f"Cleaned {name}: All items removed.", target=path, after=stats, duration_ms=duration_ms)
     
+    if stats['kept']:
+        print_colored(f"Kept by retention rules: {stats['kept']} files, {stats['kept_bytes'] / (1024 * 1024):.2f} MB", Colors.CYAN)
     print_colored(f"Space freed: {cleaned:.2f} MB", Colors.GREEN)
     return cleaned
 
+def clean_directory(path, name):
+    """Clean contents of a directory."""
+    if not os.path.exists(path):
+        print_info(f"{name} path not found: {path} (Skipping)")
+        return 0
+
+    print_info(f"Cleaning {name}...")
+    start = time.perf_counter()
+    locked = {}
+    stats = clean_roots([(name, path)], locked=locked)[name]
+    freed = report_clean(name, path, stats, (time.perf_counter() - start) * 1000)
+    report_locked(locked)
+    return freed
+
+def get_cleanup_roots():
+    """The (name, path) roots cleaned by the one-click cleanup."""
+    system_root = os.environ.get('SystemRoot', 'C:\\Windows')
+    roots = []
+    user_temp = os.environ.get('TEMP')
+    if user_temp:
+        roots.append(("User Temp", user_temp))
+    roots.append(("Windows Temp", os.path.join(system_root, 'Temp')))
+    roots.append(("Prefetch", os.path.join(system_root, 'Prefetch')))
+    roots.append(("Update Downloads", os.path.join(system_root, 'SoftwareDistribution', 'Download')))
+    return roots
+
 def clean_temp_files():
     """Clean Windows temporary files."""
     print_header("Cleaning Temporary Files")
@@ -95,42 +946,157 @@ def clean_prefetch():
     prefetch_path = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'Prefetch')
     return clean_directory(prefetch_path, "Prefetch")
 
+UPDATE_SERVICES = ["wuauserv", "bits", "dosvc"]
+SERVICE_STOP_TIMEOUT = 30  # seconds
+SERVICE_POLL_INTERVAL = 0.25
+
+def _query_service_state(service):
+    """Return the current sc state name (RUNNING, STOPPED, STOP_PENDING, ...) of a service."""
+    result = subprocess.run(f'sc query "{service}"', shell=True, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if line.startswith("STATE"):
+            parts = line.split(":", 1)[1].split()
+            return parts[1] if len(parts) > 1 else "UNKNOWN"
+    return "UNKNOWN"
+
+def _stop_services(services, timeout):
+    """Send every stop request at once, then poll until all are STOPPED or timeout."""
+    for process in [subprocess.Popen(f'sc stop "{service}"', shell=True, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL) for service in services]:
+        process.wait()
+
+    deadline = time.monotonic() + timeout
+    states = {}
+    waiting = list(services)
+    while waiting:
+        for service in list(waiting):
+            states[service] = _query_service_state(service)
+            # UNKNOWN: not installed on this edition, nothing to wait for
+            if states[service] in ("STOPPED", "UNKNOWN"):
+                waiting.remove(service)
+        if not waiting or time.monotonic() > deadline:
+            break
+        time.sleep(SERVICE_POLL_INTERVAL)
+    return states
+
+def stop_services_async(services, timeout=SERVICE_STOP_TIMEOUT):
+    """Start stopping services and return immediately.
+
+    Returns a Future that resolves to {service: state} once every service has
+    stopped (or the timeout passed).
+    """
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="service-stop")
+    future = pool.submit(_stop_services, list(services), timeout)
+    pool.shutdown(wait=False)
+    return future
+
+def stop_update_services_async(timeout=SERVICE_STOP_TIMEOUT):
+    """Start stopping the update services; see stop_services_async."""
+    return stop_services_async(UPDATE_SERVICES, timeout)
+
+def stop_update_services():
+    """Stop the services that hold files in the update cache and wait for them."""
+    print_info("Stopping Windows Update services...")
+    return stop_update_services_async().result()
+
+def report_service_states(states):
+    """Warn about services that did not reach STOPPED."""
+    running = [f"{service} ({state})" for service, state in states.items() if state not in ("STOPPED", "UNKNOWN")]
+    if running:
+        print_warning(f"Services still running, some files may be in use: {', '.join(running)}")
+
+def start_services(services):
+    """Start the given services, all at once."""
+    for process in [subprocess.Popen(f'sc start "{service}"', shell=True, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL) for service in services]:
+        process.wait()
+
+def start_update_services():
+    """Restart the services stopped by stop_update_services."""
+    print_info("Restarting Windows Update services...")
+    start_services(UPDATE_SERVICES)
+
 def clean_update_cache():
     """Clean Windows Update Cache (SoftwareDistribution)."""
     print_header("Cleaning Windows Update Cache")
     
     # Stop services first
-    print_info("Stopping Windows Update services...")
-    services = ["wuauserv", "bits", "dosvc"]
-    for service in services:
-        subprocess.run(f'net stop "{service}"', shell=True, capture_output=True)
+    report_service_states(stop_update_services())
     
     # Clean SoftwareDistribution/Download
     update_path = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'SoftwareDistribution', 'Download')
     freed = clean_directory(update_path, "Update Downloads")
     
     # Restart services
-    print_info("Restarting Windows Update services...")
-    for service in services:
-        subprocess.run(f'net start "{service}"', shell=True, capture_output=True)
+    start_update_services()
         
     return freed
 
 def flush_dns():
-    """Flush DNS Resolver Cache."""
+    """Flush DNS Resolver Cache (together with any flush other steps requested)."""
     print_header("Flushing DNS Cache")
-    
-    try:
-        result = subprocess.run('ipconfig /flushdns', shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print_success("DNS Resolver Cache successfully flushed.")
-            return True
-        else:
-            print_error("Failed to flush DNS cache.")
-            return False
-    except Exception as e:
-        print_error(f"Error: {e}")
-        return False
+    dns_cache.request_flush("System Cleaner")
+    return dns_cache.flush_pending()
+
+def clean_app_caches():
+    """Clean the browser and application caches from the cleanup target registry."""
+    print_header("Cleaning Browser & Application Caches")
+    print_info("Discovering caches in every user and browser profile...")
+    start = time.perf_counter()
+    found = cleanup_targets.discover_targets()
+    running = cleanup_targets.get_running_processes()
+    print_info(f"Found {len(found)} cache folders in {time.perf_counter() - start:.1f}s")
+    if not found:
+        return 0
+
+    roots = []
+    rules = {}
+    services = []
+    gated = []
+    for item in found:
+        target = item['target']
+        blocking = [p for p in target['processes'] if p in running]
+        estimate = estimate_with_retention(item['path'], target['retention'])
+        if blocking:
+            print_colored(f"  {item['root']:<60} skipped, close {', '.join(blocking)} first", Colors.YELLOW)
+            continue
+        print_colored(f"  {item['root']:<60} ~{_format_size(estimate['bytes']):>10}", Colors.WHITE)
+        roots.append((item['root'], item['path']))
+        if target['retention']:
+            rules[item['root']] = target['retention']
+        if target['services']:
+            gated.append(item['root'])
+            services.extend(s for s in target['services'] if s not in services)
+
+    if not roots:
+        print_warning("Nothing to clean. Close the listed programs and try again.")
+        return 0
+    confirm = input(f"\n{Colors.YELLOW}Clean {len(roots)} folders? (y/N): {Colors.END}").lower().strip()
+    if confirm != 'y':
+        print_colored("Operation cancelled.", Colors.CYAN)
+        return 0
+
+    gates = {}
+    services_stopped = None
+    if services:
+        print_info(f"Stopping {', '.join(services)} in the background...")
+        services_stopped = stop_services_async(services)
+        gates = {name: services_stopped for name in gated}
+
+    start = time.perf_counter()
+    locked = {}
+    results = clean_roots(roots, rules=rules, locked=locked, gates=gates)
+    duration_ms = (time.perf_counter() - start) * 1000
+    if services_stopped:
+        report_service_states(services_stopped.result())
+        print_info(f"Restarting {', '.join(services)}...")
+        start_services(services)
+
+    total_freed = sum(report_clean(name, path, results[name]) for name, path in roots)
+    print_info(f"Cleanup took {duration_ms / 1000:.1f}s")
+    report_locked(locked)
+    return total_freed
 
 def clean_all_system():
     """Run all cleaning tasks."""
@@ -144,10 +1110,24 @@ def clean_all_system():
         print_colored("Operation cancelled.", Colors.CYAN)
         return
 
+    roots = get_cleanup_roots()
+    start = time.perf_counter()
+    # The update cache waits for its services; everything else is cleaned while they shut down
+    print_info("Stopping Windows Update services in the background...")
+    services_stopped = stop_update_services_async()
+    print_info(f"Cleaning {len(roots)} locations in parallel ({CLEAN_WORKERS_PER_VOLUME} workers per volume)...")
+    locked = {}
+    results = clean_roots(roots, locked=locked, gates={"Update Downloads": services_stopped})
+    duration_ms = (time.perf_counter() - start) * 1000
+    report_service_states(services_stopped.result())
+    start_update_services()
+
     total_freed = 0
-    total_freed += clean_temp_files()
-    total_freed += clean_prefetch()
-    total_freed += clean_update_cache()
+    for name, path in roots:
+        print_header(f"Cleaning {name}")
+        total_freed += report_clean(name, path, results[name])
+    print_info(f"Cleanup took {duration_ms / 1000:.1f}s")
+    report_locked(locked)
     flush_dns()
     
     print_colored("\n" + "=" * 60, Colors.GREEN)
@@ -155,6 +1135,323 @@ def clean_all_system():
     print_colored("=" * 60, Colors.GREEN)
     input(f"\n{Colors.CYAN}Press Enter to return...{Colors.END}")
 
+def _build_bench_tree(root, files, file_size, fanout=16):
+    """Create files of file_size bytes spread over fanout x fanout subdirectories."""
+    payload = b"\0" * file_size
+    for i in range(files):
+        directory = os.path.join(root, f"d{i % fanout}", f"s{(i // fanout) % fanout}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{i}.tmp"), "wb") as f:
+            f.write(payload)
+
+def benchmark_delete(base_dir=None, worker_counts=(1, 2, 4, 8, 16), files=4000, file_size=64 * 1024):
+    """Measure delete throughput for each worker count on a synthetic tree.
+
+    Run it on the disk you want to tune (SSDs usually keep scaling past 4 workers,
+    spinning disks don't) and set WIN11_CLEAN_WORKERS to the knee of the curve.
+    """
+    base_dir = base_dir or tempfile.gettempdir()
+    print_header("Cleanup Benchmark")
+    print_info(f"{files} files x {file_size // 1024} KiB per run in {base_dir}")
+    print_colored(f"\n  {'Workers':>7}  {'Seconds':>8}  {'Files/s':>9}  {'MB/s':>8}", Colors.BOLD)
+
+    results = []
+    for workers in worker_counts:
+        root = tempfile.mkdtemp(prefix="win11_clean_bench_", dir=base_dir)
+        try:
+            _build_bench_tree(root, files, file_size)
+            start = time.perf_counter()
+            stats = clean_roots([("bench", root)], workers, stream=io.StringIO())["bench"]
+            seconds = time.perf_counter() - start
+        finally:
+            scan_and_delete(root, remove_root=True)
+
+        files_per_second = files / seconds if seconds else 0
+        mb_per_second = stats['freed_bytes'] / (1024 * 1024) / seconds if seconds else 0
+        results.append({"workers": workers, "seconds": seconds, "files_per_second": files_per_second,
+                        "mb_per_second": mb_per_second, "failed": stats['failed']})
+        print_colored(f"  {workers:>7}  {seconds:>8.2f}  {files_per_second:>9.0f}  {mb_per_second:>8.1f}", Colors.WHITE)
+
+    best = max(results, key=lambda r: r["files_per_second"])
+    print_success(f"Fastest: {best['workers']} workers per volume (set WIN11_CLEAN_WORKERS={best['workers']})")
+    return results
+
+ARCHIVE_CHUNK = 1024 * 1024
+ARCHIVE_MAX_MB = 1024
+ARCHIVE_FORMATS = {"zip": ".zip", "tar.xz": ".tar.xz"}
+ARCHIVE_XZ_PRESET = 3
+ARCHIVE_SPOOL_BYTES = 8 * 1024 * 1024  # Larger tar members are spooled through a temp file
+ARCHIVE_PUT_TIMEOUT = 0.5  # How often a producer blocked on a full queue checks for dead workers
+
+class _CrcReader:
+    """File wrapper that computes the CRC-32 of everything read through it."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.crc = 0
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.fileobj.read(ARCHIVE_CHUNK if size is None or size < 0 else min(size, ARCHIVE_CHUNK))
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        return data
+
+class _RotatingArchive:
+    """One worker's archive. Starts a new file once max_bytes of compressed data are written.
+
+    Originals are only deleted after their archive is closed and every entry has been
+    read back and matched against the CRC-32 taken while the original was streamed in.
+    """
+
+    def __init__(self, archive_dir, prefix, fmt, max_bytes, stats):
+        self.archive_dir = archive_dir
+        self.prefix = prefix
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self.sequence = 0
+        self.raw = None
+
+    def _open(self):
+        self.sequence += 1
+        self.path = os.path.join(self.archive_dir, f"{self.prefix}-{self.sequence:03d}{ARCHIVE_FORMATS[self.fmt]}")
+        self.raw = open(self.path, "wb")
+        if self.fmt == "zip":
+            self.archive = zipfile.ZipFile(self.raw, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            self.archive = tarfile.open(fileobj=self.raw, mode="w:xz", preset=ARCHIVE_XZ_PRESET)
+        self.pending = []  # (path, arcname, size, mtime, crc)
+
+    def add(self, path, arcname, size, mtime):
+        if self.raw is None:
+            self._open()
+        try:
+            with open(path, "rb") as src:
+                reader = _CrcReader(src)
+                if self.fmt == "zip":
+                    info = zipfile.ZipInfo.from_file(path, arcname)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    with self.archive.open(info, "w", force_zip64=True) as dst:
+                        while True:
+                            chunk = reader.read(ARCHIVE_CHUNK)
+                            if not chunk:
+                                break
+                            dst.write(chunk)
+                else:
+                    # tarfile writes the size in the header first, so a file that shrank
+                    # while being read would leave a truncated member and break the rest
+                    # of the archive. Copy it out first and archive exactly what was read.
+                    with tempfile.SpooledTemporaryFile(ARCHIVE_SPOOL_BYTES, dir=self.archive_dir) as spool:
+                        info = self.archive.gettarinfo(arcname=arcname, fileobj=src)
+                        while True:
+                            chunk = reader.read(ARCHIVE_CHUNK)
+                            if not chunk:
+                                break
+                            spool.write(chunk)
+                        info.size = reader.size
+                        spool.seek(0)
+                        self.archive.addfile(info, spool)
+        except OSError:
+            self.stats['failed'] += 1
+            self.stats['failed_bytes'] += size
+            return
+        self.pending.append((path, arcname, reader.size, mtime, reader.crc))
+        if self.raw.tell() >= self.max_bytes:
+            self.close()
+
+    def _verified_entries(self):
+        """Read the closed archive back and return the arcnames whose CRC-32 matches."""
+        expected = {arcname: crc for _, arcname, _, _, crc in self.pending}
+        verified = set()
+        try:
+            if self.fmt == "zip":
+                with zipfile.ZipFile(self.path) as archive:
+                    if archive.testzip() is None:
+                        verified = {info.filename for info in archive.infolist()
+                                    if expected.get(info.filename) == info.CRC}
+            else:
+                with tarfile.open(self.path, "r:xz") as archive:
+                    for member in archive:
+                        if not member.isfile():
+                            continue
+                        crc = 0
+                        with archive.extractfile(member) as data:
+                            for chunk in iter(lambda: data.read(ARCHIVE_CHUNK), b""):
+                                crc = zlib.crc32(chunk, crc)
+                        if expected.get(member.name) == crc:
+                            verified.add(member.name)
+        except (OSError, zipfile.BadZipFile, tarfile.TarError, EOFError):
+            pass
+        return verified
+
+    def close(self):
+        if self.raw is None:
+            return
+        self.archive.close()
+        self.raw.close()
+        self.raw = None
+        self.stats['archived_bytes'] += os.path.getsize(self.path)
+        verified = self._verified_entries()
+        for path, arcname, size, mtime, _ in self.pending:
+            try:
+                current = os.stat(path)
+                if arcname not in verified or current.st_size != size or current.st_mtime != mtime:
+                    raise OSError("not verified or changed while archiving")
+                _remove_file(path)
+                self.stats['freed_bytes'] += size
+                self.stats['deleted'] += 1
+            except OSError:
+                self.stats['failed'] += 1
+                self.stats['failed_bytes'] += size
+
+def _archive_worker(work, archive_dir, prefix, fmt, max_bytes):
+    """Pull files from the queue into this worker's rotating archive until None arrives."""
+    stats = new_clean_stats()
+    stats['archived_bytes'] = 0
+    archive = _RotatingArchive(archive_dir, prefix, fmt, max_bytes, stats)
+    try:
+        while True:
+            item = work.get()
+            if item is None:
+                break
+            archive.add(*item)
+    finally:
+        archive.close()
+    return stats
+
+def _put_work(work, item, futures):
+    """Queue item for the archive workers, re-raising the error of a worker that died.
+
+    Without the check, a full queue whose workers are gone would block forever.
+    """
+    while True:
+        try:
+            work.put(item, timeout=ARCHIVE_PUT_TIMEOUT)
+            return
+        except queue.Full:
+            for future in futures:
+                if future.done():
+                    future.result()
+                    raise RuntimeError("an archive worker stopped early")
+
+def _stop_workers(work, futures):
+    """Send each worker its None sentinel, giving up once none are left to take it."""
+    for _ in futures:
+        while True:
+            try:
+                work.put(None, timeout=ARCHIVE_PUT_TIMEOUT)
+                break
+            except queue.Full:
+                if all(future.done() for future in futures):
+                    return
+
+def _remove_empty_dirs(path):
+    """Remove the folders below path that are empty after archiving, deepest first."""
+    for kind, item, _, _ in list(iter_tree(path)):
+        if kind == 'dir' and item != path:
+            try:
+                os.rmdir(item)
+            except OSError:
+                pass
+
+def archive_and_clean(path, archive_dir, fmt="zip", rule=None, workers=None, max_archive_mb=ARCHIVE_MAX_MB):
+    """Move the files below path into compressed archives in archive_dir, then delete them.
+
+    Files are streamed in 1 MiB chunks to a pool of workers, each writing its own
+    rotating archive, through a bounded queue, so memory use does not depend on file
+    sizes. rule is an optional retention rule (e.g. only logs older than 30 days).
+    Returns clean stats with an extra 'archived_bytes' counter. Raises ValueError for an
+    unknown fmt, and re-raises the error of an archive worker that died.
+    """
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"unknown archive format: {fmt}")
+    workers = workers or CLEAN_WORKERS_PER_VOLUME
+    os.makedirs(archive_dir, exist_ok=True)
+    retention = compile_retention(rule, path)
+    root_len = len(path.rstrip("\\/")) + 1
+    prefix = f"{os.path.basename(path.rstrip(os.sep)) or 'archive'}-{datetime.now():%Y%m%d-%H%M%S}"
+    archive_root = os.path.abspath(archive_dir) + os.sep
+
+    work = queue.Queue(maxsize=workers * 4)
+    stats = new_clean_stats()
+    stats['archived_bytes'] = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archive") as pool:
+        futures = [pool.submit(_archive_worker, work, archive_dir, f"{prefix}-w{i + 1}", fmt,
+                               max_archive_mb * 1024 * 1024) for i in range(workers)]
+        try:
+            for kind, item, size, mtime in iter_tree(path):
+                if kind != 'file' or os.path.abspath(item).startswith(archive_root):
+                    continue
+                if retention and _retention_verdict(retention, item, mtime) != DELETE:
+                    stats['kept'] += 1
+                    stats['kept_bytes'] += size
+                    continue
+                _put_work(work, (item, item[root_len:].replace("\\", "/"), size, mtime), futures)
+        finally:
+            _stop_workers(work, futures)
+        for future in futures:
+            merge_clean_stats(stats, future.result())
+
+    _remove_empty_dirs(path)
+    return stats
+
+def archive_folder_menu():
+    """Ask for a folder and destination, then archive and clean it."""
+    print_header("Archive & Clean Folder")
+    path = input(f"{Colors.BOLD}Folder to archive (e.g. a log folder): {Colors.END}").strip().strip('"')
+    if not os.path.isdir(path):
+        print_error(f"Folder not found: {path}")
+        return 0
+    archive_dir = input(f"{Colors.BOLD}Archive destination folder: {Colors.END}").strip().strip('"')
+    if not archive_dir:
+        print_colored("Operation cancelled.", Colors.CYAN)
+        return 0
+    fmt = input(f"{Colors.BOLD}Format [zip/tar.xz] (zip): {Colors.END}").strip().lower() or "zip"
+    if fmt not in ARCHIVE_FORMATS:
+        print_error(f"Unknown format: {fmt}")
+        return 0
+    age = input(f"{Colors.BOLD}Only files older than how many days? (0): {Colors.END}").strip() or "0"
+    try:
+        rule = {"min_age_days": float(age)} if float(age) > 0 else None
+    except ValueError:
+        print_error(f"Not a number: {age}")
+        return 0
+
+    if _volume(archive_dir) == _volume(path):
+        print_warning("The archive is on the same volume as the folder, so less space will be freed.")
+
+    start = time.perf_counter()
+    stats = archive_and_clean(os.path.abspath(path), os.path.abspath(archive_dir), fmt, rule)
+    freed = report_clean(os.path.basename(path), path, stats, (time.perf_counter() - start) * 1000)
+    print_colored(f"Archives written: {stats['archived_bytes'] / (1024 * 1024):.2f} MB in {archive_dir}", Colors.CYAN)
+    return freed
+
+def preview_cleanup():
+    """Estimate what the one-click cleanup would free, using the persistent scan index."""
+    print_header("Cleanup Preview")
+    print_info("Estimating (only folders changed since the last scan are re-read)...")
+
+    start = time.perf_counter()
+    total = 0
+    rescanned = 0
+    for name, path in get_cleanup_roots():
+        if not os.path.isdir(path):
+            print_colored(f"  {name:<18} not found", Colors.WHITE)
+            continue
+        estimate = estimate_with_retention(path, RETENTION_RULES.get(name))
+        total += estimate['bytes']
+        rescanned += estimate['rescanned']
+        kept = f", {estimate['kept']} kept by retention rules" if estimate['kept'] else ""
+        print_colored(f"  {name:<18} {estimate['bytes'] / (1024 * 1024):>10.2f} MB  "
+                      f"({estimate['files']} files, {estimate['dirs']} folders{kept})", Colors.YELLOW)
+
+    elapsed = time.perf_counter() - start
+    print_success(f"Estimated space to free: {total / (1024 * 1024):.2f} MB",
+                  after={"bytes": total, "rescanned_dirs": rescanned}, duration_ms=elapsed * 1000)
+    print_info(f"Estimated in {elapsed * 1000:.0f} ms ({rescanned} folders re-read)")
+    return total
+
 def show_menu():
     """Display cleaner menu."""
     print_colored("\n" + "=" * 60, Colors.CYAN)
@@ -166,13 +1463,18 @@ def show_menu():
     print_colored(f"3. {symbols.FOLDER} Clean Windows Update Cache", Colors.YELLOW)
     print_colored(f"4. {symbols.LIGHTNING} Clean Prefetch Files", Colors.YELLOW)
     print_colored(f"5. {symbols.CLOUD} Flush DNS Cache", Colors.BLUE)
-    print_colored(f"6. {symbols.WAVE} Return to Main Menu", Colors.CYAN)
+    print_colored(f"6. {symbols.SEARCH} Preview Cleanup (estimate space to free)", Colors.BLUE)
+    print_colored(f"7. {symbols.FOLDER} Space Usage Report (largest files and folders)", Colors.BLUE)
+    print_colored(f"8. {symbols.RECYCLE} Find Duplicate Files (Temp, Downloads, Update Cache)", Colors.BLUE)
+    print_colored(f"9. {symbols.GLOBE} Clean Browser & App Caches (Chrome, Edge, Firefox, crash dumps...)", Colors.YELLOW)
+    print_colored(f"10. {symbols.DOWNLOAD} Archive & Clean a Folder (zip / tar.xz, e.g. logs)", Colors.YELLOW)
+    print_colored(f"11. {symbols.WAVE} Return to Main Menu", Colors.CYAN)
 
 def main():
     while True:
         show_menu()
         try:
-            choice = input(f"\n{Colors.BOLD}Enter your choice (1-6): {Colors.END}").strip()
+            choice = input(f"\n{Colors.BOLD}Enter your choice (1-11): {Colors.END}").strip()
             
             if choice == '1':
                 clean_all_system()
@@ -188,11 +1490,26 @@ def main():
             elif choice == '5':
                 flush_dns()
             elif choice == '6':
+                preview_cleanup()
+            elif choice == '7':
+                path = input(f"{Colors.BOLD}Folder to scan (Enter for all cleanup locations): {Colors.END}").strip()
+                json_path = input(f"{Colors.BOLD}Save as JSON file (Enter to skip): {Colors.END}").strip()
+                show_space_report([(path, path)] if path else None, json_path=os.path.abspath(json_path) if json_path else None)
+            elif choice == '8':
+                json_path = input(f"{Colors.BOLD}Save as JSON file (Enter to skip): {Colors.END}").strip()
+                show_duplicates(json_path=os.path.abspath(json_path) if json_path else None)
+            elif choice == '9':
+                freed = clean_app_caches()
+                print_success(f"Freed {freed:.2f} MB")
+            elif choice == '10':
+                freed = archive_folder_menu()
+                print_success(f"Freed {freed:.2f} MB")
+            elif choice == '11':
                 break
             else:
-                print_error("Invalid choice! Please enter 1-6.")
+                print_error("Invalid choice! Please enter 1-11.")
             
-            if choice in ['2', '3', '4', '5']:
+            if choice in ['2', '3', '4', '5', '6', '7', '8', '9', '10']:
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
         except KeyboardInterrupt:
@@ -203,6 +1520,41 @@ def main():
             input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
 
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        index = sys.argv.index("--benchmark")
+        benchmark_delete(sys.argv[index + 1] if index + 1 < len(sys.argv) else None)
+        sys.exit(0)
+    if "--report" in sys.argv:
+        index = sys.argv.index("--report")
+        folder = sys.argv[index + 1] if index + 1 < len(sys.argv) and not sys.argv[index + 1].startswith("--") else None
+        json_path = None
+        if "--json" in sys.argv:
+            index = sys.argv.index("--json")
+            json_path = sys.argv[index + 1] if index + 1 < len(sys.argv) else "space_report.json"
+        show_space_report([(folder, folder)] if folder else None, json_path=json_path)
+        sys.exit(0)
+    if "--duplicates" in sys.argv:
+        index = sys.argv.index("--duplicates")
+        folder = sys.argv[index + 1] if index + 1 < len(sys.argv) and not sys.argv[index + 1].startswith("--") else None
+        json_path = None
+        if "--json" in sys.argv:
+            index = sys.argv.index("--json")
+            json_path = sys.argv[index + 1] if index + 1 < len(sys.argv) else "duplicates.json"
+        show_duplicates([(folder, folder)] if folder else None, json_path=json_path)
+        sys.exit(0)
+    if "--archive" in sys.argv:
+        index = sys.argv.index("--archive")
+        if index + 2 >= len(sys.argv):
+            print_error("Usage: system_cleaner.py --archive <folder> <archive folder> [--format zip|tar.xz]")
+            sys.exit(1)
+        fmt = sys.argv[sys.argv.index("--format") + 1] if "--format" in sys.argv else "zip"
+        if fmt not in ARCHIVE_FORMATS:
+            print_error(f"Unknown format: {fmt} (use {' or '.join(ARCHIVE_FORMATS)})")
+            sys.exit(1)
+        folder = os.path.abspath(sys.argv[index + 1])
+        stats = archive_and_clean(folder, os.path.abspath(sys.argv[index + 2]), fmt)
+        report_clean(os.path.basename(folder), folder, stats)
+        sys.exit(0)
     if not ctypes.windll.shell32.IsUserAnAdmin():
         print_warning("Not running as Administrator. Some files may not be deleted.")
         print_info("For best results, run as Administrator.")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+System Status Queries for Windows 11 Update Manager
+Slow status probes shared by the status screens, backed by the shared query cache.
+Also provides an opt-in background prefetcher used by the launcher.
+
+Author: Zied Boughdir
+GitHub: https://github.com/zinzied
+Year: 2025
+"""
+
+import json
+import subprocess
+import threading
+import time
+import winreg
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from query_cache import cached_query, get_cached, set_cached, invalidate, last_invalidated, DEFAULT_TTL
+    from stream_parse import CommandStream, parse_json_lines
+except ImportError:
+    from modules.query_cache import cached_query, get_cached, set_cached, invalidate, last_invalidated, DEFAULT_TTL
+    from modules.stream_parse import CommandStream, parse_json_lines
+
+ADAPTER_TTL = 3600  # Adapters rarely change; DNS edits invalidate the entry
+UPDATE_POLICY_KEY = r"SOFTWARE\Policies\Microsoft\Windows\WindowsUpdate\AU"
+TELEMETRY_POLICY_KEY = r"SOFTWARE\Policies\Microsoft\Windows\DataCollection"
+ONEDRIVE_POLICY_KEY = r"SOFTWARE\Policies\Microsoft\Windows\OneDrive"
+
+
+def read_registry_value(key, name):
+    """Return the data of value name under an open registry key, or None if it is not set."""
+    try:
+        return winreg.QueryValueEx(key, name)[0]
+    except OSError:
+        return None
+
+
+def _query_service_inventory():
+    """Return {service_name_lower: state} for every Win32 service in one sc call."""
+    result = subprocess.run('sc query type= service state= all', shell=True, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+
+    inventory = {}
+    name = None
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if line.startswith("SERVICE_NAME:"):
+            name = line.split(":", 1)[1].strip().lower()
+            inventory[name] = "UNKNOWN"
+        elif line.startswith("STATE") and name:
+            # "STATE              : 4  RUNNING"
+            parts = line.split(":", 1)[1].split()
+            inventory[name] = parts[1] if len(parts) > 1 else "UNKNOWN"
+    return inventory
+
+
+def get_service_inventory(refresh=False, ttl=DEFAULT_TTL):
+    """Return the cached service inventory."""
+    return cached_query("services", _query_service_inventory, ttl, refresh) or {}
+
+
+def get_service_state(service, refresh=False, ttl=DEFAULT_TTL):
+    """Return RUNNING, STOPPED, another sc state name, or UNKNOWN for a service."""
+    state = get_service_inventory(refresh, ttl).get(service.lower())
+    if state:
+        return state
+
+    # Not in the inventory (e.g. per-user or driver service): ask sc directly
+    result = subprocess.run(f'sc query "{service}"', shell=True, capture_output=True, text=True)
+    for keyword in ("RUNNING", "STOPPED", "START_PENDING", "STOP_PENDING"):
+        if keyword in result.stdout:
+            return keyword
+    return "UNKNOWN"
+
+
+def _query_update_policy():
+    try:
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, UPDATE_POLICY_KEY)
+        winreg.CloseKey(key)
+        return {"policy": "DISABLED"}
+    except FileNotFoundError:
+        return {"policy": "ENABLED"}
+    except Exception as e:
+        return {"policy": "ERROR", "error": str(e)}
+
+
+def get_update_policy(refresh=False, ttl=DEFAULT_TTL):
+    """Return {'policy': DISABLED|ENABLED|ERROR} for the Windows Update policy key."""
+    return cached_query("update_policy", _query_update_policy, ttl, refresh)
+
+
+def _query_telemetry_policy():
+    try:
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, TELEMETRY_POLICY_KEY)
+        try:
+            value, _ = winreg.QueryValueEx(key, "AllowTelemetry")
+        finally:
+            winreg.CloseKey(key)
+        return {"policy": "DISABLED" if value == 0 else "ENABLED", "allow_telemetry": value}
+    except FileNotFoundError:
+        return {"policy": "DEFAULT", "allow_telemetry": None}
+    except Exception as e:
+        return {"policy": "ERROR", "error": str(e)}
+
+
+def get_telemetry_policy(refresh=False, ttl=DEFAULT_TTL):
+    """Return the AllowTelemetry policy state (DISABLED, ENABLED, DEFAULT or ERROR)."""
+    return cached_query("telemetry_policy", _query_telemetry_policy, ttl, refresh)
+
+
+def _query_onedrive_state():
+    state = {"running": None, "policy": "ERROR"}
+    try:
+        result = subprocess.run('tasklist /fo csv /nh /fi "imagename eq OneDrive.exe"', shell=True,
+                                capture_output=True, text=True)
+        state["running"] = "onedrive.exe" in result.stdout.lower()
+    except Exception:
+        pass
+
+    try:
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, ONEDRIVE_POLICY_KEY)
+        winreg.CloseKey(key)
+        state["policy"] = "DISABLED"
+    except FileNotFoundError:
+        state["policy"] = "ENABLED"
+    except Exception as e:
+        state["error"] = str(e)
+    return state
+
+
+def get_onedrive_state(refresh=False, ttl=DEFAULT_TTL):
+    """Return {'running': bool|None, 'policy': DISABLED|ENABLED|ERROR} for OneDrive."""
+    return cached_query("onedrive", _query_onedrive_state, ttl, refresh)
+
+
+# One compressed JSON object per line, so packages can be read as PowerShell finds them
+APPX_COMMAND = ("Get-AppxPackage | ForEach-Object { [pscustomobject]@{Name = $_.Name; Version = $_.Version} "
+                "| ConvertTo-Json -Compress }")
+
+
+def _sorted_packages(packages):
+    return sorted(packages, key=lambda p: (p[0] or "").lower())
+
+
+def _stream_appx_packages():
+    """Yield [name, version] per package; raises subprocess.CalledProcessError if PowerShell fails."""
+    with CommandStream(["powershell", "-NoProfile", "-Command", APPX_COMMAND]) as output:
+        for package in parse_json_lines(output):
+            if isinstance(package, dict):
+                yield [package.get("Name"), package.get("Version")]
+    if output.returncode != 0:
+        raise subprocess.CalledProcessError(output.returncode, "Get-AppxPackage")
+
+
+def _query_appx_inventory():
+    try:
+        return _sorted_packages(_stream_appx_packages())
+    except subprocess.CalledProcessError:
+        return None
+
+
+def iter_appx_inventory(refresh=False, ttl=DEFAULT_TTL):
+    """Yield [name, version] for each installed Appx package as soon as it is reported.
+
+    A fresh cached inventory is replayed instead. Otherwise the packages arrive unsorted
+    and the sorted list is cached once PowerShell exits cleanly. Raises
+    subprocess.CalledProcessError if PowerShell fails.
+    """
+    packages = None if refresh else get_cached("appx", ttl)
+    if packages is not None:
+        yield from packages
+        return
+
+    started = time.time()
+    packages = []
+    for package in _stream_appx_packages():
+        packages.append(package)
+        yield package
+    set_cached("appx", _sorted_packages(packages), started)
+
+
+def get_appx_inventory(refresh=False, ttl=DEFAULT_TTL):
+    """Return a sorted list of [name, version] for the installed Appx packages."""
+    return cached_query("appx", _query_appx_inventory, ttl, refresh)
+
+
+def _query_network_adapters():
+    # One PowerShell start for every adapter and its IPv4 (family 2) and IPv6 (23) DNS servers
+    command = (
+        "$dns = @(Get-DnsClientServerAddress -ErrorAction SilentlyContinue); "
+        "@(Get-NetAdapter | Sort-Object ifIndex | ForEach-Object { $i = $_.ifIndex; [pscustomobject]@{"
+        "Name = $_.Name; Index = $i; Status = [string]$_.Status; Description = $_.InterfaceDescription; "
+        "IPv4 = @($dns | Where-Object { $_.InterfaceIndex -eq $i -and $_.AddressFamily -eq 2 } | ForEach-Object { $_.ServerAddresses }); "
+        "IPv6 = @($dns | Where-Object { $_.InterfaceIndex -eq $i -and $_.AddressFamily -eq 23 } | ForEach-Object { $_.ServerAddresses }) "
+        "} }) | ConvertTo-Json -Compress"
+    )
+    result = subprocess.run(["powershell", "-NoProfile", "-Command", command], capture_output=True, text=True)
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    try:
+        adapters = json.loads(result.stdout)
+    except ValueError:
+        return []  # e.g. a warning printed before the JSON
+    if isinstance(adapters, dict):
+        adapters = [adapters]
+
+    def as_list(value):
+        if not value:
+            return []
+        return [value] if isinstance(value, str) else list(value)
+
+    return [{
+        "name": a.get("Name"),
+        "index": a.get("Index"),
+        "status": a.get("Status") or "Unknown",
+        "description": a.get("Description") or "",
+        "ipv4": as_list(a.get("IPv4")),
+        "ipv6": as_list(a.get("IPv6")),
+    } for a in adapters]
+
+
+def get_network_adapters(refresh=False, ttl=ADAPTER_TTL):
+    """Return every network adapter as {'name', 'index', 'status', 'description', 'ipv4', 'ipv6'}."""
+    return cached_query("adapters", _query_network_adapters, ttl, refresh) or []
+
+
+def invalidate_network_adapters():
+    """Forget the cached adapters, e.g. after their DNS servers were changed."""
+    invalidate("adapters")
+
+
+# Probes warmed by the background prefetcher
+PREFETCH_QUERIES = [
+    get_service_inventory,
+    get_update_policy,
+    get_telemetry_policy,
+    get_onedrive_state,
+    get_appx_inventory,
+    get_network_adapters,
+]
+
+_prefetch_thread = None
+_prefetch_started = 0.0
+
+
+def _run_prefetch():
+    with ThreadPoolExecutor(max_workers=len(PREFETCH_QUERIES)) as pool:
+        for future in [pool.submit(query, refresh=True) for query in PREFETCH_QUERIES]:
+            try:
+                future.result()
+            except Exception:
+                pass  # A failed probe simply leaves the cache cold
+
+
+def start_background_prefetch(only_if_invalidated=False):
+    """Warm the shared query cache in a daemon thread. Returns immediately.
+
+    With only_if_invalidated, nothing runs unless a module invalidated part of the
+    cache since the last prefetch started.
+    """
+    global _prefetch_thread, _prefetch_started
+    if _prefetch_thread and _prefetch_thread.is_alive():
+        return _prefetch_thread
+    if only_if_invalidated and last_invalidated() < _prefetch_started:
+        return _prefetch_thread
+    _prefetch_started = time.time()
+    _prefetch_thread = threading.Thread(target=_run_prefetch, name="status-prefetch", daemon=True)
+    _prefetch_thread.start()
+    return _prefetch_thread
@@ -9,6 +9,7 @@ Year: 2025
 """
 
 import subprocess
+import time
 import winreg
 import os
 import sys
@@ -16,20 +17,28 @@ from pathlib import Path
 import ctypes
 
 try:
-    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
 except ImportError:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
+
+try:
+    from system_queries import get_service_state, get_telemetry_policy, read_registry_value
+    from query_cache import invalidate as invalidate_query_cache
+except ImportError:
+    from modules.system_queries import get_service_state, get_telemetry_policy, read_registry_value
+    from modules.query_cache import invalidate as invalidate_query_cache
 
 def run_command(command, description):
     """Run a command and handle errors."""
+    start = time.perf_counter()
     try:
         result = subprocess.run(command, shell=True, capture_output=True, text=True)
         if result.returncode == 0:
-            print_success(f"{description}")
+            print_success(f"{description}", target=command, duration_ms=elapsed_ms(start))
         else:
-            print_error(f"{description} - {result.stderr.strip()}")
+            print_error(f"{description} - {result.stderr.strip()}", target=command, duration_ms=elapsed_ms(start))
     except Exception as e:
-        print_error(f"{description} - {str(e)}")
+        print_error(f"{description} - {str(e)}", target=command, duration_ms=elapsed_ms(start))
 
 def disable_telemetry_services():
     """Disable telemetry and diagnostic services."""
@@ -91,8 +100,9 @@ def disable_telemetry_registry():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Set registry value: {reg_change['subkey']}\\{value_name}")
+                print_success(f"Set registry value: {reg_change['subkey']}\\{value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -124,8 +134,9 @@ def disable_advertising_id():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled advertising ID: {value_name}")
+                print_success(f"Disabled advertising ID: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -159,8 +170,9 @@ def disable_location_tracking():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled location tracking: {value_name}")
+                print_success(f"Disabled location tracking: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -187,8 +199,9 @@ def disable_activity_history():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled activity history: {value_name}")
+                print_success(f"Disabled activity history: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -221,8 +234,9 @@ def disable_feedback_notifications():
             key = winreg.CreateKey(reg_change["key"], reg_change["subkey"])
             
             for value_name, value_type, value_data in reg_change["values"]:
+                before = read_registry_value(key, value_name)
                 winreg.SetValueEx(key, value_name, 0, value_type, value_data)
-                print_success(f"Disabled feedback notifications: {value_name}")
+                print_success(f"Disabled feedback notifications: {value_name}", target=f"{reg_change['subkey']}\\{value_name}", before=before, after=value_data)
             
             winreg.CloseKey(key)
         except Exception as e:
@@ -295,10 +309,10 @@ def check_telemetry_status():
     
     # Check DiagTrack service
     try:
-        result = subprocess.run('sc query "DiagTrack"', shell=True, capture_output=True, text=True)
-        if "RUNNING" in result.stdout:
+        state = get_service_state("DiagTrack")
+        if state == "RUNNING":
             print_colored(f"{symbols.WARNING} DiagTrack Service: RUNNING (Telemetry Active)", Colors.RED)
-        elif "STOPPED" in result.stdout:
+        elif state == "STOPPED":
             print_colored(f"{symbols.CHECK} DiagTrack Service: STOPPED (Telemetry Disabled)", Colors.GREEN)
         else:
             print_colored(f"{symbols.INFO} DiagTrack Service: UNKNOWN", Colors.YELLOW)
@@ -306,18 +320,15 @@ def check_telemetry_status():
         print_colored(f"{symbols.CROSS} DiagTrack Service: ERROR CHECKING", Colors.YELLOW)
     
     # Check telemetry registry
-    try:
-        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Policies\Microsoft\Windows\DataCollection")
-        value, _ = winreg.QueryValueEx(key, "AllowTelemetry")
-        if value == 0:
-            print_colored(f"{symbols.CHECK} Telemetry Registry: DISABLED", Colors.GREEN)
-        else:
-            print_colored(f"{symbols.WARNING} Telemetry Registry: ENABLED", Colors.RED)
-        winreg.CloseKey(key)
-    except FileNotFoundError:
+    policy = get_telemetry_policy()
+    if policy["policy"] == "DISABLED":
+        print_colored(f"{symbols.CHECK} Telemetry Registry: DISABLED", Colors.GREEN)
+    elif policy["policy"] == "ENABLED":
+        print_colored(f"{symbols.WARNING} Telemetry Registry: ENABLED", Colors.RED)
+    elif policy["policy"] == "DEFAULT":
         print_colored(f"{symbols.WARNING} Telemetry Registry: DEFAULT (Enabled)", Colors.RED)
-    except Exception as e:
-        print_colored(f"{symbols.CROSS} Telemetry Registry: ERROR - {str(e)}", Colors.YELLOW)
+    else:
+        print_colored(f"{symbols.CROSS} Telemetry Registry: ERROR - {policy.get('error')}", Colors.YELLOW)
 
 def main():
     """Main telemetry management function."""
@@ -342,6 +353,9 @@ def main():
             else:
                 print_error("Invalid choice! Please enter a number between 1-6.")
             
+            if choice in ['1', '2', '3', '4']:
+                invalidate_query_cache()
+
             if choice in ['1', '2', '3', '4', '5']:
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
                 
@@ -10,20 +10,20 @@ Year: 2025
 """
 
 import subprocess
+import time
 import os
 import sys
 import winreg
-from pathlib import Path
 
 # Ensure we can import modules
 sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
 try:
-    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+    from modules.console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
 except ImportError:
     # Fallback if run directly from root without modules package context
     try:
-        from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen
+        from console_utils import Colors, matches as symbols, print_colored, print_header, print_success, print_error, print_warning, print_info, clear_screen, elapsed_ms
     except ImportError:
         # Define fallback if module is missing
         class Colors:
@@ -39,12 +39,24 @@ except ImportError:
         
         def print_colored(text, color=Colors.WHITE): print(f"{color}{text}{Colors.END}")
         def print_header(text): print(f"\n=== {text} ===")
-        def print_success(text): print(f"OK: {text}")
-        def print_error(text): print(f"ERROR: {text}")
-        def print_warning(text): print(f"WARNING: {text}")
-        def print_info(text): print(f"INFO: {text}")
+        def print_success(text, **fields): print(f"OK: {text}")
+        def print_error(text, **fields): print(f"ERROR: {text}")
+        def print_warning(text, **fields): print(f"WARNING: {text}")
+        def print_info(text, **fields): print(f"INFO: {text}")
+        def elapsed_ms(start): return (time.perf_counter() - start) * 1000
         symbols = type('obj', (object,), {'CROSS': 'x', 'CHECK': 'v', 'WARNING': '!', 'INFO': 'i', 'BLOCK': '#', 'RECYCLE': '@'})
 
+try:
+    from modules import hosts_file, firewall_blocker, dns_cache
+    from modules.query_cache import invalidate as invalidate_query_cache
+except ImportError:
+    import hosts_file
+    import firewall_blocker
+    import dns_cache
+    from query_cache import invalidate as invalidate_query_cache
+
+UPDATE_HOSTS_SECTION = "windows-update"
+
 def is_admin():
     """Check if the script is running with administrator privileges."""
     try:
@@ -58,18 +70,19 @@ def is_admin():
 
 def run_command(command, description, ignore_errors=False):
     """Run a command and handle errors."""
+    start = time.perf_counter()
     try:
         result = subprocess.run(command, shell=True, capture_output=True, text=True, check=True)
-        print_success(f"{description}")
+        print_success(f"{description}", target=command, duration_ms=elapsed_ms(start))
         return True
     except subprocess.CalledProcessError as e:
         err_msg = e.stderr.strip() if e.stderr else str(e)
         if "does not exist" in err_msg:
-             print_info(f"{description} - Task/Service not found (already clean?)")
+             print_info(f"{description} - Task/Service not found (already clean?)", target=command, duration_ms=elapsed_ms(start))
              return True
              
         if not ignore_errors:
-            print_error(f"{description}")
+            print_error(f"{description}", target=command, duration_ms=elapsed_ms(start))
             print_colored(f"  - Error: {err_msg}", Colors.RED)
         return False
 
@@ -128,7 +141,6 @@ def restore_hosts_file():
     """Remove Windows Update URL blocks from hosts file."""
     print_colored(f"\n{symbols.GLOBE} Restoring Hosts File", Colors.BOLD + Colors.CYAN)
 
-    hosts_file = Path(r"C:\Windows\System32\drivers\etc\hosts")
     update_urls = [
         "windowsupdate.microsoft.com",
         "update.microsoft.com",
@@ -141,35 +153,30 @@ def restore_hosts_file():
     ]
 
     try:
-        # Read existing hosts file
-        with open(hosts_file, 'r') as f:
-            lines = f.readlines()
-
-        # Remove blocking entries
-        modified = False
-        new_lines = []
-        for line in lines:
-            should_keep = True
-            for url in update_urls:
-                if f"127.0.0.1 {url}" in line:
-                    should_keep = False
-                    modified = True
-                    print_success(f"Unblocked: {url}")
-                    break
-            if should_keep:
-                new_lines.append(line)
-
-        # Write back to hosts file if modified
-        if modified:
-            with open(hosts_file, 'w') as f:
-                f.writelines(new_lines)
+        hosts = hosts_file.HostsFile()
+        removed = hosts.remove_section(UPDATE_HOSTS_SECTION)
+        # Entries written by older versions live outside the managed block
+        removed += hosts.drop_unmanaged(update_urls)
+        for url in dict.fromkeys(removed):
+            print_success(f"Unblocked: {url}")
+
+        if hosts.save():
             print_success("Hosts file restored successfully")
+            dns_cache.request_flush("update URLs unblocked", unblocked=["update.microsoft.com"])
         else:
             print_success("No blocked URLs found in hosts file")
 
     except Exception as e:
         print_error(f"Failed to restore hosts file: {str(e)}")
 
+def restore_firewall():
+    """Remove the firewall rules that block update endpoints."""
+    print_colored(f"\n{symbols.SHIELD} Removing Firewall Blocking Rules", Colors.BOLD + Colors.CYAN)
+    try:
+        firewall_blocker.remove_blocking_rules()
+    except Exception as e:
+        print_error(f"Failed to remove firewall rules: {str(e)}")
+
 def show_restore_menu():
     """Display the restore menu."""
     clear_screen()
@@ -180,7 +187,8 @@ def show_restore_menu():
     print_colored(f"3. {symbols.TOOLS} Restore Registry Settings Only", Colors.YELLOW)
     print_colored(f"4. {symbols.GEAR} Restore Scheduled Tasks Only", Colors.YELLOW)
     print_colored(f"5. {symbols.GLOBE} Restore Hosts File Only", Colors.YELLOW)
-    print_colored(f"6. {symbols.WAVE} Exit", Colors.RED)
+    print_colored(f"6. {symbols.SHIELD} Remove Firewall Blocking Rules Only", Colors.YELLOW)
+    print_colored(f"7. {symbols.WAVE} Exit", Colors.RED)
 
 def restore_all_updates():
     """Execute all update restoration methods."""
@@ -197,11 +205,13 @@ def restore_all_updates():
 
     print_info("Starting comprehensive Windows Update restoration process...")
 
-    # Execute all restoration methods
-    restore_services()
-    restore_registry()
-    restore_tasks()
-    restore_hosts_file()
+    # Execute all restoration methods (one DNS cache flush for all of them)
+    with dns_cache.batch():
+        restore_services()
+        restore_registry()
+        restore_tasks()
+        restore_hosts_file()
+        restore_firewall()
 
     print_colored("\n" + "=" * 60, Colors.GREEN)
     print_success("Windows Update restoration process completed!")
@@ -220,7 +230,7 @@ def main():
         show_restore_menu()
 
         try:
-            choice = input(f"\n{Colors.BOLD}Enter your choice (1-6): {Colors.END}").strip()
+            choice = input(f"\n{Colors.BOLD}Enter your choice (1-7): {Colors.END}").strip()
 
             if choice == '1':
                 restore_all_updates()
@@ -233,12 +243,20 @@ def main():
             elif choice == '5':
                 restore_hosts_file()
             elif choice == '6':
+                restore_firewall()
+            elif choice == '7':
                 print_colored(f"\n{symbols.WAVE} Goodbye! Your updates are restored!", Colors.BOLD + Colors.GREEN)
                 break
             else:
-                print_error("Invalid choice! Please enter a number between 1-6.")
+                print_error("Invalid choice! Please enter a number between 1-7.")
+
+            # Apply any DNS cache flush the step requested before pausing
+            dns_cache.flush_pending()
+
+            if choice in ['1', '2', '3', '4']:
+                invalidate_query_cache()
 
-            if choice in ['1', '2', '3', '4', '5']:
+            if choice in ['1', '2', '3', '4', '5', '6']:
                 input(f"\n{Colors.CYAN}Press Enter to continue...{Colors.END}")
 
         except KeyboardInterrupt:
@@ -1,43 +1,75 @@
 @echo off
+setlocal EnableExtensions DisableDelayedExpansion
 REM Windows 11 Manager - Run as Administrator
 REM This batch file will automatically request administrator privileges and run the launcher
 
+cd /d "%~dp0"
+
 echo.
 echo ========================================
 echo   Windows 11 Manager - Admin Launcher
 echo ========================================
 echo.
 
-REM Check if colorama is installed for better color support
-echo Checking for colorama (for better colors)...
-python -c "import colorama" >nul 2>&1
-if %errorLevel% neq 0 (
-    echo Installing colorama for better color support...
-    pip install colorama >nul 2>&1
-    if %errorLevel% == 0 (
-        echo Colorama installed successfully.
+REM Locate Python without starting it
+set "PYTHON="
+for %%I in (python.exe) do set "PYTHON=%%~$PATH:I"
+if not defined PYTHON (
+    echo Python was not found in PATH. Please install Python 3.6 or higher.
+    pause
+    exit /b 1
+)
+
+REM The environment check is cached in a marker keyed by the interpreter path and binary stamp
+REM (an upgrade changes the stamp), so warm launches skip the colorama probe entirely.
+REM The marker is only written once colorama imports or installs successfully.
+set "MARKER_DIR=%LOCALAPPDATA%\Win11Manager"
+set "MARKER=%MARKER_DIR%\env_verified_bat.txt"
+for %%F in ("%PYTHON%") do set "ENV_KEY=%%~fF;%%~tF;%%~zF"
+set "MARKER_KEY="
+if exist "%MARKER%" set /p MARKER_KEY=<"%MARKER%"
+if not "%MARKER_KEY%"=="%ENV_KEY%" (
+    REM Check if colorama is installed for better color support
+    echo Checking for colorama ^(for better colors^)...
+    "%PYTHON%" -c "import colorama" >nul 2>&1
+    if errorlevel 1 (
+        echo Installing colorama for better color support...
+        "%PYTHON%" -m pip install colorama >nul 2>&1
+        if errorlevel 1 (
+            echo Note: Could not install colorama. Colors may not display properly.
+        ) else (
+            echo Colorama installed successfully.
+            call :write_marker
+        )
     ) else (
-        echo Note: Could not install colorama. Colors may not display properly.
+        echo Colorama is already installed.
+        call :write_marker
     )
-) else (
-    echo Colorama is already installed.
+    echo.
 )
 
-echo.
-echo Requesting administrator privileges...
-echo Please click "Yes" in the UAC dialog.
-echo.
-
 REM Check if already running as admin
 net session >nul 2>&1
 if %errorLevel% == 0 (
     echo Already running as administrator.
     echo Starting Windows 11 Manager...
     echo.
-    python launcher.py
+    "%PYTHON%" "%~dp0launcher.py" %*
 ) else (
     echo Requesting administrator privileges...
-    powershell -Command "Start-Process python -ArgumentList 'launcher.py' -Verb RunAs"
+    echo Please click "Yes" in the UAC dialog.
+    echo.
+    powershell -NoProfile -Command "Start-Process -FilePath '%PYTHON%' -ArgumentList '\"%~dp0launcher.py\" %*' -WorkingDirectory '%~dp0' -Verb RunAs"
 )
 
 pause
+exit /b
+
+:write_marker
+REM Delayed expansion is enabled only here, after the values are set, so a "!" in the
+REM interpreter path is written literally instead of being stripped.
+if not exist "%MARKER_DIR%" mkdir "%MARKER_DIR%" >nul 2>&1
+setlocal EnableDelayedExpansion
+> "!MARKER!" echo(!ENV_KEY!
+endlocal
+exit /b 0
@@ -7,47 +7,73 @@ Write-Host "  Windows 11 Manager - Admin Launcher" -ForegroundColor Magenta
 Write-Host "========================================" -ForegroundColor Magenta
 Write-Host ""
 
-# Check if colorama is installed for better color support
-Write-Host "Checking for colorama (for better colors)..." -ForegroundColor Cyan
+$launcher = Join-Path $PSScriptRoot "launcher.py"
+
+# Locate Python without starting it
+$pythonCommand = Get-Command python -ErrorAction SilentlyContinue
+if (-not $pythonCommand) {
+    Write-Host "Python was not found in PATH. Please install Python 3.6 or higher." -ForegroundColor Red
+    Write-Host "Press any key to exit..." -ForegroundColor Gray
+    $null = $Host.UI.RawUI.ReadKey("NoEcho,IncludeKeyDown")
+    exit 1
+}
+$python = $pythonCommand.Source
+
+# The environment check is cached in a marker keyed by the interpreter path, version and binary stamp,
+# so warm launches skip the colorama probe (and any pip call) entirely.
+$markerDir = Join-Path $env:LOCALAPPDATA "Win11Manager"
+$marker = Join-Path $markerDir "env_verified.txt"
+$markerMaxAgeDays = 7
 try {
-    python -c "import colorama" 2>$null
-    if ($LASTEXITCODE -eq 0) {
-        Write-Host "Colorama is already installed." -ForegroundColor Green
-    } else {
-        Write-Host "Installing colorama for better color support..." -ForegroundColor Yellow
-        pip install colorama 2>$null
-        if ($LASTEXITCODE -eq 0) {
-            Write-Host "Colorama installed successfully." -ForegroundColor Green
-        } else {
-            Write-Host "Note: Could not install colorama. Colors may not display properly." -ForegroundColor Yellow
-        }
-    }
+    $pythonItem = Get-Item $python -ErrorAction Stop
+    $envKey = "$python;$($pythonItem.VersionInfo.ProductVersion);$($pythonItem.Length);$($pythonItem.LastWriteTimeUtc.Ticks)"
 } catch {
-    Write-Host "Note: Could not check/install colorama. Colors may not display properly." -ForegroundColor Yellow
+    $envKey = "$python"
 }
 
-Write-Host ""
+$markerFresh = $false
+if (Test-Path $marker) {
+    $markerItem = Get-Item $marker
+    $markerAge = (Get-Date) - $markerItem.LastWriteTime
+    if ($markerAge.TotalDays -lt $markerMaxAgeDays -and (Get-Content $marker -Raw).Trim() -eq $envKey) {
+        $markerFresh = $true
+    }
+}
 
-# Check if colorama is installed for better color support
-Write-Host "Checking for colorama (for better colors)..." -ForegroundColor Cyan
-try {
-    python -c "import colorama" 2>$null
-    if ($LASTEXITCODE -eq 0) {
-        Write-Host "Colorama is already installed." -ForegroundColor Green
-    } else {
-        Write-Host "Installing colorama for better color support..." -ForegroundColor Yellow
-        pip install colorama 2>$null
+if (-not $markerFresh) {
+    # Check if colorama is installed for better color support
+    Write-Host "Checking for colorama (for better colors)..." -ForegroundColor Cyan
+    # Only a working colorama is cached; a failed install is retried on the next launch
+    $environmentOk = $false
+    try {
+        & $python -c "import colorama" 2>$null
         if ($LASTEXITCODE -eq 0) {
-            Write-Host "Colorama installed successfully." -ForegroundColor Green
+            Write-Host "Colorama is already installed." -ForegroundColor Green
+            $environmentOk = $true
         } else {
-            Write-Host "Note: Could not install colorama. Colors may not display properly." -ForegroundColor Yellow
+            Write-Host "Installing colorama for better color support..." -ForegroundColor Yellow
+            & $python -m pip install colorama 2>$null
+            if ($LASTEXITCODE -eq 0) {
+                Write-Host "Colorama installed successfully." -ForegroundColor Green
+                $environmentOk = $true
+            } else {
+                Write-Host "Note: Could not install colorama. Colors may not display properly." -ForegroundColor Yellow
+            }
         }
+    } catch {
+        Write-Host "Note: Could not check/install colorama. Colors may not display properly." -ForegroundColor Yellow
     }
-} catch {
-    Write-Host "Note: Could not check/install colorama. Colors may not display properly." -ForegroundColor Yellow
-}
 
-Write-Host ""
+    if ($environmentOk) {
+        try {
+            New-Item -ItemType Directory -Force -Path $markerDir | Out-Null
+            Set-Content -Path $marker -Value $envKey -NoNewline
+        } catch {
+            # Without a marker the check simply runs again next time
+        }
+    }
+    Write-Host ""
+}
 
 # Check if running as administrator
 $isAdmin = ([Security.Principal.WindowsPrincipal] [Security.Principal.WindowsIdentity]::GetCurrent()).IsInRole([Security.Principal.WindowsBuiltInRole] "Administrator")
@@ -56,17 +82,19 @@ if ($isAdmin) {
     Write-Host "Already running as administrator." -ForegroundColor Green
     Write-Host "Starting Windows 11 Manager..." -ForegroundColor Cyan
     Write-Host ""
-    
-    # Run the launcher
-    python launcher.py
+
+    # Run the launcher in this console
+    Set-Location $PSScriptRoot
+    & $python $launcher @args
 } else {
     Write-Host "Requesting administrator privileges..." -ForegroundColor Yellow
     Write-Host "Please click 'Yes' in the UAC dialog." -ForegroundColor Yellow
     Write-Host ""
-    
-    # Request admin privileges and restart
+
+    # Start the elevated interpreter directly on the launcher (no intermediate shell)
     try {
-        Start-Process python -ArgumentList "launcher.py" -Verb RunAs
+        $launcherArgs = @("`"$launcher`"") + $args
+        Start-Process $python -ArgumentList $launcherArgs -WorkingDirectory $PSScriptRoot -Verb RunAs
         Write-Host "Admin request sent. The application will start with elevated privileges." -ForegroundColor Green
     } catch {
         Write-Host "Failed to request admin privileges: $($_.Exception.Message)" -ForegroundColor Red
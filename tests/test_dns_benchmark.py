@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for modules/dns_benchmark.py: the --stub scenario, against local stub resolvers
+with injected delay and loss.
+
+Run with:  python -m unittest discover tests   (or: python -m pytest tests)
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modules"))
+
+from console_utils import Colors
+from dns_benchmark import MAX_TIMEOUT_RATE, _stub_demo, pick_pair, print_results, report_recommendation
+
+
+class StubBenchmarkTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random.seed(1)  # The lossy stub drops 30% of queries at random
+        cls.results = asyncio.run(_stub_demo(rounds=3, timeout=0.3))
+        cls.by_name = {r['name']: r for r in cls.results}
+
+    def test_every_stub_is_measured(self):
+        self.assertEqual(set(self.by_name), {"Fast stub", "Medium stub", "Slow stub", "Lossy stub"})
+        for name in ("Fast stub", "Medium stub", "Slow stub"):
+            self.assertEqual(self.by_name[name]['timeout_rate'], 0, name)
+        self.assertLess(self.by_name["Fast stub"]['cached']['p50'], self.by_name["Slow stub"]['cached']['p50'])
+
+    def test_lossy_resolver_is_flagged(self):
+        self.assertGreater(self.by_name["Lossy stub"]['timeout_rate'], MAX_TIMEOUT_RATE)
+        self.assertNotIn(self.by_name["Lossy stub"], pick_pair(self.results))
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            print_results(self.results)
+        lossy = next(line for line in out.getvalue().splitlines() if "Lossy stub" in line)
+        self.assertIn(Colors.RED, lossy)
+
+    def test_fastest_reliable_pair_is_recommended(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            primary, secondary = report_recommendation(self.results)
+        self.assertEqual(primary['name'], "Fast stub")
+        self.assertEqual(secondary['name'], "Medium stub")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the HealthChecker in modules/dns_providers.py, against local UDP stub resolvers.
+
+Run with:  python -m unittest discover tests   (or: python -m pytest tests)
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modules"))
+
+import dns_wire
+from dns_providers import HealthChecker
+
+TIMEOUT = 0.2
+SPACING = 0.05
+SLOW_DELAY = 0.05
+
+
+class StubResolver:
+    """Answers every query on 127.0.0.1 after delay seconds, skipping every drop_every-th one.
+
+    drop_every=1 drops all queries. The arrival time of each query is recorded.
+    """
+
+    def __init__(self, delay=0.0, drop_every=0):
+        self.delay = delay
+        self.drop_every = drop_every
+        self.arrivals = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.05)
+        self.address = "127.0.0.1:%d" % self.sock.getsockname()[1]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                query, client = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            self.arrivals.append(time.monotonic())
+            if self.drop_every and len(self.arrivals) % self.drop_every == 0:
+                continue
+            time.sleep(self.delay)
+            self.sock.sendto(dns_wire.build_response(query, addresses=["192.0.2.1"]), client)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.sock.close()
+
+
+class HealthCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.stubs = {
+            "Healthy": StubResolver(),
+            "Slow": StubResolver(delay=SLOW_DELAY),
+            "Flaky": StubResolver(drop_every=2),
+            "Dropping": StubResolver(drop_every=1),
+        }
+        for stub in self.stubs.values():
+            self.addCleanup(stub.close)
+        # Listed worst first, so ordered() has to sort them
+        self.providers = [{"name": name, "ipv4": [self.stubs[name].address]}
+                          for name in ("Dropping", "Flaky", "Slow", "Healthy")]
+
+    def checker(self, window=4):
+        return HealthChecker(self.providers, window=window, timeout=TIMEOUT, spacing=SPACING)
+
+    def test_ring_buffer_keeps_the_last_window(self):
+        checker = self.checker(window=4)
+        for _ in range(6):
+            checker.check_once()
+        for name in self.stubs:
+            self.assertEqual(len(self.stubs[name].arrivals), 6)
+            self.assertEqual(checker.health(name)["samples"], 4)
+
+        self.assertEqual(checker.health("Healthy")["loss"], 0)
+        self.assertEqual(checker.health("Dropping")["loss"], 1)
+        # Queries 2, 4 and 6 were dropped; the window holds 3 to 6
+        self.assertEqual(checker.health("Flaky")["loss"], 0.5)
+        self.assertIsNone(checker.health("Dropping")["p50"])
+        self.assertGreaterEqual(checker.health("Slow")["p50"], SLOW_DELAY * 1000)
+        self.assertLess(checker.health("Healthy")["p50"], checker.health("Slow")["p50"])
+
+    def test_probes_are_rate_limited(self):
+        checker = self.checker()
+        checker.check_once()
+        checker.check_once()
+        arrivals = sorted(t for stub in self.stubs.values() for t in stub.arrivals)
+        self.assertEqual(len(arrivals), 2 * len(self.providers))
+        gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+        self.assertGreaterEqual(min(gaps), SPACING * 0.9)
+
+    def test_picks_the_healthy_provider(self):
+        checker = self.checker()
+        self.assertEqual(checker.health("Healthy")["status"], "unknown")
+        for _ in range(4):
+            checker.check_once()
+
+        statuses = {name: checker.health(name)["status"] for name in self.stubs}
+        self.assertEqual(statuses, {"Healthy": "healthy", "Slow": "healthy", "Flaky": "degraded",
+                                    "Dropping": "down"})
+        self.assertEqual([p["name"] for p in checker.ordered()], ["Healthy", "Slow", "Flaky", "Dropping"])
+
+    def test_stop_interrupts_the_spacing_wait(self):
+        checker = self.checker()
+        checker.spacing = 10
+        checker.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        checker.stop()
+        checker._thread.join(2)
+        self.assertFalse(checker._thread.is_alive())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(sum(len(stub.arrivals) for stub in self.stubs.values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the address aggregation and netsh script building in modules/firewall_blocker.py.
+
+Run with:  python -m unittest discover tests   (or: python -m pytest tests)
+"""
+
+import ipaddress
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modules"))
+
+from firewall_blocker import MAX_ADDRESSES_PER_RULE, RULE_NAME, aggregate, build_rule_commands
+
+DELETE_LINE = f'advfirewall firewall delete rule name="{RULE_NAME}"'
+
+
+def networks(*texts):
+    return [ipaddress.ip_network(text) for text in texts]
+
+
+def remote_ips(command):
+    return command.split("remoteip=", 1)[1].split(" ", 1)[0].split(",")
+
+
+class AggregateTest(unittest.TestCase):
+    def test_adjacent_hosts_collapse_into_one_network(self):
+        result, invalid = aggregate(["13.107.4.2", "13.107.4.0", "13.107.4.3", "13.107.4.1"])
+        self.assertEqual(result, networks("13.107.4.0/30"))
+        self.assertEqual(invalid, [])
+
+    def test_hosts_inside_a_range_are_absorbed(self):
+        result, _ = aggregate(["20.190.128.0/18", "20.190.130.7", " 20.190.191.255 "])
+        self.assertEqual(result, networks("20.190.128.0/18"))
+
+    def test_ipv4_before_ipv6(self):
+        result, _ = aggregate(["2620:1ec:c11::200", "13.107.4.50", "2620:1ec:c11::201", "8.8.8.8"])
+        self.assertEqual(result, networks("8.8.8.8/32", "13.107.4.50/32", "2620:1ec:c11::200/127"))
+
+    def test_local_addresses_are_skipped(self):
+        local = ["127.0.0.1", "0.0.0.0", "10.0.0.1", "192.168.1.0/24", "169.254.10.1", "::1", "::",
+                 "fe80::1", "fd00::1"]
+        result, invalid = aggregate(local + ["13.107.4.50"])
+        self.assertEqual(result, networks("13.107.4.50/32"))
+        self.assertEqual(invalid, [])
+
+    def test_invalid_entries_are_reported(self):
+        result, invalid = aggregate(["13.107.4.50", "not-an-address", "300.1.1.1", "13.107.4.0/33", ""])
+        self.assertEqual(result, networks("13.107.4.50/32"))
+        self.assertEqual(invalid, ["not-an-address", "300.1.1.1", "13.107.4.0/33", ""])
+
+    def test_nothing_to_block(self):
+        self.assertEqual(aggregate([]), ([], []))
+
+
+class BuildRuleCommandsTest(unittest.TestCase):
+    def test_delete_comes_first(self):
+        commands = build_rule_commands(networks("13.107.4.0/30"))
+        self.assertEqual(commands[0], DELETE_LINE)
+        self.assertEqual(len(commands), 2)
+        self.assertIn(f'add rule name="{RULE_NAME}" dir=out action=block', commands[1])
+
+    def test_without_networks_only_deletes(self):
+        self.assertEqual(build_rule_commands([]), [DELETE_LINE])
+
+    def test_single_hosts_are_written_bare(self):
+        commands = build_rule_commands(networks("13.107.4.50/32", "13.107.4.0/30", "2620:1ec:c11::200/128"))
+        self.assertEqual(remote_ips(commands[1]), ["13.107.4.50", "13.107.4.0/30", "2620:1ec:c11::200"])
+
+    def test_split_at_max_addresses_per_rule(self):
+        # Every other address, so nothing collapses
+        hosts = [ipaddress.ip_network(f"13.107.{i // 256}.{i % 256}")
+                 for i in range(0, 2 * (MAX_ADDRESSES_PER_RULE + 1), 2)]
+        commands = build_rule_commands(hosts)
+        self.assertEqual(commands[0], DELETE_LINE)
+        self.assertEqual([len(remote_ips(command)) for command in commands[1:]], [MAX_ADDRESSES_PER_RULE, 1])
+        self.assertEqual(remote_ips(commands[1])[0], "13.107.0.0")
+        self.assertEqual(remote_ips(commands[2]), [str(hosts[-1].network_address)])
+
+    def test_custom_name_and_batch_size(self):
+        commands = build_rule_commands(networks("13.107.4.0/32", "13.107.4.2/32", "13.107.4.4/32"),
+                                       name="Test rule", per_rule=2)
+        self.assertEqual(commands[0], 'advfirewall firewall delete rule name="Test rule"')
+        self.assertEqual([remote_ips(command) for command in commands[1:]],
+                         [["13.107.4.0", "13.107.4.2"], ["13.107.4.4"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
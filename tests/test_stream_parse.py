@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for modules/stream_parse.py, using captured command output.
+
+Each fixture is fed through CommandStream (a child Python process writes the raw bytes)
+so line endings, code pages and byte order marks go through the real decoding path.
+
+Run with:  python -m unittest discover tests   (or: python -m pytest tests)
+"""
+
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modules"))
+
+import stream_parse
+from stream_parse import CommandStream, parse_csv, parse_fixed_width, parse_json_lines, parse_key_value
+
+# wmic writes "\r\r\n" line endings when its output is redirected
+WMIC_STARTUP = (
+    b"Caption          Command                                                            \r\r\n"
+    b"OneDrive         \"C:\\Users\\zied\\AppData\\Local\\Microsoft\\OneDrive\\OneDrive.exe\" /background  \r\r\n"
+    b"SecurityHealth   %windir%\\system32\\SecurityHealthSystray.exe                       \r\r\n"
+    b"\r\r\n"
+)
+
+WMIC_CPU_VALUE = (
+    b"\r\r\n\r\r\n"
+    b"LoadPercentage=7\r\r\n"
+    b"\r\r\n\r\r\n"
+    b"LoadPercentage=15\r\r\n"
+    b"\r\r\n\r\r\n\r\r\n"
+)
+
+WMIC_OS_VALUE = (
+    b"\r\r\n\r\r\n"
+    b"FreePhysicalMemory=9254316\r\r\n"
+    b"TotalVisibleMemorySize=16692216\r\r\n"
+    b"\r\r\n\r\r\n\r\r\n"
+)
+
+# cscript //nologo slmgr.vbs /dli (ANSI code page)
+SLMGR_DLI = (
+    b"Name: Windows(R), Professional edition\r\n"
+    b"Description: Windows(R) Operating System, RETAIL channel\r\n"
+    b"Partial Product Key: 3V66T\r\n"
+    b"License Status: Licensed\r\n"
+    b"\r\n"
+)
+
+# tasklist /fo csv (OEM code page 850: "\x82" is e-acute)
+TASKLIST_CSV = (
+    b"\"Image Name\",\"PID\",\"Session Name\",\"Session#\",\"Mem Usage\"\r\n"
+    b"\"System Idle Process\",\"0\",\"Services\",\"0\",\"8 K\"\r\n"
+    b"\"svchost.exe\",\"1184\",\"Services\",\"0\",\"12,348 K\"\r\n"
+    b"\"Caf\x82.exe\",\"5120\",\"Console\",\"1\",\"40,112 K\"\r\n"
+)
+
+# Get-AppxPackage | ForEach-Object { $_ | Select-Object Name, Version | ConvertTo-Json -Compress }
+APPX_JSON_LINES = (
+    b"{\"Name\":\"Microsoft.WindowsCalculator\",\"Version\":\"11.2311.0.0\"}\r\n"
+    b"\r\n"
+    b"WARNING: 1 package could not be read\r\n"
+    b"{\"Name\":\"Microsoft.BingWeather\",\"Version\":\"4.53.52892.0\"}\r\n"
+)
+
+# wmic ... /format:csv through "cmd /u": UTF-16 LE with a byte order mark
+WMIC_CSV_UTF16 = "\ufeffNode,Caption,Version\r\r\nDESKTOP-ZB,Café Player,1.2\r\r\n".encode("utf-16-le")
+
+
+def stream(data, encoding="ascii", chunk_size=stream_parse.CHUNK_SIZE):
+    """A CommandStream over a child process that writes data to stdout."""
+    script = "import sys; sys.stdout.buffer.write(%r)" % data
+    return CommandStream([sys.executable, "-c", script], encoding=encoding, chunk_size=chunk_size)
+
+
+class CommandStreamTest(unittest.TestCase):
+    def test_wmic_line_endings(self):
+        with stream(WMIC_CPU_VALUE) as out:
+            lines = list(out)
+        self.assertEqual(lines, ["", "", "LoadPercentage=7", "", "", "LoadPercentage=15", "", "", ""])
+        self.assertEqual(out.returncode, 0)
+
+    def test_utf16_bom(self):
+        for chunk_size in (1, 2, 3, stream_parse.CHUNK_SIZE):
+            with self.subTest(chunk_size=chunk_size), stream(WMIC_CSV_UTF16, "cp850", chunk_size) as out:
+                self.assertEqual(list(out), ["Node,Caption,Version", "DESKTOP-ZB,Café Player,1.2"])
+
+    def test_code_page_one_byte_at_a_time(self):
+        with stream(TASKLIST_CSV, "cp850", chunk_size=1) as out:
+            self.assertEqual(list(out)[-1], '"Café.exe","5120","Console","1","40,112 K"')
+
+    def test_single_byte_output(self):
+        with stream(b"7", chunk_size=1) as out:
+            self.assertEqual(list(out), ["7"])
+        with stream(b"") as out:
+            self.assertEqual(list(out), [])
+
+
+class ConsoleEncodingTest(unittest.TestCase):
+    def kernel32(self, console, oem=437, ansi=1252):
+        kernel32 = types.SimpleNamespace(GetConsoleOutputCP=lambda: console, GetOEMCP=lambda: oem,
+                                         GetACP=lambda: ansi)
+        return mock.patch.object(stream_parse.ctypes, "windll", types.SimpleNamespace(kernel32=kernel32),
+                                 create=True)
+
+    def test_console_code_page(self):
+        with self.kernel32(850):
+            self.assertEqual(stream_parse.console_encoding(), "cp850")
+        with self.kernel32(65001):
+            self.assertEqual(stream_parse.console_encoding(), "utf-8")
+
+    def test_no_console_falls_back_to_oem(self):
+        # GetConsoleOutputCP() returns 0 in a process without a console
+        with self.kernel32(0):
+            self.assertEqual(stream_parse.console_encoding(), "cp437")
+            self.assertEqual(stream_parse.ansi_encoding(), "cp1252")
+
+    def test_unknown_code_page(self):
+        with self.kernel32(0, oem=0, ansi=0):
+            encoding = stream_parse.console_encoding()
+        b"".decode(encoding)  # Never "cp0"
+
+
+class ParserTest(unittest.TestCase):
+    def test_parse_fixed_width_wmic(self):
+        with stream(WMIC_STARTUP) as out:
+            rows = list(parse_fixed_width(out))
+        self.assertEqual(rows, [
+            {"Caption": "OneDrive",
+             "Command": '"C:\\Users\\zied\\AppData\\Local\\Microsoft\\OneDrive\\OneDrive.exe" /background'},
+            {"Caption": "SecurityHealth", "Command": "%windir%\\system32\\SecurityHealthSystray.exe"},
+        ])
+
+    def test_parse_fixed_width_ruler(self):
+        lines = ["Name      Status   ", "----      ------   ", "wuauserv  Running", "", "bits      Stopped"]
+        self.assertEqual(list(parse_fixed_width(lines)), [{"Name": "wuauserv", "Status": "Running"},
+                                                          {"Name": "bits", "Status": "Stopped"}])
+
+    def test_parse_key_value_wmic(self):
+        with stream(WMIC_CPU_VALUE) as out:
+            self.assertEqual(list(parse_key_value(out)), [{"LoadPercentage": "7"}, {"LoadPercentage": "15"}])
+        with stream(WMIC_OS_VALUE) as out:
+            self.assertEqual(list(parse_key_value(out)),
+                             [{"FreePhysicalMemory": "9254316", "TotalVisibleMemorySize": "16692216"}])
+
+    def test_parse_key_value_slmgr(self):
+        with stream(SLMGR_DLI, "cp1252") as out:
+            records = list(parse_key_value(out, separator=":"))
+        self.assertEqual(records, [{
+            "Name": "Windows(R), Professional edition",
+            "Description": "Windows(R) Operating System, RETAIL channel",
+            "Partial Product Key": "3V66T",
+            "License Status": "Licensed",
+        }])
+
+    def test_parse_csv(self):
+        with stream(TASKLIST_CSV, "cp850") as out:
+            rows = list(parse_csv(out))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1], {"Image Name": "svchost.exe", "PID": "1184", "Session Name": "Services",
+                                   "Session#": "0", "Mem Usage": "12,348 K"})
+        self.assertEqual(rows[2]["Image Name"], "Café.exe")
+
+    def test_parse_csv_utf16(self):
+        with stream(WMIC_CSV_UTF16, chunk_size=1) as out:
+            self.assertEqual(list(parse_csv(out)), [{"Node": "DESKTOP-ZB", "Caption": "Café Player", "Version": "1.2"}])
+
+    def test_parse_csv_without_header(self):
+        with stream(TASKLIST_CSV, "cp850") as out:
+            rows = list(parse_csv(out, header=False))
+        self.assertEqual(rows[0], ["Image Name", "PID", "Session Name", "Session#", "Mem Usage"])
+
+    def test_parse_json_lines(self):
+        with stream(APPX_JSON_LINES) as out:
+            self.assertEqual(list(parse_json_lines(out)), [
+                {"Name": "Microsoft.WindowsCalculator", "Version": "11.2311.0.0"},
+                {"Name": "Microsoft.BingWeather", "Version": "4.53.52892.0"},
+            ])
+
+
+if __name__ == "__main__":
+    unittest.main()